@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+from numpy import argwhere, asarray, count_nonzero, flatnonzero, ones, zeros, uint8
+
+from ConwaysEngine import ConwaysEngine, boundsOf, sumNeighbours
+
+class ConwaysActiveEngine(ConwaysEngine):
+    """
+        Incremental version of ConwaysEngine that only re-evaluates the regions of the board that can change.
+
+        The board is split in square tiles of tilesize x tilesize cells. A cell can only change if a cell of its
+        neighbourhood changed in the previous generation, so after each step only the tiles that changed and the tiles
+        around them are evaluated again, and the cost of a generation follows the activity rather than the board area.
+        When most of the board is active, the whole board is stepped at once which is faster than tile by tile.
+
+        The tiles that changed in the last generation are kept in self.dirty, so a view can skip the unchanged regions.
+        The tiles holding live cells are kept in self.occupied, updated on the changed tiles only, so the bounding box of
+        the live cells is found from the tiles and refined in the tiles of its edges.
+        With a wrapping topology the tiles are read from the padded board, and a change on a tile of the border makes
+        every tile of the border active, since the ghost cells of the border tiles come from the opposite edges.
+    """
+    def __init__(self, gridx=10, gridy=10, tilesize=32, fullthreshold=0.5, rule=None, topology="dead"):
+        self.tilesize      = max(1, tilesize)
+        self.fullthreshold = fullthreshold
+        super(ConwaysActiveEngine, self).__init__(gridx, gridy, rule, topology)
+        self._resetTiles()
+
+    # Mark every tile as active, used when the whole board is replaced
+    def _resetTiles(self):
+        tilesx = (self.gridheight + self.tilesize - 1) // self.tilesize
+        tilesy = (self.gridwidth + self.tilesize - 1) // self.tilesize
+        self.active = ones((tilesx, tilesy), dtype=bool)
+        self.dirty  = ones((tilesx, tilesy), dtype=bool)
+        self.occupied = None
+
+    def _tilesOf(self, changed):
+        """
+            Function that, for a mask of changed cells, return the mask of the tiles containing at least one changed cell
+            Parameters :
+                - changed : a gridheight x gridwidth boolean array
+            Return :
+                - tiles : a boolean array with one value per tile
+        """
+        size = self.tilesize
+        tilesx, tilesy = self.active.shape
+        padded = zeros((tilesx*size, tilesy*size), dtype=bool)
+        padded[:self.gridheight, :self.gridwidth] = changed
+        return padded.reshape(tilesx, size, tilesy, size).any(axis=(1, 3))
+
+    # Return the tiles given and the 8 tiles around each of them, and every tile of the border when the border wraps
+    def _grow(self, tiles):
+        padded = zeros((tiles.shape[0]+2, tiles.shape[1]+2), dtype=uint8)
+        padded[1:-1, 1:-1] = tiles
+        grown = (sumNeighbours(padded) + tiles) > 0
+        if self.topology != "dead" and self._onBorder(tiles):
+            grown[[0, -1], :] = True
+            grown[:, [0, -1]] = True
+        return grown
+
+    # Check if any of the given tiles is on the border of the board
+    def _onBorder(self, tiles):
+        return bool(tiles[[0, -1], :].any() or tiles[:, [0, -1]].any())
+
+    # Compute the next state of the cells of one tile, from the current board or from the padded board if given
+    def _stepTile(self, x0, x1, y0, y1, padded=None):
+        if padded is not None:
+            return self._nextState(self.board[x0:x1, y0:y1], sumNeighbours(padded[x0:x1+2, y0:y1+2]))
+        xa, xb = max(x0-1, 0), min(x1+1, self.gridheight)
+        ya, yb = max(y0-1, 0), min(y1+1, self.gridwidth)
+        window = zeros((x1-x0+2, y1-y0+2), dtype=uint8)
+        window[xa-x0+1:xb-x0+1, ya-y0+1:yb-y0+1] = self.board[xa:xb, ya:yb]
+        return self._nextState(self.board[x0:x1, y0:y1], sumNeighbours(window))
+
+    def step(self):
+        """
+            Function that advance the board by one generation, evaluating only the active tiles
+            Return :
+                - board : the new board
+        """
+        tiles = argwhere(self.active)
+        if len(tiles) > self.fullthreshold * self.active.size:
+            previous = self.board
+            self.board = self._nextState(self.board, self.countNeighbours())
+            self.generation += 1
+            changed = self.board != previous
+            self.dirty = self._tilesOf(changed)
+            self.occupied = None
+            if self.trackChanges:
+                self.births = int(count_nonzero(changed & self.board))
+                self.deaths = int(count_nonzero(changed)) - self.births
+        else:
+            # Compute every active tile from the current board before writing any of them
+            size = self.tilesize
+            padded = self._padBoard() if self.topology != "dead" else None
+            results = []
+            for tx, ty in tiles:
+                x0, y0 = tx*size, ty*size
+                x1, y1 = min(x0+size, self.gridheight), min(y0+size, self.gridwidth)
+                results.append((tx, ty, x0, x1, y0, y1, self._stepTile(x0, x1, y0, y1, padded)))
+
+            self.dirty = zeros(self.active.shape, dtype=bool)
+            births, deaths = 0, 0
+            for tx, ty, x0, x1, y0, y1, tile in results:
+                changed = tile != self.board[x0:x1, y0:y1]
+                if changed.any():
+                    if self.trackChanges:
+                        born = int(count_nonzero(changed & tile))
+                        births, deaths = births + born, deaths + int(count_nonzero(changed)) - born
+                    self.board[x0:x1, y0:y1] = tile
+                    self.dirty[tx, ty] = True
+                    if self.occupied is not None:
+                        self.occupied[tx, ty] = tile.any()
+            self.births, self.deaths = births, deaths
+            self.generation += 1
+
+        self.active = self._grow(self.dirty)
+        return self.board
+
+    # Get the bounding box of the live cells, as a (x0, y0, x1, y1) cell range, None if there is none
+    def liveBounds(self):
+        if self.occupied is None:
+            self.occupied = self._tilesOf(self.board)
+        tilesx = flatnonzero(self.occupied.any(axis=1))
+        if len(tilesx) == 0:
+            return None
+        tilesy = flatnonzero(self.occupied.any(axis=0))
+
+        # Cell range of the occupied tiles, refined in the strips of tiles on each of its edges
+        size = self.tilesize
+        xa, xb = tilesx[0]*size, min((tilesx[-1]+1)*size, self.gridheight)
+        ya, yb = tilesy[0]*size, min((tilesy[-1]+1)*size, self.gridwidth)
+        x0 = xa + boundsOf(self.board[xa:xa+size, ya:yb])[0]
+        x1 = tilesx[-1]*size + boundsOf(self.board[tilesx[-1]*size:xb, ya:yb])[2]
+        y0 = ya + boundsOf(self.board[xa:xb, ya:ya+size])[1]
+        y1 = tilesy[-1]*size + boundsOf(self.board[xa:xb, tilesy[-1]*size:yb])[3]
+        return (int(x0), int(y0), int(x1), int(y1))
+
+    # Get the regions that changed in the last generation, as (x0, y0, x1, y1) cell ranges, x1 and y1 excluded
+    def dirtyRects(self):
+        size = self.tilesize
+        return [(tx*size, ty*size, min((tx+1)*size, self.gridheight), min((ty+1)*size, self.gridwidth)) for tx, ty in argwhere(self.dirty).tolist()]
+
+    # *----------------------------GET--SET------------------------------------*
+    # Set the rule of the game, every tile has to be evaluated again
+    def set_rule (self, rule):
+        super(ConwaysActiveEngine, self).set_rule(rule)
+        self.active[...] = True
+
+    # Set the boundary topology of the board, every tile has to be evaluated again
+    def set_topology (self, topology):
+        super(ConwaysActiveEngine, self).set_topology(topology)
+        self.active[...] = True
+
+    # Set the state of the cell (x, y), the tiles around it become active
+    def set_cell (self, x, y, value):
+        super(ConwaysActiveEngine, self).set_cell(x, y, value)
+        self.occupied = None
+        tx, ty = x // self.tilesize, y // self.tilesize
+        self.active[max(tx-1, 0):tx+2, max(ty-1, 0):ty+2] = True
+        if self.topology != "dead" and (x in (0, self.gridheight-1) or y in (0, self.gridwidth-1)):
+            self.active[[0, -1], :] = True
+            self.active[:, [0, -1]] = True
+
+    # Set many cells to the same state in one write, the tiles around them become active
+    def set_cells (self, xs, ys, value):
+        super(ConwaysActiveEngine, self).set_cells(xs, ys, value)
+        self.occupied = None
+        tiles = zeros(self.active.shape, dtype=bool)
+        tiles[asarray(xs) // self.tilesize, asarray(ys) // self.tilesize] = True
+        self.active |= self._grow(tiles)
+
+    # Set the board, only the tiles around the cells that differ from the current board become active
+    def set_board (self, board):
+        board = asarray(board, dtype=bool)
+        if board.shape != self.board.shape:
+            super(ConwaysActiveEngine, self).set_board(board)
+            self._resetTiles()
+        else:
+            changed = board != self.board
+            if changed.any():
+                self.active |= self._grow(self._tilesOf(changed))
+                self.board = board.copy()
+                self.occupied = None
@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+
+import argparse, json, os, platform, subprocess, sys, time, tracemalloc
+
+import numpy
+from numpy import zeros
+
+from ConwaysActiveEngine import ConwaysActiveEngine
+from ConwaysBitBoard import ConwaysBitBoard
+from ConwaysEngine import ConwaysEngine
+from ConwaysPatterns import pattern, placePattern
+from ConwaysSeeding import randomSoup
+from ConwaysSimulation import ConwaysSimulation
+
+# Board sizes, cases and engines of the benchmark suite
+SUITE_SIZES   = [(38, 20), (128, 128), (512, 512), (1024, 1024), (4096, 4096)]
+SUITE_CASES   = [("soup", 0.25), ("soup", 0.5), ("r-pentomino", None), ("gosper-gun", None)]
+SUITE_ENGINES = {"numpy" : ConwaysEngine, "active" : ConwaysActiveEngine, "bitboard" : ConwaysBitBoard}
+SUITE_SEED    = 1234
+
+# Modules whose import time is measured, whether they may import PyQt5 (only the widgets and the window do) and the
+# ceiling of their import time in milliseconds, a few times what they take so that only a heavy new import goes over it
+IMPORT_MODULES = [("ConwaysRule", False, 30), ("ConwaysTopology", False, 10), ("ConwaysStatistics", False, 40),
+                  ("ConwaysEngine", False, 300), ("ConwaysSimulation", False, 300), ("headless", False, 350),
+                  ("ConwaysCanvas", True, 500), ("main", True, 500)]
+
+class ListGrid:
+    """
+        The original list-of-lists grid of ConwaysCanvas with its per-cell rules, kept as the reference to compare the
+        engines against
+    """
+    def __init__(self, grid, valueOn=0, valueOff=1):
+        self.grid     = grid
+        self.valueOn  = valueOn
+        self.valueOff = valueOff
+
+    def step(self):
+        self.applyRules()
+
+    def _getNeighbours(self, x, y):
+        """
+            Function that, for a given cell, identified with its coordinates x and y, return the coordinates and values of its neighbours
+            Parameters :
+                - x : the coordinate of the cell on the x-axis
+                - y : the coordinate of the cell on the y-axis
+            Return :
+                - neighbours : a dictionary containing the coordinates and the values of the neighbours of the cell
+            Note : to access to the value of a given cell neighbour, use 'neighbours[x][y]', considering that 'neighbours' is returned by the function and 'x' and 'y' are the coordinates of the cell of which we want to have access
+        """
+        neighbours = {}
+        if (x == 0):
+            if (y == 0): # Upper left corner
+                neighbours = {(x,y+1):self.grid[x][y+1],(x+1,y):self.grid[x+1][y],(x+1,y+1):self.grid[x+1][y+1]}
+            elif (y == len(self.grid[0])-1): # Upper right corner
+                neighbours = {(x,y-1):self.grid[x][y-1],(x+1,y):self.grid[x+1][y],(x+1,y-1):self.grid[x+1][y-1]}
+            else: # Upper border
+                neighbours = {(x,y-1):self.grid[x][y-1],(x,y+1):self.grid[x][y+1],(x+1,y-1):self.grid[x+1][y-1],(x+1,y):self.grid[x+1][y],(x+1,y+1):self.grid[x+1][y+1]}
+        elif (x == len(self.grid)-1):
+            if (y == 0): # Left down corner
+                neighbours = {(x-1,y):self.grid[x-1][y],(x,y+1):self.grid[x][y+1],(x-1,y+1):self.grid[x-1][y+1]}
+            elif (y == len(self.grid[0])-1): # Right down corner
+                neighbours = {(x,y-1):self.grid[x][y-1],(x-1,y):self.grid[x-1][y],(x-1,y-1):self.grid[x-1][y-1]}
+            else: # Down border
+                neighbours = {(x,y+1):self.grid[x][y+1],(x,y-1):self.grid[x][y-1],(x-1,y-1):self.grid[x-1][y-1],(x-1,y):self.grid[x-1][y],(x-1,y+1):self.grid[x-1][y+1]}
+        else:
+            if(y == 0): # Left border
+                neighbours = {(x-1,y):self.grid[x-1][y],(x+1,y):self.grid[x+1][y],(x-1,y+1):self.grid[x-1][y+1],(x,y+1):self.grid[x][y+1],(x+1,y+1):self.grid[x+1][y+1]}
+            elif(y == len(self.grid[0])-1): # Right border
+                neighbours = {(x-1,y):self.grid[x-1][y],(x+1,y):self.grid[x+1][y],(x-1,y-1):self.grid[x-1][y-1],(x,y-1):self.grid[x][y-1],(x+1,y-1):self.grid[x+1][y-1]}
+            else: # Middle
+                neighbours = {(x-1,y-1):self.grid[x-1][y-1],(x-1,y):self.grid[x-1][y],(x-1,y+1):self.grid[x-1][y+1],(x,y-1):self.grid[x][y-1],(x,y+1):self.grid[x][y+1],(x+1,y-1):self.grid[x+1][y-1],(x+1,y):self.grid[x+1][y],(x+1,y+1):self.grid[x+1][y+1]}
+        neighbours.update({(x,y):2}) # Add the value of the cell for which we look the neighbours, make sure not to use the value 2 for either self.valueOn and self.valueOff as it's used here
+        return neighbours
+
+    def _countNeighbours(self, x, y):
+        """
+            Function that, for a given cell, identified with its coordinates x and y, return the number of cells in its neighbourhood that are on and the number that are off
+            Parameters :
+                - x : the coordinate of the cell on the x-axis
+                - y : the coordinate of the cell on the y-axis
+            Return :
+                - numberOn, numberOff : the number of cells neighbouring a particular cell that are on and off
+        """
+        
+        # Initialize both cells to 0
+        numberOn, numberOff = 0, 0
+
+        # Get a dictionary containing the neighbors of a particular cell
+        neighbours = self._getNeighbours(x, y)
+
+        # Iterate through neighbors
+        for key in neighbours.keys(): # we go through all the keys in the dict, so all the coordinates of the neighbours
+            
+            # If neighbour is alive, increment numberOn
+            if(neighbours[key] == self.valueOn):
+                numberOn += 1
+
+            # If neighbour is dead, increment numberOff
+            elif(neighbours[key] == self.valueOff):
+                numberOff += 1
+        return numberOn, numberOff
+
+    def applyRules(self):
+        """
+            Function that, for a given grid, apply the rules of the game (see below for the detail)
+
+            Return :
+                - nextgrid : the self.grid updated with the rules of the game (see below for the detail)
+            Note : the rules are the following
+                1. Any live cell with fewer than two live neighbours dies, as if caused by underpopulation.
+                2. Any live cell with two or three live neighbours lives on to the next generation.
+                3. Any live cell with more than three live neighbours dies, as if by overpopulation.
+                4. Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
+        """
+        
+        # Initialize array with 0's
+        nextgrid = [[self.valueOff for y in range(len(self.grid[0]))] for x in range(len(self.grid))]
+
+        # Iterate through rows and columns
+        for x in range(len(self.grid)): # we go through all the point on the x-axis
+            for y in range(len(self.grid[0])): # we go through all the point on the y-axis
+
+                # Count the number of neighbours both dead and alive
+                numberOn, numberOff = self._countNeighbours(x, y)
+
+                # Apply rules defined above depending on conditions met
+                if(self.grid[x][y] == self.valueOn): # For the rules 1, 2 and 3
+                    if(numberOn < 2): # For the rule 1
+                        nextgrid[x][y] = self.valueOff
+                    elif(numberOn == 2 or numberOn == 3): # For the rule 2
+                        nextgrid[x][y] = self.valueOn
+                    elif(numberOn > 3): # For the rule 3
+                        nextgrid[x][y] = self.valueOff
+                elif(self.grid[x][y] == self.valueOff and numberOn == 3): # For the rule 4
+                    nextgrid[x][y] = self.valueOn
+        self.grid = nextgrid
+
+
+# Build a random boolean board of the given size
+def randomBoard(gridx, gridy, density=0.5, seed=0):
+    return randomSoup(gridx, gridy, density, seed)
+
+# Measure the bytes allocated by a function
+def measure(function):
+    tracemalloc.start()
+    result = function()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, allocated
+
+# Time a number of generations and return the number of generations per second
+def generationsPerSecond(step, generations):
+    start = time.perf_counter()
+    for _ in range(generations):
+        step()
+    return generations / (time.perf_counter() - start)
+
+def compareBackends(gridx, gridy, generations, listsize):
+    """
+        Function that compare the memory per cell and the speed of the list-of-lists grid, ConwaysEngine and ConwaysBitBoard
+        Parameters :
+            - gridx, gridy : the size of the board
+            - generations : the number of generations timed for the array backends
+            - listsize : the side of the board used to time the list-of-lists grid, its speed is then scaled to gridx x gridy
+        Return :
+            - results : a list of (name, bytes per cell, generations per second, note) tuples
+    """
+    board = randomBoard(gridx, gridy)
+    cells = gridx * gridy
+    results = []
+
+    # List-of-lists grid, measured on a smaller board since a single generation of the full size takes minutes
+    grid, allocated = measure(lambda: [[0 if alive else 1 for alive in row] for row in board.tolist()])
+    listgrid = ListGrid(grid)
+    listgrid.grid = [row[:listsize] for row in grid[:listsize]]
+    rate = generationsPerSecond(listgrid.step, 1) * (listsize * listsize) / cells
+    results.append(("list-of-lists", allocated / cells, rate, "speed scaled from %dx%d" % (listsize, listsize)))
+    del grid, listgrid
+
+    engine = ConwaysEngine(gridx, gridy)
+    engine.set_board(board)
+    results.append(("ConwaysEngine", engine.board.nbytes / cells, generationsPerSecond(engine.step, generations), ""))
+    del engine
+
+    bitboard = ConwaysBitBoard(gridx, gridy)
+    bitboard.set_board(board)
+    results.append(("ConwaysBitBoard", bitboard.nbytes() / cells, generationsPerSecond(bitboard.step, generations), ""))
+    return results
+
+def compareWorkers(gridx, gridy, generations, workers):
+    """
+        Function that measure how ConwaysParallelEngine scales with the number of worker processes
+        Parameters :
+            - gridx, gridy : the size of the board
+            - generations : the number of generations timed
+            - workers : the numbers of workers to compare
+        Return :
+            - results : a list of (workers, generations per second, speedup over 1 worker) tuples
+    """
+    from ConwaysParallel import ConwaysParallelEngine
+    board = randomBoard(gridx, gridy)
+    results = []
+    for count in workers:
+        with ConwaysParallelEngine(gridx, gridy, workers=count) as engine:
+            engine.set_board(board)
+            engine.step() # Let the workers start before timing
+            results.append((count, generationsPerSecond(engine.step, generations)))
+    return [(count, rate, rate / results[0][1]) for count, rate in results]
+
+def compareRuleApply(sizes, rules, repeats=20):
+    """
+        Function that compare the two ways ConwaysRule applies a rule to arrays : one comparison per neighbour count that
+        can give a live cell, and an indexed read of the lookup table, apply() picking the lookup above
+        ConwaysRule.LOOKUP_COMPARISONS comparisons
+        Parameters :
+            - sizes : the sides of the square boards
+            - rules : the rule strings
+            - repeats : the number of applications timed
+        Return :
+            - results : a list of (side, rule, comparisons, milliseconds comparing, milliseconds with the lookup, choice)
+              tuples
+    """
+    from ConwaysRule import LOOKUP_COMPARISONS, ConwaysRule
+    results = []
+    for side in sizes:
+        alive = randomBoard(side, side, 0.4, SUITE_SEED)
+        counts = numpy.random.default_rng(SUITE_SEED).integers(0, 9, (side, side)).astype(numpy.uint8)
+        for name in rules:
+            rule = ConwaysRule(name)
+            comparisons = sum(rule.table[0][count] or rule.table[1][count] for count in range(9))
+            timings = []
+            for apply in (rule.compare, rule.lookup):
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    apply(alive, counts)
+                timings.append((time.perf_counter() - start) / repeats * 1000)
+            choice = "lookup" if comparisons > LOOKUP_COMPARISONS else "compare"
+            results.append((side, str(rule), comparisons, timings[0], timings[1], choice))
+    return results
+
+# Build the starting board of a case of the suite
+def caseBoard(case, density, gridx, gridy, seed):
+    if case == "soup":
+        return randomBoard(gridx, gridy, density, seed)
+    return placePattern(zeros((gridx, gridy), dtype=bool), pattern(case))
+
+def timeSteps(step, budget, maxgenerations=100000):
+    """
+        Function that step for about budget seconds, at least one generation
+        Return :
+            - rate, peak : the generations per second and the peak of memory allocated while stepping, in bytes
+    """
+    tracemalloc.start()
+    generations = 0
+    start = time.perf_counter()
+    while generations == 0 or (time.perf_counter() - start < budget and generations < maxgenerations):
+        step()
+        generations += 1
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return generations / elapsed, peak
+
+def timePaint(board, repeats=5):
+    """
+        Function that measure the time to upload and paint a whole board with ConwaysCanvas, on the offscreen Qt platform
+        Return :
+            - milliseconds : the average time of a paint, None if PyQt5 is not available
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtWidgets import QApplication
+        from ConwaysCanvas import ConwaysCanvas
+    except ImportError:
+        return None
+    application = QApplication.instance() or QApplication([])
+    cellsize = max(1, min(20, 1024 // max(board.shape)))
+    canvas = ConwaysCanvas(cellsize, board.shape[0], board.shape[1])
+    canvas.resize(cellsize*board.shape[0] + 1, cellsize*board.shape[1] + 1)
+    canvas.simulation.set_board(board)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        canvas.refresh()
+        canvas.grab()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+def timeImport(module, repeats=5):
+    """
+        Function that measure the time to import a module in a new interpreter, with python -X importtime
+        Parameters :
+            - module : the name of the module
+            - repeats : the number of interpreters started, the fastest import being kept
+        Return :
+            - milliseconds, modules : the cumulative import time of the module and the names of every module it imported
+    """
+    best, modules = None, set()
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import %s" % module],
+                                cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stderr
+        for line in output.splitlines():
+            # import time: self [us] | cumulative | imported package
+            fields = line.split("|")
+            if len(fields) != 3 or not fields[0].startswith("import time:") or not fields[1].strip().isdigit():
+                continue
+            name = fields[2].strip()
+            modules.add(name)
+            if name == module:
+                milliseconds = int(fields[1]) / 1000.0
+                best = milliseconds if best is None else min(best, milliseconds)
+    return best, modules
+
+def timeImports(modules=IMPORT_MODULES, repeats=5):
+    """
+        Function that measure the import time of the modules and check that the core ones do not import PyQt5
+        Return :
+            - results : a list of results as in the suite reports, "qt" telling if PyQt5 was imported, "numpy" if NumPy
+              was and "ceiling" the longest import time allowed, in milliseconds
+    """
+    results = []
+    for module, qtallowed, ceiling in modules:
+        milliseconds, imported = timeImport(module, repeats)
+        results.append({"kind" : "import", "size" : [], "module" : module, "milliseconds" : milliseconds,
+                        "qt" : "PyQt5" in imported, "qt_allowed" : qtallowed, "numpy" : "numpy" in imported,
+                        "ceiling" : ceiling})
+    return results
+
+# Whether an import result breaks its guards : a core module importing PyQt5, or an import slower than its ceiling
+def importFailed(result):
+    if result["qt"] and not result["qt_allowed"]:
+        return True
+    return result.get("ceiling") is not None and result["milliseconds"] > result["ceiling"]
+
+# Get the current commit of the repository, if any
+def currentCommit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def runSuite(sizes=SUITE_SIZES, cases=SUITE_CASES, engines=("numpy", "active"), seed=SUITE_SEED, budget=0.5, paint=True, imports=True):
+    """
+        Function that run the benchmark suite : stepping speed and peak memory of every engine on every case and size,
+        time to paint and time to seed a random board on every size, and import time of the modules
+        Parameters :
+            - sizes : the (gridx, gridy) board sizes
+            - cases : the (case, density) starting boards, case being "soup" or the name of a standard pattern
+            - engines : the names of the engines, keys of SUITE_ENGINES
+            - seed : the seed of the random soups
+            - budget : the time spent stepping each measurement, in seconds
+            - paint : if False, the paint times are not measured
+            - imports : if False, the import times are not measured
+        Return :
+            - report : a dictionary ready to be written as JSON, with the machine description and the results
+    """
+    results = []
+    for gridx, gridy in sizes:
+        for case, density in cases:
+            board = caseBoard(case, density, gridx, gridy, seed)
+            for name in engines:
+                engine = SUITE_ENGINES[name](gridx, gridy)
+                engine.set_board(board)
+                rate, peak = timeSteps(engine.step, budget)
+                results.append({"kind" : "step", "size" : [gridx, gridy], "case" : case, "density" : density,
+                                "seed" : seed, "engine" : name, "generations_per_second" : rate, "peak_memory" : peak})
+                del engine
+
+        simulation = ConwaysSimulation(gridx, gridy)
+        start = time.perf_counter()
+        simulation.regen(seed)
+        results.append({"kind" : "seed", "size" : [gridx, gridy], "milliseconds" : (time.perf_counter() - start) * 1000})
+        if paint:
+            results.append({"kind" : "paint", "size" : [gridx, gridy], "milliseconds" : timePaint(randomBoard(gridx, gridy, 0.5, seed))})
+    if imports:
+        results.extend(timeImports())
+
+    return {"machine" : {"python" : platform.python_version(), "numpy" : numpy.__version__, "platform" : platform.platform(),
+                         "processor" : platform.processor(), "cpus" : os.cpu_count()},
+            "commit"  : currentCommit(),
+            "time"    : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results" : results}
+
+# Key identifying a measurement across reports
+def resultKey(result):
+    return (result["kind"], tuple(result["size"]), result.get("case"), result.get("density"), result.get("engine"), result.get("module"))
+
+def compareReports(baseline, report, tolerance=0.25):
+    """
+        Function that find the regressions of a report against a baseline report
+        Parameters :
+            - baseline, report : reports returned by runSuite
+            - tolerance : the relative slowdown allowed before a measurement is a regression
+        Return :
+            - regressions : a list of (key, baseline value, new value) tuples
+    """
+    previous = dict((resultKey(result), result) for result in baseline["results"])
+    regressions = []
+    for result in report["results"]:
+        # A core module importing PyQt5 or an import slower than its ceiling is a regression whatever the baseline
+        if result["kind"] == "import" and importFailed(result):
+            regressions.append((resultKey(result), result.get("ceiling") or 0.0, result["milliseconds"]))
+        old = previous.get(resultKey(result))
+        if old is None:
+            continue
+        if "generations_per_second" in result:
+            if result["generations_per_second"] < old["generations_per_second"] * (1 - tolerance):
+                regressions.append((resultKey(result), old["generations_per_second"], result["generations_per_second"]))
+        elif result.get("milliseconds") is not None and old.get("milliseconds") is not None:
+            if result["milliseconds"] > old["milliseconds"] * (1 + tolerance):
+                regressions.append((resultKey(result), old["milliseconds"], result["milliseconds"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of Conway's Game of Life")
+    parser.add_argument("--size", type=int, default=4096, help="side of the square board (default 4096)")
+    parser.add_argument("--generations", type=int, default=10, help="generations timed for the array backends")
+    parser.add_argument("--listsize", type=int, default=128, help="side of the board used to time the list-of-lists grid")
+    parser.add_argument("--workers", type=str, default=None, help="comma separated worker counts, e.g. 1,2,4,8, to measure the scaling of the parallel engine instead")
+    parser.add_argument("--rules", type=str, default=None, help="comma separated rules, e.g. B3/S23,B1357/S02468, to compare the comparisons and the lookup table of ConwaysRule.apply instead")
+    parser.add_argument("--suite", action="store_true", help="run the benchmark suite (stepping, painting, seeding) instead")
+    parser.add_argument("--sizes", type=str, default=None, help="suite board sizes, e.g. 38x20,512x512 (default 38x20 up to 4096x4096)")
+    parser.add_argument("--engines", type=str, default="numpy,active", help="suite engines among %s (default numpy,active)" % ",".join(SUITE_ENGINES))
+    parser.add_argument("--seed", type=int, default=SUITE_SEED, help="seed of the suite random soups")
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds spent stepping each suite measurement")
+    parser.add_argument("--imports", action="store_true", help="only measure the import time of the modules, the exit status is 1 if a core module imports PyQt5 or an import is slower than its ceiling")
+    parser.add_argument("--no-imports", action="store_true", help="do not measure the import times in the suite")
+    parser.add_argument("--no-paint", action="store_true", help="do not measure the paint times")
+    parser.add_argument("--output", type=str, default=None, help="write the suite report to this JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="baseline JSON report, the exit status is 1 if a measurement regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative slowdown allowed by --compare (default 0.25)")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        print("%-20s %12s %8s %6s %6s" % ("module", "milliseconds", "ceiling", "qt", "numpy"))
+        results = timeImports()
+        for result in results:
+            print("%-20s %12.2f %8d %6s %6s%s" % (result["module"], result["milliseconds"], result["ceiling"], result["qt"],
+                                                 result["numpy"], "  FAILED" if importFailed(result) else ""))
+        return 1 if any(importFailed(result) for result in results) else 0
+
+    if args.suite:
+        sizes = SUITE_SIZES
+        if args.sizes:
+            sizes = [tuple(int(side) for side in size.split("x")) for size in args.sizes.split(",")]
+        report = runSuite(sizes, SUITE_CASES, args.engines.split(","), args.seed, args.budget, not args.no_paint, not args.no_imports)
+        if args.output:
+            with open(args.output, "w") as target:
+                json.dump(report, target, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+
+        if args.compare:
+            with open(args.compare) as source:
+                regressions = compareReports(json.load(source), report, args.tolerance)
+            for key, old, new in regressions:
+                print("Regression %s : %.4f -> %.4f" % (key, old, new), file=sys.stderr)
+            return 1 if regressions else 0
+        return 0
+
+    if args.rules:
+        print("%-8s %-22s %11s %12s %12s %8s" % ("side", "rule", "comparisons", "compare ms", "lookup ms", "apply"))
+        for side in sorted({64, 256, args.size}):
+            for result in compareRuleApply([side], args.rules.split(",")):
+                print("%-8d %-22s %11d %12.3f %12.3f %8s" % result)
+        return 0
+
+    print("Board %dx%d" % (args.size, args.size))
+    if args.workers:
+        print("%-8s %18s %10s" % ("workers", "generations/s", "speedup"))
+        for count, rate, speedup in compareWorkers(args.size, args.size, args.generations, [int(count) for count in args.workers.split(",")]):
+            print("%-8d %18.4f %10.2f" % (count, rate, speedup))
+        return
+
+    print("%-16s %16s %18s" % ("backend", "bytes per cell", "generations/s"))
+    for name, bytespercell, rate, note in compareBackends(args.size, args.size, args.generations, args.listsize):
+        print("%-16s %16.3f %18.4f  %s" % (name, bytespercell, rate, note))
+
+
+if __name__ == """__main__""":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+from numpy import asarray, bitwise_and, bitwise_or, flatnonzero, packbits, unpackbits, uint64, zeros
+
+from ConwaysRule import makeRule
+from ConwaysTopology import TOPOLOGIES, checkTopology
+
+# Number of cells stored in a single packed word
+WORDBITS = 64
+
+# Number of set bits of packed words, with numpy.bitwise_count when available (NumPy 2)
+def popcount(words):
+    if hasattr(numpy, "bitwise_count"):
+        return int(numpy.bitwise_count(words).sum())
+    return int(unpackbits(words.view('uint8')).sum())
+
+class ConwaysBitBoard:
+    """
+        Compact board storing 1 bit per cell in uint64 words, for very large grids.
+
+        Each row board[x] is packed along y : cell (x, y) is bit y % 64 of word y // 64 of row x. A generation is computed
+        on whole words at once with full-adder logic (64 cells per operation). The rows above and below the board and
+        the bits on the left and right of every row are ghost cells filled according to the topology, as
+        ConwaysTopology.fillGhosts does for the array engines.
+
+        Parameters :
+            - gridx, gridy : the size of the board
+            - rule : the Life-like rule, a ConwaysRule or a rule string as "B36/S23", Conway's B3/S23 by default
+            - topology : the boundary of the board, "dead", "torus", "klein" or "cross" (see ConwaysTopology.TOPOLOGIES)
+    """
+    def __init__(self, gridx=10, gridy=10, rule=None, topology="dead"):
+        self.generation = 0
+        self.rule       = makeRule(rule)
+        self.topology   = checkTopology(topology)
+        self.trackChanges = False
+        self.births     = 0
+        self.deaths     = 0
+        self._allocate(gridx, gridy)
+
+    # Allocate an empty packed board of the given size
+    def _allocate(self, gridx, gridy):
+        self.gridheight = gridx
+        self.gridwidth  = gridy
+        self.nwords     = (self.gridwidth + WORDBITS - 1) // WORDBITS
+        self.words      = zeros((self.gridheight, self.nwords), dtype=uint64)
+
+        # Mask of the bits of the last word of a row that are inside the board
+        self.__lastbits = self.gridwidth - (self.nwords - 1) * WORDBITS
+        self.__lastmask = uint64((1 << self.__lastbits) - 1)
+
+    # Shift every row by one cell towards higher y, carrying bits across words, the first bit of each row being carry
+    def _shiftUp(self, words, carry=None):
+        shifted = words << uint64(1)
+        shifted[:, 1:] |= words[:, :-1] >> uint64(WORDBITS - 1)
+        if carry is not None:
+            shifted[:, 0] |= carry
+        return shifted
+
+    # Shift every row by one cell towards lower y, carrying bits across words, the last bit of each row being carry
+    def _shiftDown(self, words, carry=None):
+        shifted = words >> uint64(1)
+        shifted[:, :-1] |= words[:, 1:] << uint64(WORDBITS - 1)
+        if carry is not None:
+            shifted[:, -1] |= carry << uint64(self.__lastbits - 1)
+        return shifted
+
+    # Get a packed row with its cells in the reverse order
+    def _reverse(self, row):
+        cells = unpackbits(row.astype('<u8').view('uint8'), bitorder='little')[:self.gridwidth][::-1]
+        padded = zeros(self.nwords * WORDBITS, dtype=bool)
+        padded[:self.gridwidth] = cells
+        return packbits(padded, bitorder='little').view('<u8').astype(uint64)
+
+    def _padWords(self):
+        """
+            Function that surround the packed board with its ghost cells, according to the topology
+            Return :
+                - padded : the packed rows with a ghost row above and below, (gridheight+2) x nwords
+                - left, right : the ghost cells on the left and on the right of every padded row, as 0 or 1 words,
+                  None if they are dead
+        """
+        wrapx, flipx, wrapy, flipy = TOPOLOGIES[self.topology]
+        padded = zeros((self.gridheight+2, self.nwords), dtype=uint64)
+        padded[1:-1] = self.words
+        if wrapx:
+            padded[0]  = self._reverse(self.words[-1]) if flipx else self.words[-1]
+            padded[-1] = self._reverse(self.words[0]) if flipx else self.words[0]
+        if not wrapy:
+            return padded, None, None
+        first = padded[:, 0] & uint64(1)
+        last  = (padded[:, -1] >> uint64(self.__lastbits - 1)) & uint64(1)
+        if flipy:
+            return padded, last[::-1].copy(), first[::-1].copy()
+        return padded, last, first
+
+    def step(self):
+        """
+            Function that advance the board by one generation, 64 cells at a time
+            Return :
+                - words : the new packed board
+            Note : the 8 neighbours of every bit are added with full adders, giving the count as the bits s0 (1), s1 (2),
+            s2 (4) and s3 (8). The rule is then applied with one bitwise match per neighbour count that gives a live
+            cell in its table, for Conway's rule (count == 3) | (alive & count == 2).
+        """
+        if self.gridheight == 0 or self.nwords == 0:
+            return self.words
+
+        padded, left, right = self._padWords()
+        def rows(carry, start): # Ghost cells of the rows of up (0), mid (1) or down (2)
+            return None if carry is None else carry[start:start+self.gridheight]
+        up   = padded[:-2] # Row x-1
+        mid  = self.words
+        down = padded[2:]  # Row x+1
+
+        # Rows above and below : 3 cells each, added with a full adder into a 2-bit number
+        a, b, c = self._shiftUp(up, rows(left, 0)), up, self._shiftDown(up, rows(right, 0))
+        u0 = a ^ b ^ c
+        u1 = (a & b) | (c & (a ^ b))
+        a, b, c = self._shiftUp(down, rows(left, 2)), down, self._shiftDown(down, rows(right, 2))
+        d0 = a ^ b ^ c
+        d1 = (a & b) | (c & (a ^ b))
+
+        # Same row : the 2 side cells, added with a half adder
+        a, c = self._shiftUp(mid, rows(left, 1)), self._shiftDown(mid, rows(right, 1))
+        m0 = a ^ c
+        m1 = a & c
+
+        # Ones
+        s0 = u0 ^ d0 ^ m0
+        c0 = (u0 & d0) | (m0 & (u0 ^ d0))
+        # Twos, u1 + d1 + m1 + c0
+        t0 = u1 ^ d1 ^ m1
+        t1 = (u1 & d1) | (m1 & (u1 ^ d1))
+        s1 = t0 ^ c0
+        c1 = t0 & c0
+        # Fours and eights
+        s2 = t1 ^ c1
+        s3 = t1 & c1
+
+        nextwords = self._applyRule(mid, (s0, s1, s2, s3))
+        nextwords[:, -1] &= self.__lastmask
+        if self.trackChanges:
+            self.births = popcount(nextwords & ~mid)
+            self.deaths = popcount(mid & ~nextwords)
+        self.words = nextwords
+        self.generation += 1
+        return self.words
+
+    def _applyRule(self, alive, bits):
+        """
+            Function that apply the rule to packed cells given their state and the bits of their number of live neighbours
+            Parameters :
+                - alive : the packed cells
+                - bits : the packed bits s0 (1), s1 (2), s2 (4) and s3 (8) of the number of live neighbours
+            Return :
+                - nextwords : the packed cells at the next generation
+        """
+        table = self.rule.table
+        notbits = [~bit for bit in bits]
+        nextwords = zeros(alive.shape, dtype=uint64)
+        for count in range(9):
+            born, survive = table[0][count], table[1][count]
+            if born or survive:
+                match = bits[0] if count & 1 else notbits[0]
+                for index in (1, 2, 3):
+                    match = match & (bits[index] if count >> index & 1 else notbits[index])
+                nextwords |= match if born and survive else match & alive if survive else match & ~alive
+        return nextwords
+
+    # Advance the board by a given number of generations
+    def run(self, generations):
+        for _ in range(generations):
+            self.step()
+        return self.words
+
+    # Number of bytes used to store the cells
+    def nbytes(self):
+        return self.words.nbytes
+
+    # Number of live cells
+    def population(self):
+        return popcount(self.words)
+
+    # Get the bounding box of the live cells, as a (x0, y0, x1, y1) cell range, None if there is none
+    def liveBounds(self):
+        rows = flatnonzero(self.words.any(axis=1))
+        if len(rows) == 0:
+            return None
+        columns = bitwise_or.reduce(self.words[rows[0]:rows[-1]+1], axis=0)
+        columns = flatnonzero(unpackbits(columns.astype('<u8').view('uint8'), bitorder='little'))
+        return (int(rows[0]), int(columns[0]), int(rows[-1]) + 1, int(columns[-1]) + 1)
+
+    # *----------------------------GET--SET------------------------------------*
+    # Get the rule of the game
+    def get_rule (self):
+        return self.rule
+
+    # Set the rule of the game, a ConwaysRule or a rule string as "B36/S23"
+    def set_rule (self, rule):
+        self.rule = makeRule(rule)
+
+    # Get the boundary topology of the board
+    def get_topology (self):
+        return self.topology
+
+    # Set the boundary topology of the board, "dead", "torus", "klein" or "cross"
+    def set_topology (self, topology):
+        self.topology = checkTopology(topology)
+
+    # Get the state of the cell (x, y), 1 if alive and 0 otherwise
+    def get_cell (self, x, y):
+        return int(self.words[x, y // WORDBITS] >> uint64(y % WORDBITS)) & 1
+
+    # Set the state of the cell (x, y)
+    def set_cell (self, x, y, value):
+        bit = uint64(1) << uint64(y % WORDBITS)
+        if value:
+            self.words[x, y // WORDBITS] |= bit
+        else:
+            self.words[x, y // WORDBITS] &= ~bit
+
+    # Toggle the state of the cell (x, y), as a mouse click does
+    def toggle_cell (self, x, y):
+        self.words[x, y // WORDBITS] ^= uint64(1) << uint64(y % WORDBITS)
+
+    # Set many cells to the same state in one write, xs and ys being arrays of coordinates inside the board
+    def set_cells (self, xs, ys, value):
+        ys = asarray(ys)
+        words, bits = (asarray(xs), ys // WORDBITS), uint64(1) << (ys % WORDBITS).astype(uint64)
+        if value:
+            bitwise_or.at(self.words, words, bits)
+        else:
+            bitwise_and.at(self.words, words, ~bits)
+
+    # Get the board as a boolean array, as used by ConwaysEngine
+    def get_board (self):
+        cells = unpackbits(self.words.astype('<u8').view('uint8'), axis=1, bitorder='little')
+        return cells[:, :self.gridwidth].astype(bool)
+
+    # Set the board from any array-like of booleans, resizing if needed
+    def set_board (self, board):
+        board = asarray(board, dtype=bool)
+        if board.shape != (self.gridheight, self.gridwidth):
+            self._allocate(board.shape[0], board.shape[1])
+        padded = zeros((self.gridheight, self.nwords * WORDBITS), dtype=bool)
+        padded[:, :self.gridwidth] = board
+        self.words = packbits(padded, axis=1, bitorder='little').view('<u8').astype(uint64)
@@ -1,13 +1,52 @@
 # -*- coding: utf-8 -*-
 
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
-from PyQt5.QtCore import *
-from numpy import array, zeros
-from random import choice
+import time
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QPainter
+from PyQt5.QtWidgets import QWidget
+
+from numpy import arange, concatenate
+
+from ConwaysRenderer import ConwaysRenderer
+from ConwaysSimulation import ConwaysSimulation
+from ConwaysStatistics import PROFILER
+
+def lineCells(x0, y0, x1, y1):
+    """
+        Function that get the cells of the Bresenham line between two cells, computed at once for the whole line
+        Parameters :
+            - x0, y0, x1, y1 : the first and the last cells of the line, both included
+        Return :
+            - xs, ys : the coordinates of the cells, one per step along the longest axis
+    """
+    dx, dy = x1 - x0, y1 - y0
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return arange(x0, x0+1), arange(y0, y0+1)
+    t = arange(steps + 1)
+    # Nearest cell to the exact line at every step, rounding half away from the start
+    xs = x0 + (2*dx*t + steps) // (2*steps) if dx >= 0 else x0 - (2*(-dx)*t + steps) // (2*steps)
+    ys = y0 + (2*dy*t + steps) // (2*steps) if dy >= 0 else y0 - (2*(-dy)*t + steps) // (2*steps)
+    return xs, ys
 
 class ConwaysCanvas(QWidget):
-    def __init__(self, cellsize=20, gridx=10, gridy=10, parent=None):
+    """
+        View of a ConwaysSimulation : draws its board and edits it with the mouse, the rules live in the simulation
+
+        The canvas is a viewport over the board : the cell origin is drawn in the upper left corner and only the cells
+        that fit in the widget are read and drawn, so the board can be unbounded (ConwaysChunkedEngine). Dragging with
+        the right or middle button pans the view and the mouse wheel zooms around the pointer.
+
+        Drawing with the left button sets the cells along the stroke to the opposite of the state of the first cell,
+        so a click toggles a cell. The cells between two mouse events are filled with Bresenham lines and gathered in
+        a pending batch, applied once per pass of the event loop with a single call to set_cells (through the runner,
+        between two generations) and drawn at once in the touched rectangle only.
+
+        With attachViewer the canvas is a viewer : it shows the generations of a stream (ConwaysStreamClient) and
+        neither steps nor edits the board, the mouse wheel still zooming.
+    """
+    def __init__(self, cellsize=20, gridx=10, gridy=10, parent=None, simulation=None):
         super(ConwaysCanvas, self).__init__()
         self.gridheight = gridx
         self.gridwidth  = gridy
@@ -16,210 +55,251 @@ class ConwaysCanvas(QWidget):
         self.colorOn    = [100,100,255] # Blue
         self.colorOff   = [255,255,255] # White
 
-        self.valueOn    = 0
-        self.valueOff   = 1
-        self.grid       = []
+        self.simulation = simulation if simulation is not None else ConwaysSimulation(self.gridheight, self.gridwidth)
+        self.renderer   = ConwaysRenderer(self.cellsize, self.colorOn, self.colorOff, self.colorLine)
+        self.runner     = None
+        self.viewer     = None
+        self.origin     = [0, 0]
+        self.__shown    = None
+        self.__region   = self.region()
+        self.__pan      = None
+        self.__stroke   = None # Last cell of the stroke being drawn and the state it sets
+        self.__pending  = []   # (xs, ys, value) batches drawn since the last flush
         self.cleargrid()
 
-        # Initialize values, chose the lowest value that wouldn't be reached normally as initial values
-        self.__oldmouseMovePos_x = -1
-        self.__oldmouseMovePos_y = -1
-
     # Function called when Reset is pressed
     def regen(self):
-        self.grid           = self._generateRandomgrid()
-        self.update()
+        self._edit(self.simulation.regen)
 
     # Clear grid by setting each value to off
     def cleargrid(self):
-        self.grid           = [[self.valueOff]*self.gridwidth]*self.gridheight
-        self.applyRules()
-        self.update()
+        self._edit(self.simulation.cleargrid)
+
+    # Go back to a generation retained by the history of the simulation
+    def rewind(self, generation):
+        self._edit(lambda: self.simulation.rewind(generation))
+
+    # Go back to the previous generation retained by the history of the simulation
+    def stepBack(self):
+        self._edit(self.simulation.stepBack)
+
+    # Run the simulation on a background ConwaysRunner, the canvas then shows the generations it publishes
+    def attachRunner(self, runner):
+        self.runner = runner
+        self.runner.set_region(self.__region)
+
+    # Show the generations of a stream instead of a simulation, e.g. a ConwaysStreamClient, the board cannot be edited anymore
+    def attachViewer(self, viewer):
+        self.viewer = viewer
+        self.runner = None
+
+    # Get the cell range shown by the widget, as (x0, y0, x1, y1), x1 and y1 excluded
+    def region(self):
+        size = max(1, self.cellsize)
+        if self.testAttribute(Qt.WA_Resized) or self.isVisible():
+            columns, rows = -(-self.width() // size), -(-self.height() // size)
+        else:
+            columns, rows = self.gridheight, self.gridwidth
+        return (self.origin[0], self.origin[1], self.origin[0] + columns, self.origin[1] + rows)
+
+    # The origin, the cell size or the widget size changed, the new region is read and drawn
+    def _viewChanged(self):
+        region = self.region()
+        if region == self.__region:
+            self.update()
+            return
+        self.__region = region
+        if self.runner is not None:
+            self.runner.set_region(region)
+        else:
+            self.refresh()
+
+    # Get the cell under a point of the widget, None if it is outside a bounded board unless clip is False
+    def _cellAt(self, point, clip=True):
+        x = self.origin[0] + point.x() // max(1, self.cellsize)
+        y = self.origin[1] + point.y() // max(1, self.cellsize)
+        if clip and self.simulation.get_topology() != "infinite":
+            if not (0 <= x < self.simulation.gridheight and 0 <= y < self.simulation.gridwidth):
+                return None
+        return x, y
+
+    # Apply a change to the simulation, through the runner when there is one so it never runs during a step
+    def _edit(self, function, rects=None):
+        if self.viewer is not None:
+            return
+        if self.runner is not None:
+            self.runner.submit(function, rects)
+        else:
+            function()
+            self.refresh(rects)
+
+    # Get the state of a cell as shown by the widget, False outside the shown region
+    def _shownCell(self, x, y):
+        x0, y0 = self.__region[0], self.__region[1]
+        board = self.__shown
+        if board is None or not (0 <= x - x0 < board.shape[0] and 0 <= y - y0 < board.shape[1]):
+            return False
+        return bool(board[x - x0, y - y0])
+
+    # Add cells to the pending batch, applied at the next pass of the event loop
+    def _draw(self, xs, ys, value):
+        if not self.__pending:
+            QTimer.singleShot(0, self._flushEdits)
+        self.__pending.append((xs, ys, value))
+
+    def _flushEdits(self):
+        """
+            Function that apply the pending batch of drawn cells : it is drawn at once in the touched rectangle of the
+            view, then written to the board with one set_cells call, through the runner when there is one
+        """
+        pending, self.__pending = self.__pending, []
+        for value in (False, True):
+            batches = [(xs, ys) for xs, ys, state in pending if state == value]
+            if not batches:
+                continue
+            xs = concatenate([batch[0] for batch in batches])
+            ys = concatenate([batch[1] for batch in batches])
+            if self.simulation.get_topology() != "infinite":
+                inside = (xs >= 0) & (xs < self.simulation.gridheight) & (ys >= 0) & (ys < self.simulation.gridwidth)
+                xs, ys = xs[inside], ys[inside]
+            if len(xs) == 0:
+                continue
+            rect = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+
+            # The shown board is updated at once, the runner publishing the edited board after its current step
+            if self.runner is not None and self.__shown is not None:
+                x0, y0 = self.__region[0], self.__region[1]
+                inside = (xs >= x0) & (xs < x0 + self.__shown.shape[0]) & (ys >= y0) & (ys < y0 + self.__shown.shape[1])
+                if inside.any():
+                    lx, ly = xs[inside] - x0, ys[inside] - y0
+                    self.__shown[lx, ly] = value
+                    self._show(self.__shown, [(int(lx.min()), int(ly.min()), int(lx.max()) + 1, int(ly.max()) + 1)])
+            self._edit(lambda xs=xs, ys=ys, value=value: self.simulation.set_cells(xs, ys, value), [rect])
+
+    # Show the latest generation published by the runner or received by the viewer, called at the display refresh rate
+    def showLatest(self):
+        frame = (self.viewer or self.runner).latest()
+        if frame is not None:
+            generation, board, rects = frame
+            self._show(board, rects)
 
     # Update grid
     def updateGridEvent(self):
-        if len(self.grid) != 0:
-            self.applyRules()
+        if self.gridheight != 0:
+            self.simulation.step()
+
+            # Only upload and repaint the regions that changed in this generation, nothing for a still life
+            rects = self.simulation.dirtyRects()
+            if rects:
+                self.refresh(rects)
+
+    # Upload the given (x0, y0, x1, y1) cell regions of the board to the renderer and repaint them, the whole view if None
+    def refresh(self, rects=None):
+        if self.runner is None and self.viewer is None:
+            x0, y0, x1, y1 = self.__region
+            if rects is not None:
+                rects = [(max(a, x0) - x0, max(b, y0) - y0, min(c, x1) - x0, min(d, y1) - y0)
+                         for a, b, c, d in rects if a < x1 and c > x0 and b < y1 and d > y0]
+            self._show(self.simulation.get_region(x0, y0, x1, y1), rects)
+        elif self.__shown is not None:
+            self._show(self.__shown, None)
+
+    # Upload regions of a board to the renderer and repaint them
+    def _show(self, board, rects):
+        self.__shown = board
+        self.renderer.upload(board, rects)
+        if rects is None:
             self.update()
+        else:
+            for x0, y0, x1, y1 in rects:
+                self.update(self.renderer.cellRect(x0, y0, x1, y1))
 
-    # Draw and colour squares depending on values
+    # Draw the board from the renderer's pixel buffer, the time of the paint goes to the simulation records and the profiler
     def paintEvent(self, e):
-        # Check if grid exists
-        if len(self.grid) != 0:
-
-            # Define painter object and pen
-            qp = QPainter(self)
-            qp.setPen(QColor(self.colorLine[0], self.colorLine[1], self.colorLine[2]))
-
-            # Iterate through grid rows
-            for xk in range(len(self.grid)):
-
-                # Iterate through grid columns
-                for yk in range(len(self.grid[0])):
-
-                    # If cell value is 1, set pen color to colorOn (blue)
-                    if self.grid[xk][yk] == self.valueOn:
-                        qp.setBrush(QColor(self.colorOn[0], self.colorOn[1], self.colorOn[2]))
-
-                    # If cell value is 0, set pen color to colorOff (white)
-                    else :
-                        qp.setBrush(QColor(self.colorOff[0], self.colorOff[1], self.colorOff[2]))
+        start = time.perf_counter()
+        qp = QPainter(self)
+        self.renderer.paint(qp, e.rect())
+        qp.end()
+        self.simulation.paintTime = time.perf_counter() - start
+        PROFILER.record("paint", self.simulation.paintTime)
 
-                    # Draw Rectangle on provided coordinates
-                    qp.drawRect(self.cellsize*xk, self.cellsize*yk, self.cellsize*(xk+1), self.cellsize*(yk+1))
+    # Called when the widget is resized, more or less cells are shown
+    def resizeEvent(self, event):
+        self._viewChanged()
 
     # Called when mouse is pressed
     def mousePressEvent(self, event):
-        # If left button is pressed
-        if event.buttons() == Qt.LeftButton:
-            # Update old mouse position
-            self.__oldmouseMovePos_x = max(min(event.x()//self.cellsize, self.gridheight-1), 0)
-            self.__oldmouseMovePos_y = max(min(event.y()//self.cellsize, self.gridwidth-1), 0)
-
-            # Set value of cell to 1
-            self.grid[max(min(event.x()//self.cellsize, self.gridheight-1), 0)][max(min(event.y()//self.cellsize, self.gridwidth-1), 0)] = 1 ^ self.grid[max(min(event.x()//self.cellsize, self.gridheight-1), 0)][max(min(event.y()//self.cellsize, self.gridwidth-1), 0)]
-            self.update()
+        # A viewer shows the streamed region as it is
+        if self.viewer is not None:
+            return
+
+        # If the right or middle button is pressed, start panning
+        if event.buttons() & (Qt.RightButton | Qt.MiddleButton):
+            self.__pan = (event.pos(), list(self.origin))
+
+        # If left button is pressed, start a stroke setting the cells to the opposite of the first one
+        elif event.buttons() == Qt.LeftButton:
+            cell = self._cellAt(event.pos())
+            if cell is None:
+                return
+            value = not self._shownCell(*cell)
+            self.__stroke = (cell, value)
+            self._draw(*lineCells(cell[0], cell[1], cell[0], cell[1]), value)
 
     # Called whenever mouse is moved
     def mouseMoveEvent(self, event):
-
-        # If left mouse button is being pressed
-        if event.buttons() == Qt.LeftButton:
-            if self.__oldmouseMovePos_x != max(min(event.x()//self.cellsize, self.gridheight-1), 0) or self.__oldmouseMovePos_y != max(min(event.y()//self.cellsize, self.gridwidth-1), 0) :
-                self.grid[max(min(event.x()//self.cellsize, self.gridheight-1), 0)][max(min(event.y()//self.cellsize, self.gridwidth-1), 0)] = 1 ^ self.grid[max(min(event.x()//self.cellsize, self.gridheight-1), 0)][max(min(event.y()//self.cellsize, self.gridwidth-1), 0)]
-                self.update()
-            self.__oldmouseMovePos_x = max(min(event.x()//self.cellsize, self.gridheight-1), 0)
-            self.__oldmouseMovePos_y = max(min(event.y()//self.cellsize, self.gridwidth-1), 0)
-
-
-    def _getNeighbours(self, x, y):
-        """
-            Function that, for a given cell, identified with its coordinates x and y, return the coordinates and values of its neighbours
-            Parameters :
-                - x : the coordinate of the cell on the x-axis
-                - y : the coordinate of the cell on the y-axis
-            Return :
-                - neighbours : a dictionary containing the coordinates and the values of the neighbours of the cell
-            Note : to access to the value of a given cell neighbour, use 'neighbours[x][y]', considering that 'neighbours' is returned by the function and 'x' and 'y' are the coordinates of the cell of which we want to have access
-        """
-        neighbours = {}
-        if (x == 0):
-            if (y == 0): # Upper left corner
-                neighbours = {(x,y+1):self.grid[x][y+1],(x+1,y):self.grid[x+1][y],(x+1,y+1):self.grid[x+1][y+1]}
-            elif (y == len(self.grid[0])-1): # Upper right corner
-                neighbours = {(x,y-1):self.grid[x][y-1],(x+1,y):self.grid[x+1][y],(x+1,y-1):self.grid[x+1][y-1]}
-            else: # Upper border
-                neighbours = {(x,y-1):self.grid[x][y-1],(x,y+1):self.grid[x][y+1],(x+1,y-1):self.grid[x+1][y-1],(x+1,y):self.grid[x+1][y],(x+1,y+1):self.grid[x+1][y-1]}
-        elif (x == len(self.grid)-1):
-            if (y == 0): # Left down corner
-                neighbours = {(x-1,y):self.grid[x-1][y],(x,y+1):self.grid[x][y+1],(x-1,y+1):self.grid[x-1][y+1]}
-            elif (y == len(self.grid[0])-1): # Right down corner
-                neighbours = {(x,y-1):self.grid[x][y-1],(x-1,y):self.grid[x-1][y],(x-1,y-1):self.grid[x-1][y-1]}
-            else: # Down border
-                neighbours = {(x,y+1):self.grid[x][y+1],(x,y-1):self.grid[x][y-1],(x-1,y-1):self.grid[x-1][y-1],(x-1,y):self.grid[x-1][y],(x-1,y+1):self.grid[x-1][y+1]}
-        else:
-            if(y == 0): # Left border
-                neighbours = {(x-1,y):self.grid[x-1][y],(x+1,y):self.grid[x+1][y],(x-1,y+1):self.grid[x-1][y+1],(x,y+1):self.grid[x][y+1],(x+1,y+1):self.grid[x+1][y+1]}
-            elif(y == len(self.grid[0])-1): # Right border
-                neighbours = {(x-1,y):self.grid[x-1][y],(x+1,y):self.grid[x+1][y],(x-1,y-1):self.grid[x-1][y-1],(x,y-1):self.grid[x][y-1],(x+1,y-1):self.grid[x+1][y-1]}
-            else: # Middle
-                neighbours = {(x-1,y-1):self.grid[x-1][y-1],(x-1,y):self.grid[x-1][y],(x-1,y+1):self.grid[x-1][y+1],(x,y-1):self.grid[x][y-1],(x,y+1):self.grid[x][y+1],(x+1,y-1):self.grid[x+1][y-1],(x+1,y):self.grid[x+1][y],(x+1,y+1):self.grid[x+1][y+1]}
-        neighbours.update({(x,y):2}) # Add the value of the cell for which we look the neighbours, make sure not to use the value 2 for either self.valueOn and self.valueOff as it's used here
-        return neighbours
-
-    def _countNeighbours(self, x, y):
-        """
-            Function that, for a given cell, identified with its coordinates x and y, return the number of cells in its neighbourhood that are on and the number that are off
-            Parameters :
-                - x : the coordinate of the cell on the x-axis
-                - y : the coordinate of the cell on the y-axis
-            Return :
-                - numberOn, numberOff : the number of cells neighbouring a particular cell that are on and off
-        """
-        
-        # Initialize both cells to 0
-        numberOn, numberOff = 0, 0
-
-        # Get a dictionary containing the neighbors of a particular cell
-        neighbours = self._getNeighbours(x, y)
-
-        # Iterate through neighbors
-        for key in neighbours.keys(): # we go through all the keys in the dict, so all the coordinates of the neighbours
-            
-            # If neighbour is alive, increment numberOn
-            if(neighbours[key] == self.valueOn):
-                numberOn += 1
-
-            # If neighbour is dead, increment numberOff
-            elif(neighbours[key] == self.valueOff):
-                numberOff += 1
-        return numberOn, numberOff
-
-    def applyRules(self):
-        """
-            Function that, for a given grid, apply the rules of the game (see below for the detail)
-
-            Return :
-                - nextgrid : the self.grid updated with the rules of the game (see below for the detail)
-            Note : the rules are the following
-                1. Any live cell with fewer than two live neighbours dies, as if caused by underpopulation.
-                2. Any live cell with two or three live neighbours lives on to the next generation.
-                3. Any live cell with more than three live neighbours dies, as if by overpopulation.
-                4. Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
-        """
-        
-        # Initialize array with 0's
-        nextgrid = [[self.valueOff for y in range(len(self.grid[0]))] for x in range(len(self.grid))]
-
-        # Iterate through rows and columns
-        for x in range(len(self.grid)): # we go through all the point on the x-axis
-            for y in range(len(self.grid[0])): # we go through all the point on the y-axis
-
-                # Count the number of neighbours both dead and alive
-                numberOn, numberOff = self._countNeighbours(x, y)
-
-                # Apply rules defined above depending on conditions met
-                if(self.grid[x][y] == self.valueOn): # For the rules 1, 2 and 3
-                    if(numberOn < 2): # For the rule 1
-                        nextgrid[x][y] = self.valueOff
-                    elif(numberOn == 2 or numberOn == 3): # For the rule 2
-                        nextgrid[x][y] = self.valueOn
-                    elif(numberOn > 3): # For the rule 3
-                        nextgrid[x][y] = self.valueOff
-                elif(self.grid[x][y] == self.valueOff and numberOn == 3): # For the rule 4
-                    nextgrid[x][y] = self.valueOn
-        self.grid = nextgrid
-
-    # Generate a random array of 1's and 0's
-    def _generateRandomgrid(self):
-        # Fill grid initially with 0's
-        self.grid = zeros((self.gridheight, self.gridwidth), dtype=int)
-
-        # Iterate through rows
-        for x in range(len(self.grid)):
-
-            # Iterate through columns
-            for y in range(len(self.grid[0])):
-                self.grid[x][y] = choice([self.valueOn, self.valueOff]) # for each cell, we choose randomly a value between self.valueOn and self.valueOff
-        return self.grid
+        # Move the view with the pointer while panning
+        if self.__pan is not None and event.buttons() & (Qt.RightButton | Qt.MiddleButton):
+            start, origin = self.__pan
+            size = max(1, self.cellsize)
+            self.origin = [origin[0] - (event.x() - start.x()) // size, origin[1] - (event.y() - start.y()) // size]
+            self._viewChanged()
+
+        # If left mouse button is being pressed, continue the stroke with the cells between the two positions
+        elif event.buttons() == Qt.LeftButton and self.__stroke is not None:
+            (x0, y0), value = self.__stroke
+            cell = self._cellAt(event.pos(), clip=False)
+            if cell != (x0, y0):
+                xs, ys = lineCells(x0, y0, cell[0], cell[1])
+                self._draw(xs[1:], ys[1:], value)
+                self.__stroke = (cell, value)
+
+    # Called when the mouse button is released, stop panning and apply the stroke
+    def mouseReleaseEvent(self, event):
+        self.__pan = None
+        self.__stroke = None
+        if self.__pending:
+            self._flushEdits()
+
+    # Called when the mouse wheel turns, zoom in or out keeping the cell under the pointer in place
+    def wheelEvent(self, event):
+        size = max(1, self.cellsize)
+        newsize = min(size*2, 64) if event.angleDelta().y() > 0 else max(size//2, 1)
+        if newsize != size and self.viewer is not None:
+            self.set_cellsize(newsize)
+        elif newsize != size:
+            point = event.pos()
+            x, y = self.origin[0] + point.x() // size, self.origin[1] + point.y() // size
+            self.origin = [x - point.x() // newsize, y - point.y() // newsize]
+            self.set_cellsize(newsize)
 
 
     # *----------------------------GET--SET------------------------------------*
-    # Get the value that represents a live cell on the grid (default 1)
+    # Get the value that represents a live cell on the grid (default 0)
     def get_valueOn (self):
-        return self.valueOn
+        return self.simulation.get_valueOn()
 
-    # Set the value that will represent a live cell on the grid (default 1)
+    # Set the value that will represent a live cell on the grid (default 0)
     def set_valueOn (self, valueOn):
-        self.valueOn = valueOn
+        self.simulation.set_valueOn(valueOn)
 
-    # Get the value that represents a dead cell on the grid (default 0)
+    # Get the value that represents a dead cell on the grid (default 1)
     def get_valueOff (self):
-        return self.valueOff
+        return self.simulation.get_valueOff()
 
-    # Set the value that will represent a dead cell on the grid (default 0)
+    # Set the value that will represent a dead cell on the grid (default 1)
     def set_valueOff (self, valueOff):
-        self.valueOff = valueOff
+        self.simulation.set_valueOff(valueOff)
 
     # Get the color used to represent live cells (default blue)
     def get_colorOn (self):
@@ -228,6 +308,8 @@ class ConwaysCanvas(QWidget):
     # Set the color that will be used to represent live cells (default blue)
     def set_colorOn (self, colorOn):
         self.colorOn = colorOn
+        self.renderer.set_colors(self.colorOn, self.colorOff)
+        self.refresh()
 
     # Get the color used to represent dead cells on the grid (default white)
     def get_colorOff (self):
@@ -236,14 +318,24 @@ class ConwaysCanvas(QWidget):
     # Set the color that will be used to represent dead cells (default white)
     def set_colorOff (self, colorOff):
         self.colorOff = colorOff
+        self.renderer.set_colors(self.colorOn, self.colorOff)
+        self.refresh()
 
-    # Get array of values representing the grid. Values can either be 0 or 1
+    # Get array of values representing the grid. Values can either be valueOn or valueOff
     def get_grid (self):
-        return self.grid
+        return self.simulation.get_grid()
 
     # Set values of array representing the grid
     def set_grid (self, grid):
-        self.grid = grid
+        self._edit(lambda: self.simulation.set_grid(grid))
+
+    # Get the boundary topology of the board
+    def get_topology (self):
+        return self.simulation.get_topology()
+
+    # Set the boundary topology of the board, "dead", "torus", "klein", "cross" or "infinite"
+    def set_topology (self, topology):
+        self._edit(lambda: self.simulation.set_topology(topology))
 
     # Get number of rows in grid
     def get_gridheight (self):
@@ -268,3 +360,5 @@ class ConwaysCanvas(QWidget):
     # Set the size to be used as cell width and height
     def set_cellsize (self, cellsize):
         self.cellsize = max(0,cellsize)
+        self.renderer.cellsize = self.cellsize
+        self._viewChanged()
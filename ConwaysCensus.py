@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+
+from numpy import arange, asarray, concatenate, full, int32, minimum, nonzero, packbits, rot90, split, uint8, unique, zeros
+
+from ConwaysEngine import boundsOf, sumNeighbours
+from ConwaysRule import makeRule
+
+# Objects of Conway's Game of Life given a name in the census, as rows of cells, "*" for the live ones. Every phase of
+# the oscillators and spaceships gets the name, under the 8 rotations and reflections, as ConwaysCensus groups the cells
+# an object has over its whole period
+NAMED_OBJECTS = {
+    "block"            : ["**", "**"],
+    "beehive"          : [".**.", "*..*", ".**."],
+    "loaf"             : [".**.", "*..*", ".*.*", "..*."],
+    "boat"             : ["**.", "*.*", ".*."],
+    "ship"             : ["**.", "*.*", ".**"],
+    "tub"              : [".*.", "*.*", ".*."],
+    "pond"             : [".**.", "*..*", "*..*", ".**."],
+    "long boat"        : ["**..", "*.*.", ".*.*", "..*."],
+    "barge"            : [".*..", "*.*.", ".*.*", "..*."],
+    "eater"            : ["**..", "*.*.", "..*.", "..**"],
+    "aircraft carrier" : ["**..", "*..*", "..**"],
+    "snake"            : ["**.*", "*.**"],
+    "mango"            : [".**.", "*..*", ".*..*", "..**"],
+    "blinker"          : ["***"],
+    "toad"             : [".***", "***."],
+    "beacon"           : ["**..", "**..", "..**", "..**"],
+    "clock"            : ["..*.", "*.*.", ".*.*", ".*.."],
+    "pulsar"           : ["..***...***..", ".............", "*....*.*....*", "*....*.*....*", "*....*.*....*",
+                          "..***...***..", ".............", "..***...***..", "*....*.*....*", "*....*.*....*",
+                          "*....*.*....*", ".............", "..***...***.."],
+    "pentadecathlon"   : ["..*....*..", "**.****.**", "..*....*.."],
+    "glider"           : [".*.", "..*", "***"],
+    "lwss"             : [".*..*", "*....", "*...*", "****."],
+    "mwss"             : ["...*..", ".*...*", "*.....", "*....*", "*****."],
+    "hwss"             : ["...**..", ".*....*", "*......", "*.....*", "******."],
+}
+
+# Get a board of cells from rows of "*" and ".", board[x][y] being the character x of the row y
+def _parseRows(rows):
+    board = zeros((max(len(row) for row in rows), len(rows)), dtype=bool)
+    for y, row in enumerate(rows):
+        for x, character in enumerate(row):
+            board[x][y] = character == "*"
+    return board
+
+def labelComponents(board, distance=1):
+    """
+        Function that split the live cells of a board into connected components, two live cells being linked when they
+        are at most distance cells apart along x and along y
+        Parameters :
+            - board : a boolean array
+            - distance : 1 for the cells touching by a side or a corner, 2 to also link the cells separated by a single
+              dead cell (the 5 x 5 neighbourhood), which can influence each other
+        Return :
+            - labels : an int32 array of the shape of the board, 0 for the dead cells, 1 to count for the live ones
+            - count : the number of components
+        Note : the labels are found on the live cells only, with whole-array operations : every cell starts as its
+        own root, the root of every linked pair takes the smallest of their roots, then every cell follows the roots
+        up to the last one (pointer jumping), until nothing changes, which takes a number of passes growing with the
+        log of the component sizes
+    """
+    board = asarray(board, dtype=bool)
+    labels = zeros(board.shape, dtype=int32)
+    xs, ys = nonzero(board)
+    if len(xs) == 0:
+        return labels, 0
+
+    # Index of every live cell, -1 for the dead ones, with a ring of dead cells so the neighbours need no bound check
+    index = full((board.shape[0] + 2*distance, board.shape[1] + 2*distance), -1, dtype=int32)
+    index[xs + distance, ys + distance] = arange(len(xs), dtype=int32)
+    # Links between live neighbours, in the forward half of the neighbourhood only as every link is used both ways
+    firsts, seconds = [], []
+    for dx in range(0, distance + 1):
+        for dy in range(-distance, distance + 1):
+            if dx == 0 and dy <= 0:
+                continue
+            neighbours = index[xs + distance + dx, ys + distance + dy]
+            linked = neighbours >= 0
+            firsts.append(nonzero(linked)[0].astype(int32))
+            seconds.append(neighbours[linked])
+    first, second = concatenate(firsts), concatenate(seconds)
+
+    parent = arange(len(xs), dtype=int32)
+    while True:
+        previous = parent.copy()
+        low = minimum(parent[first], parent[second])
+        minimum.at(parent, parent[first], low)
+        minimum.at(parent, parent[second], low)
+        while True:
+            jumped = parent[parent]
+            if (jumped == parent).all():
+                break
+            parent = jumped
+        if (parent == previous).all():
+            break
+
+    roots, component = unique(parent, return_inverse=True)
+    labels[xs, ys] = component + 1
+    return labels, len(roots)
+
+# Get the key of a board : its shape and its cells packed 1 bit per cell, compared and hashed as a tuple
+def _key(board):
+    return (board.shape, packbits(board, axis=None).tobytes())
+
+def canonicalForm(board):
+    """
+        Function that get the canonical form of an object, the same for all its rotations and reflections
+        Parameters :
+            - board : a boolean array cropped to the live cells of the object
+        Return :
+            - key : the smallest (shape, packed cells) key of the 8 rotations and reflections of the board
+    """
+    board = asarray(board, dtype=bool)
+    return min(_key(rot90(image, turns)) for image in (board, board.T) for turns in range(4))
+
+class ConwaysCensus:
+    """
+        Census of the objects of a settled board : still lifes, oscillators and spaceships.
+
+        The live cells are split into groups of cells at most distance cells apart (labelComponents), every group being
+        one object. The groups are found on the cells alive in any of the next maxperiod generations of the board
+        rather than on the board alone, so the parts of an oscillator or a spaceship that separate in some phases (the
+        halves of a beacon or a toad, the quarters of a pulsar, the ends of a pentadecathlon) and the objects that
+        would collide stay one object. An object is classified by running it alone on an empty plane until it comes back to its first phase, giving its
+        period and its displacement : "xs<cells>" for a still life, "xp<period>" for an oscillator, "xq<period>" for a
+        spaceship, as in the apgsearch notation, or the name of NAMED_OBJECTS under Conway's rule. Objects that die alone
+        are counted as "dies", the ones that did not come back within maxperiod generations as "unknown".
+
+        Classifying is the slow part, so the results are kept in a bounded cache, keyed by the cells of the object as
+        found and by its canonical form (canonicalForm) : a block or a blinker already seen in the same orientation only
+        costs a hash lookup, and in another orientation the 8 rotations and reflections of its cells.
+
+        Parameters :
+            - rule : the Life-like rule, a ConwaysRule or a rule string as "B36/S23", Conway's B3/S23 by default
+            - maxperiod : the number of generations an object is run for, the longest period that can be found
+            - maxcache : the maximum number of cached keys, the least recently used being evicted
+            - distance : the distance along x and y up to which two live cells belong to the same object
+        Note : objects are classified as they behave alone, so still lifes separated by a single dead cell are counted
+        as one (pseudo) still life, and objects cut by the edge of a bounded board or split by the seam of a torus are
+        classified as their separate parts.
+    """
+    def __init__(self, rule=None, maxperiod=64, maxcache=4096, distance=2):
+        self.maxperiod = maxperiod
+        self.maxcache  = maxcache
+        self.distance  = distance
+        self.hits      = 0
+        self.misses    = 0
+        self.__cache   = OrderedDict()
+        self.__names   = {}
+        self.set_rule(rule)
+
+    # Get the rule of the game
+    def get_rule (self):
+        return self.rule
+
+    # Set the rule of the game, forgetting the classified objects
+    def set_rule (self, rule):
+        self.rule = makeRule(rule)
+        self.__cache.clear()
+        self.__names = {}
+        if str(self.rule) == "B3/S23":
+            for name, rows in NAMED_OBJECTS.items():
+                for phase in self._phases(_parseRows(rows)):
+                    self.__names[canonicalForm(phase)] = name
+
+    def _advance(self, board):
+        """
+            Function that run an object alone on an empty plane for one generation
+            Parameters :
+                - board : a boolean array cropped to the live cells of the object
+            Return :
+                - board : the next generation cropped to its live cells, None if it died
+                - offset : the (dx, dy) move of its upper left corner
+        """
+        padded = zeros((board.shape[0] + 4, board.shape[1] + 4), dtype=uint8)
+        padded[2:-2, 2:-2] = board
+        board = self.rule.apply(padded[1:-1, 1:-1].astype(bool), sumNeighbours(padded))
+        bounds = boundsOf(board)
+        if bounds is None:
+            return None, (0, 0)
+        x0, y0, x1, y1 = bounds
+        return board[x0:x1, y0:y1], (x0 - 1, y0 - 1)
+
+    def _envelope(self, board):
+        """
+            Function that run a whole board on an empty plane for maxperiod generations and gather every cell alive in
+            at least one of them, so the objects that meet during their period are found in the same group
+            Parameters :
+                - board : a boolean array
+            Return :
+                - envelope : a boolean array with a margin of cells around the board, the cells alive at some point
+                - margin : the width of the margin, board[0][0] being envelope[margin][margin]
+            Note : the run stops as soon as the board comes back to its first state, after one generation for a board
+            of still lifes only
+        """
+        margin = self.maxperiod + self.distance
+        first = zeros((board.shape[0] + 2*margin, board.shape[1] + 2*margin), dtype=bool)
+        first[margin:-margin, margin:-margin] = board
+        envelope, current = first.copy(), first
+        padded = zeros((first.shape[0] + 2, first.shape[1] + 2), dtype=uint8)
+        for _ in range(self.maxperiod):
+            padded[1:-1, 1:-1] = current
+            current = self.rule.apply(current, sumNeighbours(padded))
+            if (current == first).all() or not current.any():
+                break
+            envelope |= current
+        return envelope, margin
+
+    # Get the phases of an object until it comes back to its first one, all of them if it did not within maxperiod
+    def _phases(self, board):
+        phases, first = [board], _key(board)
+        for _ in range(self.maxperiod - 1):
+            board, offset = self._advance(board)
+            if board is None or _key(board) == first:
+                break
+            phases.append(board)
+        return phases
+
+    def classify(self, board):
+        """
+            Function that classify an object by running it alone
+            Parameters :
+                - board : a boolean array cropped to the live cells of the object
+            Return :
+                - name : the name of the object, see ConwaysCensus
+        """
+        first, population = _key(board), int(board.sum())
+        dx, dy = 0, 0
+        for period in range(1, self.maxperiod + 1):
+            board, (mx, my) = self._advance(board)
+            if board is None:
+                return "dies"
+            dx, dy = dx + mx, dy + my
+            if _key(board) == first:
+                if dx == 0 and dy == 0:
+                    return "xs%d" % population if period == 1 else "xp%d" % period
+                return "xq%d" % period
+        return "unknown"
+
+    def _lookup(self, board):
+        """
+            Function that get the name of an object from the cache, classifying it on a miss
+            Parameters :
+                - board : a boolean array cropped to the live cells of the object
+            Return :
+                - name : the name of the object
+        """
+        cache = self.__cache
+        key = _key(board)
+        name = cache.get(key)
+        if name is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return name
+
+        canonical = canonicalForm(board)
+        name = cache.get(canonical)
+        if name is not None:
+            self.hits += 1
+            cache.move_to_end(canonical)
+        else:
+            self.misses += 1
+            name = self.__names.get(canonical) or self.classify(board)
+            cache[canonical] = name
+        cache[key] = name
+        while len(cache) > self.maxcache:
+            cache.popitem(last=False)
+        return name
+
+    def objects(self, board):
+        """
+            Function that find and name the objects of a board
+            Parameters :
+                - board : a boolean array
+            Return :
+                - objects : a list of (name, x0, y0, x1, y1) tuples, the name and the bounding box of every object
+        """
+        board = asarray(board, dtype=bool)
+        xs, ys = nonzero(board)
+        if len(xs) == 0:
+            return []
+        envelope, margin = self._envelope(board)
+        labels, count = labelComponents(envelope, self.distance)
+        component = labels[xs + margin, ys + margin]
+        order = component.argsort(kind="stable")
+        xs, ys, component = xs[order], ys[order], component[order]
+        starts = nonzero(component[1:] != component[:-1])[0] + 1
+
+        objects = []
+        for cellsx, cellsy in zip(split(xs, starts), split(ys, starts)):
+            x0, y0, x1, y1 = int(cellsx.min()), int(cellsy.min()), int(cellsx.max()) + 1, int(cellsy.max()) + 1
+            cells = zeros((x1 - x0, y1 - y0), dtype=bool)
+            cells[cellsx - x0, cellsy - y0] = True
+            objects.append((self._lookup(cells), x0, y0, x1, y1))
+        return objects
+
+    def census(self, board):
+        """
+            Function that count the objects of a board by name
+            Parameters :
+                - board : a boolean array
+            Return :
+                - counts : a {name : count} dictionary, sorted by decreasing count
+        """
+        counts = {}
+        for name, x0, y0, x1, y1 in self.objects(board):
+            counts[name] = counts.get(name, 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+def aggregate(censuses):
+    """
+        Function that add up the censuses of many runs
+        Parameters :
+            - censuses : an iterable of {name : count} dictionaries, as given by ConwaysCensus.census
+        Return :
+            - totals : a {"runs" : the number of runs, "objects" : {name : total count}, "occurrence" : {name : number
+              of runs it was found in}} dictionary, the names sorted by decreasing total
+    """
+    runs, totals, occurrence = 0, {}, {}
+    for counts in censuses:
+        runs += 1
+        for name, count in counts.items():
+            totals[name] = totals.get(name, 0) + count
+            occurrence[name] = occurrence.get(name, 0) + 1
+    names = sorted(totals, key=lambda name: (-totals[name], name))
+    return {"runs"       : runs,
+            "objects"    : {name : totals[name] for name in names},
+            "occurrence" : {name : occurrence[name] for name in names}}
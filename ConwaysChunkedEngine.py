@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+from numpy import asarray, bitwise_xor, count_nonzero, nonzero, stack, uint8, uint64, unique, where, zeros
+
+from ConwaysCycleDetector import cellKeys
+from ConwaysEngine import boundsOf, sumNeighbours
+from ConwaysRule import makeRule
+
+# Offset making the cell coordinates positive before they are combined into the index of cellKeys
+COORDINATE_OFFSET = 1 << 31
+
+class ConwaysChunkedEngine:
+    """
+        Unbounded board stored as a sparse map of chunks of chunksize x chunksize cells, allocated when a cell becomes
+        alive in them and freed as soon as they are empty, so the memory follows the live cells rather than the extent
+        of the pattern.
+
+        Only the active chunks, the ones that changed in the last generation and the chunks around them, are stepped :
+        every chunk is evaluated on a window made of its cells and a one-cell ring read from its 8 neighbours.
+
+        Cells are addressed with (x, y) as in the other engines, with any integer coordinates. The engine keeps a home
+        window of gridx x gridy cells starting at (0, 0), the board seen by get_board and set_board, so the simulation
+        and its regen and cleargrid work as with a bounded engine while patterns can grow out of it.
+
+        Parameters :
+            - gridx, gridy : the size of the home window
+            - chunksize : the size of a chunk, in cells
+            - rule : the Life-like rule, a ConwaysRule or a rule string as "B36/S23", Conway's B3/S23 by default. Rules
+              with B0 are refused since empty space would not stay empty
+    """
+    def __init__(self, gridx=10, gridy=10, chunksize=64, rule=None):
+        self.gridheight = gridx
+        self.gridwidth  = gridy
+        self.tilesize   = max(1, chunksize)
+        self.generation = 0
+        self.chunks     = {}
+        self.active     = set()
+        self.dirty      = set()
+        self.trackChanges = False
+        self.births     = 0
+        self.deaths     = 0
+        self.__hashes   = {}
+        self.__hash     = 0
+        self.set_rule(rule)
+
+    # *----------------------------CHUNKS------------------------------------*
+    # Get the chunk holding the cell (x, y) and the position of the cell in it
+    def _locate(self, x, y):
+        size = self.tilesize
+        return (x // size, y // size), x % size, y % size
+
+    def _window(self, key):
+        """
+            Function that build the padded window of a chunk : its cells surrounded by the nearest cells of its 8 neighbours
+            Parameters :
+                - key : the (cx, cy) key of the chunk, allocated or not
+            Return :
+                - window : a (chunksize+2) x (chunksize+2) uint8 array
+        """
+        size = self.tilesize
+        cx, cy = key
+        window = zeros((size+2, size+2), dtype=uint8)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                chunk = self.chunks.get((cx+dx, cy+dy))
+                if chunk is None:
+                    continue
+                # Rows and columns of the neighbour copied into the window, and where they go
+                xs = slice(size-1, size) if dx < 0 else slice(0, 1) if dx > 0 else slice(0, size)
+                ys = slice(size-1, size) if dy < 0 else slice(0, 1) if dy > 0 else slice(0, size)
+                wx = slice(0, 1) if dx < 0 else slice(size+1, size+2) if dx > 0 else slice(1, size+1)
+                wy = slice(0, 1) if dy < 0 else slice(size+1, size+2) if dy > 0 else slice(1, size+1)
+                window[wx, wy] = chunk[xs, ys]
+        return window
+
+    # Get the hash of the live cells of a chunk, from the keys of their global coordinates
+    def _hashChunk(self, key, chunk):
+        xs, ys = nonzero(chunk)
+        if len(xs) == 0:
+            return 0
+        xs = (xs + key[0]*self.tilesize + COORDINATE_OFFSET).astype(uint64)
+        ys = (ys + key[1]*self.tilesize + COORDINATE_OFFSET).astype(uint64)
+        return int(bitwise_xor.reduce(cellKeys((xs << uint64(32)) | ys)))
+
+    # Replace a chunk, freeing it when it is empty, and keep the hash of the board up to date
+    def _store(self, key, chunk):
+        self.__hash ^= self.__hashes.pop(key, 0)
+        if chunk is None or not chunk.any():
+            self.chunks.pop(key, None)
+            return
+        self.chunks[key] = chunk
+        self.__hashes[key] = self._hashChunk(key, chunk)
+        self.__hash ^= self.__hashes[key]
+
+    # Mark chunks as active, they and their neighbours are evaluated at the next generation
+    def _activate(self, keys):
+        for cx, cy in keys:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    self.active.add((cx+dx, cy+dy))
+
+    # *----------------------------STEPPING------------------------------------*
+    def step(self):
+        """
+            Function that advance the board by one generation, evaluating only the active chunks
+            Return :
+                - chunks : the map of the allocated chunks
+        """
+        size = self.tilesize
+        results = []
+        for key in self.active:
+            window = self._window(key)
+            if not window.any():
+                continue
+            chunk = self.chunks.get(key)
+            alive = chunk if chunk is not None else zeros((size, size), dtype=bool)
+            results.append((key, alive, self.rule.apply(alive, sumNeighbours(window))))
+
+        # Every chunk is computed from the current board before any of them is written
+        births, deaths = 0, 0
+        self.dirty = set()
+        for key, alive, nextchunk in results:
+            changed = nextchunk != alive
+            if changed.any():
+                if self.trackChanges:
+                    born = int(count_nonzero(changed & nextchunk))
+                    births, deaths = births + born, deaths + int(count_nonzero(changed)) - born
+                self._store(key, nextchunk)
+                self.dirty.add(key)
+        self.births, self.deaths = births, deaths
+
+        self.active = set()
+        self._activate(self.dirty)
+        self.generation += 1
+        return self.chunks
+
+    # Advance the board by a given number of generations
+    def run(self, generations):
+        for _ in range(generations):
+            self.step()
+        return self.chunks
+
+    # Number of live cells
+    def population(self):
+        return int(sum(int(count_nonzero(chunk)) for chunk in self.chunks.values()))
+
+    # Number of bytes used to store the cells
+    def nbytes(self):
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+    # Get the hash of the board, kept up to date chunk by chunk, used by ConwaysSimulation to detect cycles
+    def boardHash(self):
+        return self.__hash
+
+    # Get the regions that changed in the last generation, as (x0, y0, x1, y1) cell ranges, x1 and y1 excluded
+    def dirtyRects(self):
+        size = self.tilesize
+        return [(cx*size, cy*size, (cx+1)*size, (cy+1)*size) for cx, cy in sorted(self.dirty)]
+
+    # Get the bounding box of the live cells, as a (x0, y0, x1, y1) cell range, None if there is none
+    def liveBounds(self):
+        if not self.chunks:
+            return None
+        size = self.tilesize
+        bounds = []
+        for key, chunk in self.chunks.items():
+            x0, y0, x1, y1 = boundsOf(chunk)
+            bounds.append((key[0]*size + x0, key[1]*size + y0, key[0]*size + x1, key[1]*size + y1))
+        return (min(bound[0] for bound in bounds), min(bound[1] for bound in bounds),
+                max(bound[2] for bound in bounds), max(bound[3] for bound in bounds))
+
+    # *----------------------------GET--SET------------------------------------*
+    # Get the rule of the game
+    def get_rule (self):
+        return self.rule
+
+    # Set the rule of the game, a ConwaysRule or a rule string as "B36/S23", every chunk has to be evaluated again
+    def set_rule (self, rule):
+        rule = makeRule(rule)
+        if not rule.isQuiescent():
+            raise ValueError("An unbounded board cannot run %s, empty regions must stay empty (no B0)" % rule)
+        self.rule = rule
+        self._activate(list(self.chunks))
+
+    # Get the boundary of the board, an unbounded board has none
+    def get_topology (self):
+        return "infinite"
+
+    # An unbounded board has no boundary, only "infinite" is accepted
+    def set_topology (self, topology):
+        if topology != "infinite":
+            raise ValueError("An unbounded board has no %r boundary" % topology)
+
+    # Get the state of the cell (x, y), 1 if alive and 0 otherwise
+    def get_cell (self, x, y):
+        key, cx, cy = self._locate(x, y)
+        chunk = self.chunks.get(key)
+        return 0 if chunk is None else int(chunk[cx, cy])
+
+    # Set the state of the cell (x, y), allocating its chunk if needed
+    def set_cell (self, x, y, value):
+        key, cx, cy = self._locate(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if not value:
+                return
+            chunk = zeros((self.tilesize, self.tilesize), dtype=bool)
+        chunk[cx, cy] = bool(value)
+        self._store(key, chunk)
+        self._activate([key])
+
+    # Toggle the state of the cell (x, y), as a mouse click does
+    def toggle_cell (self, x, y):
+        self.set_cell(x, y, not self.get_cell(x, y))
+
+    # Set many cells to the same state, with one write per chunk they fall in
+    def set_cells (self, xs, ys, value):
+        size = self.tilesize
+        xs, ys = asarray(xs), asarray(ys)
+        keys, inverse = unique(stack((xs // size, ys // size)), axis=1, return_inverse=True)
+        for index, key in enumerate(map(tuple, keys.T.tolist())):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                if not value:
+                    continue
+                chunk = zeros((size, size), dtype=bool)
+            inside = inverse.ravel() == index
+            chunk[xs[inside] - key[0]*size, ys[inside] - key[1]*size] = bool(value)
+            self._store(key, chunk)
+            self._activate([key])
+
+    def get_region (self, x0, y0, x1, y1):
+        """
+            Function that get the cells of a rectangular region, built from the chunks it overlaps
+            Parameters :
+                - x0, y0, x1, y1 : the cell range of the region, x1 and y1 excluded, any integers
+            Return :
+                - board : a (x1-x0) x (y1-y0) boolean array
+        """
+        size = self.tilesize
+        region = zeros((max(0, x1-x0), max(0, y1-y0)), dtype=bool)
+        if region.size == 0:
+            return region
+        for cx in range(x0 // size, (x1-1) // size + 1):
+            for cy in range(y0 // size, (y1-1) // size + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    continue
+                xa, xb = max(x0, cx*size), min(x1, (cx+1)*size)
+                ya, yb = max(y0, cy*size), min(y1, (cy+1)*size)
+                region[xa-x0:xb-x0, ya-y0:yb-y0] = chunk[xa-cx*size:xb-cx*size, ya-cy*size:yb-cy*size]
+        return region
+
+    def set_region (self, board, x0=0, y0=0):
+        """
+            Function that write the cells of a rectangular region, the chunks it overlaps being allocated or freed as needed
+            Parameters :
+                - board : a boolean array
+                - x0, y0 : the position of the cell board[0][0]
+        """
+        board = asarray(board, dtype=bool)
+        if board.size == 0:
+            return
+        size = self.tilesize
+        x1, y1 = x0 + board.shape[0], y0 + board.shape[1]
+        changed = []
+        for cx in range(x0 // size, (x1-1) // size + 1):
+            for cy in range(y0 // size, (y1-1) // size + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    chunk = zeros((size, size), dtype=bool)
+                xa, xb = max(x0, cx*size), min(x1, (cx+1)*size)
+                ya, yb = max(y0, cy*size), min(y1, (cy+1)*size)
+                chunk[xa-cx*size:xb-cx*size, ya-cy*size:yb-cy*size] = board[xa-x0:xb-x0, ya-y0:yb-y0]
+                self._store((cx, cy), chunk)
+                changed.append((cx, cy))
+        self._activate(changed)
+
+    # Get the home window of the board as a boolean array
+    def get_board (self):
+        return self.get_region(0, 0, self.gridheight, self.gridwidth)
+
+    # Replace the whole board by a board placed in the home window, which takes its size
+    def set_board (self, board):
+        board = asarray(board, dtype=bool)
+        self.gridheight, self.gridwidth = board.shape
+        self.chunks, self.active, self.dirty = {}, set(), set()
+        self.__hashes, self.__hash = {}, 0
+        self.set_region(board, 0, 0)
+
+    # Get the home window coded with the values used by the widgets, 0 for the live cells and 1 for the dead ones by default
+    def get_grid (self, valueOn=0, valueOff=1):
+        return where(self.get_board(), valueOn, valueOff)
+
+    # Set the board from a grid coded with the values used by the widgets, 0 for the live cells by default
+    def set_grid (self, grid, valueOn=0):
+        self.set_board(asarray(grid) == valueOn)
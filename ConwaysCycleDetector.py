@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+
+from numpy import argsort, bitwise_xor, flatnonzero, nonzero, uint64, zeros
+
+def cellKeys(indices):
+    """
+        Function that give a pseudo-random 64-bit key to cells, from their index x*gridwidth + y (splitmix64 finalizer)
+        Parameters :
+            - indices : an array of cell indices
+        Return :
+            - keys : a uint64 array with the key of each cell
+    """
+    z = indices.astype(uint64) + uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> uint64(30))) * uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> uint64(27))) * uint64(0x94D049BB133111EB)
+    return z ^ (z >> uint64(31))
+
+class ConwaysBoardHash:
+    """
+        64-bit hash of a board, kept up to date incrementally.
+
+        The hash is the XOR of the keys of the live cells (Zobrist hashing), computed per tile of tilesize x tilesize
+        cells. After a generation only the tiles overlapping the changed regions are hashed again, so the cost follows
+        the activity rather than the board area.
+    """
+    def __init__(self, tilesize=32):
+        self.tilesize = max(1, tilesize)
+        self.value    = 0
+        self.__shape  = None
+        self.__tiles  = None
+
+    def _hashTile(self, board, tx, ty):
+        size = self.tilesize
+        x0, y0 = tx*size, ty*size
+        xs, ys = nonzero(board[x0:x0+size, y0:y0+size])
+        if len(xs) == 0:
+            return uint64(0)
+        return bitwise_xor.reduce(cellKeys((xs + x0) * board.shape[1] + (ys + y0)))
+
+    def _hashAll(self, board):
+        size = self.tilesize
+        tiles = zeros(self.__tiles.shape, dtype=uint64)
+        cells = flatnonzero(board)
+        if len(cells):
+            xs, ys = cells // board.shape[1], cells % board.shape[1]
+            tileids = (xs // size) * tiles.shape[1] + ys // size
+            order = argsort(tileids, kind="stable")
+            tileids, keys = tileids[order], cellKeys(cells[order])
+            starts = flatnonzero(tileids[1:] != tileids[:-1]) + 1
+            starts = [0] + starts.tolist()
+            tiles.reshape(-1)[tileids[starts]] = bitwise_xor.reduceat(keys, starts)
+        self.__tiles = tiles
+
+    def update(self, board, rects=None):
+        """
+            Function that update the hash after cells of the board changed
+            Parameters :
+                - board : the boolean board
+                - rects : the (x0, y0, x1, y1) cell regions that changed, None if the whole board may have changed
+            Return :
+                - value : the new hash, as a Python int
+        """
+        size = self.tilesize
+        if board.shape != self.__shape:
+            self.__shape = board.shape
+            self.__tiles = zeros(((board.shape[0] + size - 1) // size, (board.shape[1] + size - 1) // size), dtype=uint64)
+            rects = None
+
+        if rects is None:
+            self._hashAll(board)
+        else:
+            marked = set()
+            for x0, y0, x1, y1 in rects:
+                for tx in range(x0 // size, (max(x1, x0+1) - 1) // size + 1):
+                    for ty in range(y0 // size, (max(y1, y0+1) - 1) // size + 1):
+                        marked.add((tx, ty))
+            if len(marked) * 2 > self.__tiles.size:
+                self._hashAll(board)
+            else:
+                for tx, ty in marked:
+                    self.__tiles[tx, ty] = self._hashTile(board, tx, ty)
+
+        self.value = int(bitwise_xor.reduce(self.__tiles, axis=None)) if self.__tiles.size else 0
+        return self.value
+
+class ConwaysCycleDetector:
+    """
+        Detects when a run enters a cycle (still life, oscillators, ...) from the hashes of its boards.
+
+        The hashes of the last maxhistory generations are kept in a rolling cache. When a hash comes back, the board of
+        the current generation repeats the one of an earlier generation, so every generation afterwards repeats too :
+        the period is the distance between the two and the cycle started at the earlier generation.
+
+        Parameters :
+            - maxhistory : the number of generations remembered, the longest period that can be detected
+    """
+    def __init__(self, maxhistory=256):
+        self.maxhistory = maxhistory
+        self.period     = None
+        self.start      = None
+        self.__history  = OrderedDict()
+
+    # Forget the history, called when the board is changed by something else than a generation
+    def reset(self):
+        self.period = None
+        self.start  = None
+        self.__history.clear()
+
+    def push(self, generation, value):
+        """
+            Function that record the hash of the board of a generation
+            Parameters :
+                - generation : the generation of the board
+                - value : the hash of the board
+            Return :
+                - cycle : None if no cycle was detected yet, otherwise a (period, start) tuple
+        """
+        if self.period is None:
+            seen = self.__history.get(value)
+            if seen is not None:
+                self.period = generation - seen
+                self.start  = seen
+            else:
+                self.__history[value] = generation
+                if len(self.__history) > self.maxhistory:
+                    self.__history.popitem(last=False)
+        return self.cycle()
+
+    # Get the detected cycle as a (period, start) tuple, None if none was found
+    def cycle(self):
+        return None if self.period is None else (self.period, self.start)
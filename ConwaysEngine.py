@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+from numpy import asarray, count_nonzero, flatnonzero, where, zeros, uint8
+
+from ConwaysRule import makeRule
+from ConwaysTopology import checkTopology, fillGhosts
+
+def sumNeighbours(padded):
+    """
+        Function that, for a board surrounded by a ring of extra cells, return the number of live neighbours of every inner cell
+        Parameters :
+            - padded : a (n+2) x (m+2) uint8 array of 0's and 1's, or a stack of them with the boards on the last two axes
+        Return :
+            - counts : a n x m uint8 array, counts[x][y] being the number of live cells around padded[x+1][y+1]
+        Note : the count is the sum of the 8 shifted views of the padded board, so there is no special case on the corners and borders
+    """
+    counts  = padded[..., :-2, :-2] + padded[..., :-2, 1:-1]
+    counts += padded[..., :-2, 2:]
+    counts += padded[..., 1:-1, :-2]
+    counts += padded[..., 1:-1, 2:]
+    counts += padded[..., 2:, :-2]
+    counts += padded[..., 2:, 1:-1]
+    counts += padded[..., 2:, 2:]
+    return counts
+
+def boundsOf(board):
+    """
+        Function that return the bounding box of the live cells of a board
+        Parameters :
+            - board : a boolean array
+        Return :
+            - bounds : the (x0, y0, x1, y1) cell range of the live cells, x1 and y1 excluded, None if there is none
+    """
+    rows = flatnonzero(board.any(axis=1))
+    if len(rows) == 0:
+        return None
+    columns = flatnonzero(board[rows[0]:rows[-1]+1].any(axis=0))
+    return (int(rows[0]), int(columns[0]), int(rows[-1]) + 1, int(columns[-1]) + 1)
+
+def nextGeneration(alive, counts):
+    """
+        Function that apply the rules of the game to cells given their state and their number of live neighbours
+        Parameters :
+            - alive : a boolean array, True for the live cells
+            - counts : an array of the same shape with the number of live neighbours of each cell
+        Return :
+            - nextalive : a boolean array with the state of the cells at the next generation
+        Note : the rules are applied as boolean masks
+            1 and 3. A live cell with fewer than two or more than three live neighbours dies.
+            2. A live cell with two or three live neighbours lives on.
+            4. A dead cell with exactly three live neighbours becomes a live cell.
+        Other Life-like rules are applied by ConwaysRule.apply.
+    """
+    return (counts == 3) | (alive & (counts == 2))
+
+class ConwaysEngine:
+    """
+        Stepping engine that keeps the board as a NumPy boolean array (True = live cell) and advances it one generation
+        at a time with whole-array operations, without any widget.
+
+        The board is indexed board[x][y] as the original list-of-lists grid. The board is copied into a buffer with a ring
+        of ghost cells filled according to the topology (ConwaysTopology.fillGhosts), so the neighbours of every cell are
+        counted the same way whatever the boundary. With the "dead" topology, cells outside the board are dead, which is
+        what the corner and border branches of _getNeighbours (kept in ConwaysBenchmark.ListGrid) implement one cell at a time.
+
+        Equivalence with ListGrid.applyRules : for any grid, stepping the engine with the "dead" topology gives the same
+        next grid as the per-cell implementation, on every corner, border and middle cell, as checked on random grids and
+        on boards with live corners and borders by tests/test_engine.py.
+
+        Parameters :
+            - gridx, gridy : the size of the board
+            - rule : the Life-like rule, a ConwaysRule or a rule string as "B36/S23", Conway's B3/S23 by default
+            - topology : the boundary of the board, "dead", "torus", "klein" or "cross" (see ConwaysTopology.TOPOLOGIES)
+    """
+    def __init__(self, gridx=10, gridy=10, rule=None, topology="dead"):
+        self.gridheight = gridx
+        self.gridwidth  = gridy
+        self.generation = 0
+        self.rule       = makeRule(rule)
+        self.topology   = checkTopology(topology)
+        self.board      = zeros((self.gridheight, self.gridwidth), dtype=bool)
+
+        # When trackChanges is True, every step counts the cells born and the cells that died
+        self.trackChanges = False
+        self.births     = 0
+        self.deaths     = 0
+
+        # Reused buffer holding the board surrounded by a ring of dead cells
+        self.__padded   = zeros((self.gridheight+2, self.gridwidth+2), dtype=uint8)
+
+    def countNeighbours(self):
+        """
+            Function that return the number of live neighbours of every cell of the board
+            Return :
+                - counts : a gridheight x gridwidth uint8 array, counts[x][y] being the number of live cells around the cell (x, y)
+        """
+        return sumNeighbours(self._padBoard())
+
+    # Copy the board into the padded buffer and fill its ghost cells, return the buffer
+    def _padBoard(self):
+        padded = self.__padded
+        padded[1:-1, 1:-1] = self.board
+        if self.topology != "dead":
+            fillGhosts(padded, self.topology)
+        return padded
+
+    def step(self):
+        """
+            Function that advance the board by one generation, using the rules of the game
+            Return :
+                - board : the new board
+        """
+        nextboard = self._nextState(self.board, self.countNeighbours())
+        if self.trackChanges:
+            self._countChanges(self.board, nextboard)
+        self.board = nextboard
+        self.generation += 1
+        return self.board
+
+    # Count the cells born and the cells that died between two boards, with a single comparison of the boards : the deaths
+    # follow from the births and the change of population
+    def _countChanges(self, previous, board):
+        self.births = int(count_nonzero(board > previous))
+        self.deaths = self.births + int(count_nonzero(previous)) - int(count_nonzero(board))
+
+    # Apply the rule of the game to cells given their state and their number of live neighbours
+    def _nextState(self, alive, counts):
+        return self.rule.apply(alive, counts)
+
+    # Advance the board by a given number of generations
+    def run(self, generations):
+        for _ in range(generations):
+            self.step()
+        return self.board
+
+    # Number of live cells
+    def population(self):
+        return int(self.board.sum())
+
+    # Get the bounding box of the live cells, as a (x0, y0, x1, y1) cell range, None if there is none
+    def liveBounds(self):
+        return boundsOf(self.board)
+
+    # *----------------------------GET--SET------------------------------------*
+    # Get the rule of the game
+    def get_rule (self):
+        return self.rule
+
+    # Set the rule of the game, a ConwaysRule or a rule string as "B36/S23"
+    def set_rule (self, rule):
+        self.rule = makeRule(rule)
+
+    # Get the boundary topology of the board
+    def get_topology (self):
+        return self.topology
+
+    # Set the boundary topology of the board, "dead", "torus", "klein" or "cross"
+    def set_topology (self, topology):
+        self.topology = checkTopology(topology)
+        self.__padded[...] = 0
+
+    # Get the state of the cell (x, y), 1 if alive and 0 otherwise
+    def get_cell (self, x, y):
+        return int(self.board[x, y])
+
+    # Set the state of the cell (x, y)
+    def set_cell (self, x, y, value):
+        self.board[x, y] = bool(value)
+
+    # Toggle the state of the cell (x, y), as a mouse click does
+    def toggle_cell (self, x, y):
+        self.set_cell(x, y, not self.board[x, y])
+
+    # Set many cells to the same state in one write, xs and ys being arrays of coordinates inside the board
+    def set_cells (self, xs, ys, value):
+        self.board[xs, ys] = bool(value)
+
+    # Get the board as a boolean array
+    def get_board (self):
+        return self.board
+
+    # Set the board from any array-like of booleans, resizing the engine if needed
+    def set_board (self, board):
+        board = asarray(board, dtype=bool)
+        if board.shape != self.board.shape:
+            self.gridheight, self.gridwidth = board.shape
+            self.__padded = zeros((self.gridheight+2, self.gridwidth+2), dtype=uint8)
+        self.board = board.copy()
+
+    # Get the board coded with the values used by the widgets, 0 for the live cells and 1 for the dead ones by default
+    def get_grid (self, valueOn=0, valueOff=1):
+        return where(self.board, valueOn, valueOff)
+
+    # Set the board from a grid coded with the values used by the widgets, 0 for the live cells by default
+    def set_grid (self, grid, valueOn=0):
+        self.set_board(asarray(grid) == valueOn)
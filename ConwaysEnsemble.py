@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+from numpy import arange, asarray, zeros, uint8
+from numpy.random import SeedSequence
+
+from ConwaysEngine import sumNeighbours
+from ConwaysRule import makeRule
+from ConwaysTopology import checkTopology, fillGhosts
+from ConwaysSeeding import randomSoups
+
+class ConwaysEnsemble:
+    """
+        Batch of independent boards of the same size, stored in a single (B, gridx, gridy) boolean array and stepped
+        all together with whole-array operations, for Monte Carlo studies of random soups.
+
+        After every generation, each board gets its population and two flags : still (the board did not change) and
+        oscillating (the board is back to its state of two generations ago, period 2 oscillators). Settled boards can be
+        dropped from the batch, their results being kept in self.results.
+
+        Parameters :
+            - boards : an array-like of shape (B, gridx, gridy), True for the live cells
+            - rule : the Life-like rule, a ConwaysRule or a rule string as "B36/S23", Conway's B3/S23 by default
+            - topology : the boundary of the boards, "dead", "torus", "klein" or "cross" (see ConwaysTopology.TOPOLOGIES)
+    """
+    def __init__(self, boards, rule=None, topology="dead"):
+        self.rule        = makeRule(rule)
+        self.topology    = checkTopology(topology)
+        self.boards      = asarray(boards, dtype=bool).copy()
+        self.ids         = arange(len(self.boards))
+        self.generation  = 0
+        self.population  = self.boards.sum(axis=(1, 2))
+        self.still       = zeros(len(self.boards), dtype=bool)
+        self.oscillating = zeros(len(self.boards), dtype=bool)
+        self.results     = {}
+        self.seed        = None
+
+        # Previous generation, to detect period 2 oscillators
+        self.__previous  = None
+
+        # Reused buffer holding every board surrounded by a ring of dead cells
+        count, gridx, gridy = self.boards.shape
+        self.__padded    = zeros((count, gridx+2, gridy+2), dtype=uint8)
+
+    @classmethod
+    def random(cls, count, gridx, gridy, seed=None, density=0.5, region=None, rule=None, topology="dead"):
+        """
+            Function that create an ensemble of random boards, as ConwaysSimulation.regen does for a single board
+            Parameters :
+                - count : the number of boards
+                - gridx, gridy : the size of each board
+                - seed : the seed of the batch, kept as a SeedSequence in ensemble.seed
+                - density : the probability of a cell to be alive
+                - region : the (x0, y0, x1, y1) cell range that is filled, the whole board by default
+                - rule, topology : the Life-like rule and the boundary of the boards
+            Return :
+                - ensemble : the new ConwaysEnsemble
+            Note : every board has its own random stream, the board of id i can be drawn again alone with
+            ConwaysSeeding.randomSoup(gridx, gridy, density, ConwaysSeeding.memberSeed(ensemble.seed, i), region)
+        """
+        seed = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        ensemble = cls(randomSoups(count, gridx, gridy, density, seed, region), rule, topology)
+        ensemble.seed = seed
+        return ensemble
+
+    def step(self):
+        """
+            Function that advance every board by one generation and update their population and flags
+            Return :
+                - population : the number of live cells of each board
+        """
+        padded = self.__padded
+        padded[:, 1:-1, 1:-1] = self.boards
+        if self.topology != "dead":
+            fillGhosts(padded, self.topology)
+        nextboards = self.rule.apply(self.boards, sumNeighbours(padded))
+
+        self.still = (nextboards == self.boards).all(axis=(1, 2))
+        if self.__previous is not None:
+            self.oscillating = (nextboards == self.__previous).all(axis=(1, 2)) & ~self.still
+        self.__previous = self.boards
+        self.boards = nextboards
+        self.population = self.boards.sum(axis=(1, 2))
+        self.generation += 1
+        return self.population
+
+    # Get the boards that are still, oscillating with period 2, or empty
+    def settled(self):
+        return self.still | self.oscillating | (self.population == 0)
+
+    def drop(self, mask):
+        """
+            Function that remove boards from the batch, recording their results
+            Parameters :
+                - mask : a boolean array with one value per board, True for the boards to remove
+            Return :
+                - ids : the ids of the removed boards, their index in the initial batch
+        """
+        mask = asarray(mask, dtype=bool)
+        removed = self.ids[mask].tolist()
+        for index in mask.nonzero()[0]:
+            period = 1 if self.still[index] else 2 if self.oscillating[index] else None
+            self.results[int(self.ids[index])] = {"generation" : self.generation,
+                                                  "population" : int(self.population[index]),
+                                                  "period"     : period}
+        keep = ~mask
+        self.boards      = self.boards[keep]
+        self.ids         = self.ids[keep]
+        self.population  = self.population[keep]
+        self.still       = self.still[keep]
+        self.oscillating = self.oscillating[keep]
+        if self.__previous is not None:
+            self.__previous = self.__previous[keep]
+        self.__padded    = self.__padded[:len(self.boards)]
+        return removed
+
+    def run(self, generations, dropSettled=True):
+        """
+            Function that advance the batch by a number of generations, or until every board settled
+            Parameters :
+                - generations : the maximum number of generations
+                - dropSettled : if True, the settled boards are removed from the batch as soon as they settle
+            Return :
+                - results : the results of every board removed so far, by id
+        """
+        for _ in range(generations):
+            if len(self.boards) == 0:
+                break
+            self.step()
+            if dropSettled:
+                self.drop(self.settled())
+        return self.results
+
+    # Number of boards still in the batch
+    def __len__(self):
+        return len(self.boards)
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+import os, struct, zlib
+from multiprocessing import Process, Queue
+
+from numpy import asarray, flatnonzero, packbits, repeat, uint8, unpackbits, zeros
+
+# Palette indices of the rendered frames
+INDEX_OFF, INDEX_ON, INDEX_LINE = 0, 1, 2
+
+def renderFrame(board, cellsize=1, grid=False):
+    """
+        Function that render a board as an image of palette indices, without Qt
+        Parameters :
+            - board : a boolean array, board[x][y] being the cell drawn at column x and row y
+            - cellsize : the size of a cell, in pixels
+            - grid : if True, grid lines are drawn between the cells as in ConwaysRenderer, the image having then one
+              more row and column of pixels
+        Return :
+            - indices : a uint8 array indexed [row][column], INDEX_OFF, INDEX_ON or INDEX_LINE
+    """
+    cells = asarray(board, dtype=bool).T.view(uint8)
+    size  = max(1, cellsize)
+    image = repeat(repeat(cells, size, axis=0), size, axis=1)
+    if not grid:
+        return image
+    indices = zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=uint8)
+    indices[:-1, :-1] = image
+    indices[::size, :] = INDEX_LINE
+    indices[:, ::size] = INDEX_LINE
+    return indices
+
+# Get the palette as bytes, 3 bytes per color, padded with black to the given number of colors
+def _paletteBytes(colors, count):
+    return bytes(bytearray(int(value) for color in colors for value in color[:3])).ljust(3*count, b"\0")
+
+# *----------------------------PNG------------------------------------*
+# Get a PNG chunk, its length, type, data and CRC
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def encodePNG(indices, colors):
+    """
+        Function that encode an image of palette indices as an 8-bit paletted PNG
+        Parameters :
+            - indices : a uint8 array indexed [row][column]
+            - colors : the [r, g, b] colors of the palette, in index order
+        Return :
+            - data : the bytes of the PNG file
+    """
+    height, width = indices.shape
+    # Every row starts with its filter type, 0 for none
+    rows = zeros((height, width + 1), dtype=uint8)
+    rows[:, 1:] = indices
+    return (b"\x89PNG\r\n\x1a\n" +
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)) +
+            _chunk(b"PLTE", _paletteBytes(colors, len(colors))) +
+            _chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)) +
+            _chunk(b"IEND", b""))
+
+class ConwaysPNGSequence:
+    """
+        Writes frames as numbered PNG files
+
+        Parameters :
+            - path : a file name with a %d format as "frames/life%05d.png", a .png file name the number is added to, or
+              a directory the frames are written to as frame000000.png, frame000001.png, ...
+            - colors : the [r, g, b] colors of the palette, in index order
+    """
+    def __init__(self, path, colors):
+        if "%" not in path:
+            root, extension = os.path.splitext(path)
+            path = root + "%06d.png" if extension.lower() == ".png" else os.path.join(path, "frame%06d.png")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path   = path
+        self.colors = colors
+        self.frames = 0
+
+    # Write the next frame, an image of palette indices
+    def write(self, indices):
+        with open(self.path % self.frames, "wb") as target:
+            target.write(encodePNG(indices, self.colors))
+        self.frames += 1
+
+    # Nothing to finish, every frame is a complete file
+    def close(self):
+        pass
+
+# *----------------------------GIF------------------------------------*
+def _lzw(data, mincodesize):
+    """
+        Function that compress pixels with the variable length LZW of GIF
+        Parameters :
+            - data : the palette indices, as bytes
+            - mincodesize : the number of bits of the indices, at least 2
+        Return :
+            - compressed : the codes packed least significant bit first, as a bytearray
+    """
+    clear, end = 1 << mincodesize, (1 << mincodesize) + 1
+    output = bytearray()
+    buffer, bits = clear, mincodesize + 1
+    codesize, nextcode, table = mincodesize + 1, end + 1, {}
+
+    prefix = data[0]
+    for byte in data[1:]:
+        key = (prefix << 8) | byte
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        buffer |= prefix << bits
+        bits += codesize
+        if nextcode == 4096:
+            # Full table : the decoder is told to start again
+            buffer |= clear << bits
+            bits += codesize
+            codesize, nextcode, table = mincodesize + 1, end + 1, {}
+        else:
+            table[key] = nextcode
+            nextcode += 1
+            if nextcode > (1 << codesize) and codesize < 12:
+                codesize += 1
+        prefix = byte
+        while bits >= 8:
+            output.append(buffer & 0xFF)
+            buffer >>= 8
+            bits -= 8
+
+    # The decoder adds an entry after the last code too, which can widen the end code
+    buffer |= prefix << bits
+    bits += codesize
+    if nextcode < 4096 and nextcode + 1 > (1 << codesize) and codesize < 12:
+        codesize += 1
+    buffer |= end << bits
+    bits += codesize
+    while bits > 0:
+        output.append(buffer & 0xFF)
+        buffer >>= 8
+        bits -= 8
+    return output
+
+class ConwaysGIFWriter:
+    """
+        Writes frames as an animated GIF, looping forever
+
+        Each frame only stores the rectangle of pixels that changed since the previous one, drawn over it, so the cost
+        of encoding follows the activity of the board rather than its size.
+
+        Parameters :
+            - path : the path of the .gif file
+            - colors : the [r, g, b] colors of the palette, in index order, at most 4
+            - fps : the number of frames per second, GIF delays being in hundredths of a second
+    """
+    def __init__(self, path, colors, fps=10):
+        self.__file     = open(path, "wb")
+        self.colors     = colors
+        self.delay      = max(2, int(round(100.0 / fps)))
+        self.frames     = 0
+        self.__previous = None
+
+    # Write the header of the file, the size of the animation being the one of the first frame
+    def _header(self, width, height):
+        self.__file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF1, 0, 0) + _paletteBytes(self.colors, 4))
+        # Netscape extension : loop forever
+        self.__file.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    # Write the next frame, an image of palette indices of the size of the first one
+    def write(self, indices):
+        height, width = indices.shape
+        if self.__previous is None:
+            self._header(width, height)
+            x0, y0, x1, y1 = 0, 0, width, height
+        else:
+            changed = indices != self.__previous
+            rows, columns = flatnonzero(changed.any(axis=1)), flatnonzero(changed.any(axis=0))
+            if len(rows) == 0:
+                x0, y0, x1, y1 = 0, 0, 1, 1
+            else:
+                x0, y0, x1, y1 = columns[0], rows[0], columns[-1] + 1, rows[-1] + 1
+        self.__previous = indices.copy()
+
+        # Graphic control extension : delay, the frame being kept under the next one
+        self.__file.write(b"\x21\xF9\x04" + struct.pack("<BHBB", 0x04, self.delay, 0, 0))
+        self.__file.write(b"\x2C" + struct.pack("<HHHHB", x0, y0, x1 - x0, y1 - y0, 0))
+        data = _lzw(indices[y0:y1, x0:x1].tobytes(), 2)
+        self.__file.write(b"\x02")
+        for start in range(0, len(data), 255):
+            block = data[start:start+255]
+            self.__file.write(bytes((len(block),)) + bytes(block))
+        self.__file.write(b"\x00")
+        self.frames += 1
+
+    # Write the end of the file and close it
+    def close(self):
+        if self.__previous is not None:
+            self.__file.write(b"\x3B")
+        self.__file.close()
+
+# Create the writer matching the extension of a path : .gif or a PNG sequence
+def openFrames(path, colors, fps=10):
+    if path.lower().endswith(".gif"):
+        return ConwaysGIFWriter(path, colors, fps)
+    return ConwaysPNGSequence(path, colors)
+
+# *----------------------------EXPORT------------------------------------*
+def _encodeFrames(queue, path, colors, fps, cellsize, grid):
+    """
+        Function that render and encode the boards received on a queue until it gets None, run by the worker process
+        Parameters :
+            - queue : the queue of (packed, shape) boards, packbits of the board and its shape
+            - path, colors, fps : the target, see openFrames
+            - cellsize, grid : the rendering, see renderFrame
+    """
+    frames = openFrames(path, colors, fps)
+    try:
+        while True:
+            item = queue.get()
+            if item is None:
+                break
+            packed, shape = item
+            board = unpackbits(packed, count=shape[0]*shape[1]).reshape(shape).view(bool)
+            frames.write(renderFrame(board, cellsize, grid))
+    finally:
+        frames.close()
+
+class ConwaysExporter:
+    """
+        Exports boards as a PNG sequence or an animated GIF, rendered offscreen from the board arrays at any cell size
+        and palette, without Qt.
+
+        The rendering and the encoding run in a worker process : write() only packs the board 1 bit per cell and puts
+        it on a queue, so the simulation keeps stepping while the frames are encoded. The queue holds at most
+        queuesize boards, write() waiting for the worker when it is full, which bounds the memory of a long export.
+
+        Parameters :
+            - path : a .gif file, or the PNG sequence described in ConwaysPNGSequence
+            - cellsize : the size of a cell, in pixels
+            - colorOn, colorOff, colorLine : [r, g, b] colors of the live cells, dead cells and grid lines
+            - grid : if True, grid lines are drawn between the cells
+            - fps : the number of frames per second of a GIF
+            - queuesize : the number of boards waiting to be encoded above which write() waits
+            - background : if False, the frames are encoded in the calling process
+        Note : call close() (or use the exporter in a with statement) to finish the file and stop the worker.
+    """
+    def __init__(self, path, cellsize=1, colorOn=(100,100,255), colorOff=(255,255,255), colorLine=(175,175,175),
+                 grid=False, fps=10, queuesize=16, background=True):
+        self.path     = path
+        self.frames   = 0
+        self.__colors = [list(colorOff), list(colorOn), list(colorLine)]
+        self.__render = (cellsize, grid)
+        self.__queue  = None
+        self.__worker = None
+        self.__writer = None
+        if background:
+            self.__queue  = Queue(max(1, queuesize))
+            self.__worker = Process(target=_encodeFrames, args=(self.__queue, path, self.__colors, fps, cellsize, grid),
+                                    name="ConwaysExporter", daemon=True)
+            self.__worker.start()
+        else:
+            self.__writer = openFrames(path, self.__colors, fps)
+
+    # Add a board as the next frame
+    def write(self, board):
+        board = asarray(board, dtype=bool)
+        if self.__worker is None:
+            self.__writer.write(renderFrame(board, *self.__render))
+        else:
+            if not self.__worker.is_alive():
+                raise RuntimeError("The export to %s stopped, exit code %s" % (self.path, self.__worker.exitcode))
+            self.__queue.put((packbits(board, axis=None), board.shape))
+        self.frames += 1
+
+    # Wait for the frames to be encoded and close the file
+    def close(self):
+        if self.__worker is not None:
+            self.__queue.put(None)
+            self.__worker.join()
+            self.__queue.close()
+            exitcode, self.__worker = self.__worker.exitcode, None
+            if exitcode != 0:
+                raise RuntimeError("The export to %s failed, exit code %s" % (self.path, exitcode))
+        elif self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def exportRun(simulation, exporter, generations, every=1, region=None):
+    """
+        Function that run a simulation and export its generations, every generation being stepped (no cycle jumps)
+        Parameters :
+            - simulation : the ConwaysSimulation, its current board being the first frame
+            - exporter : the ConwaysExporter
+            - generations : the number of generations to run
+            - every : the number of generations between two frames
+            - region : the (x0, y0, x1, y1) cell range exported, the whole board by default (the home window of an
+              unbounded board)
+        Return :
+            - frames : the number of frames written
+    """
+    def board():
+        return simulation.get_board() if region is None else simulation.get_region(*region)
+
+    exporter.write(board())
+    frames = 1
+    for generation in range(1, generations + 1):
+        simulation.step()
+        if generation % max(1, every) == 0:
+            exporter.write(board())
+            frames += 1
+    return frames
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+
+from numpy import asarray, zeros, where
+
+from ConwaysRule import makeRule
+
+class Node:
+    """
+        Square block of 2^level x 2^level cells of a HashLife quadtree, made of 4 blocks of the level below.
+
+        Nodes are hash-consed by ConwaysHashLife : two nodes with the same content are the same object, so they can be
+        compared and hashed by identity and their results shared.
+    """
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level      = level
+        self.nw         = nw # Lower x, lower y
+        self.ne         = ne # Lower x, higher y
+        self.sw         = sw # Higher x, lower y
+        self.se         = se # Higher x, higher y
+        self.population = population
+
+# Single cells, the leaves of every quadtree
+DEAD  = Node(0, None, None, None, None, 0)
+ALIVE = Node(0, None, None, None, None, 1)
+
+class ConwaysHashLife:
+    """
+        HashLife engine : the board is an unbounded quadtree of hash-consed nodes, and the future of every node is
+        memoized, so regular patterns (breeders, guns, ...) can be advanced by 2^k generations in a single call.
+
+        The root node is centered on the origin and grows as needed, cells are addressed with (x, y) as in
+        ConwaysCanvas.grid[x][y], with any integer coordinates.
+
+        Parameters :
+            - maxcache : the maximum number of memoized results, the oldest half is evicted when it is reached
+            - maxnodes : the maximum number of nodes in the hash-consing table, when it is reached every cache is
+              flushed and only the nodes of the current pattern are kept
+            - rule : the Life-like rule, a ConwaysRule or a rule string as "B36/S23", Conway's B3/S23 by default. Rules
+              with B0 are refused since empty space would not stay empty
+    """
+    def __init__(self, maxcache=1000000, maxnodes=4000000, rule=None):
+        self.maxcache   = maxcache
+        self.maxnodes   = maxnodes
+        self.generation = 0
+        self.__nodes    = {}
+        self.__results  = {}
+        self.__empties  = [DEAD]
+        self.__flushed  = False
+        self.root       = self._empty(3)
+        self.set_rule(rule)
+
+    # *----------------------------NODES------------------------------------*
+    # Get the unique node made of the 4 given quadrants
+    def _join(self, nw, ne, sw, se):
+        key  = (nw, ne, sw, se)
+        node = self.__nodes.get(key)
+        if node is None:
+            node = Node(nw.level+1, nw, ne, sw, se, nw.population + ne.population + sw.population + se.population)
+            self.__nodes[key] = node
+        return node
+
+    # Get the empty node of a given level
+    def _empty(self, level):
+        while len(self.__empties) <= level:
+            empty = self.__empties[-1]
+            self.__empties.append(self._join(empty, empty, empty, empty))
+        return self.__empties[level]
+
+    # Get the node of the level below centered on a node
+    def _center(self, node):
+        return self._join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    # Surround the root with empty cells, the new root has twice its size and the same center
+    def _expand(self):
+        root  = self.root
+        empty = self._empty(root.level-1)
+        self.root = self._join(self._join(empty, empty, empty, root.nw),
+                               self._join(empty, empty, root.ne, empty),
+                               self._join(empty, root.sw, empty, empty),
+                               self._join(root.se, empty, empty, empty))
+
+    # Check that all the live cells of the root are in its central quarter, the square of a quarter of its side : the
+    # successor is the central half, which the cells can reach in 2^j <= 2^(level-3) generations without leaving it
+    def _isCentered(self):
+        root = self.root
+        return root.population == (root.nw.se.se.population + root.ne.sw.sw.population +
+                                   root.sw.ne.ne.population + root.se.nw.nw.population)
+
+    def _trim(self):
+        """
+            Function that keep the hash-consing table and the memoized results under their caps, also called inside a
+            jump so that a single large jump cannot grow them without limit
+            Note : the nodes being built keep working after a flush, they are only no longer shared with the new ones
+        """
+        if len(self.__results) > self.maxcache:
+            keys = list(self.__results.keys())
+            for key in keys[:len(keys)//2]:
+                del self.__results[key]
+
+        if len(self.__nodes) > self.maxnodes:
+            self.__nodes   = {}
+            self.__results = {}
+            self.__empties = [DEAD]
+            self.__flushed = True
+
+    def _collect(self):
+        """
+            Function that flush the hash-consing table and the memoized results when they grow above their caps
+            Note : the nodes of the current pattern are put back in the table so they keep being shared
+        """
+        self._trim()
+        if self.__flushed:
+            self.__flushed = False
+            self.root      = self._intern(self.root, {})
+
+    # Rebuild a node from the hash-consing table, visiting shared subtrees once
+    def _intern(self, node, seen):
+        if node.level == 0:
+            return node
+        if node.population == 0:
+            return self._empty(node.level)
+        if node in seen:
+            return seen[node]
+        result = self._join(self._intern(node.nw, seen), self._intern(node.ne, seen),
+                            self._intern(node.sw, seen), self._intern(node.se, seen))
+        seen[node] = result
+        return result
+
+    # *----------------------------STEPPING------------------------------------*
+    def _base(self, node):
+        """
+            Function that, for a level 2 node (4 x 4 cells), return its central 2 x 2 cells advanced by one generation
+        """
+        cells = [[node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+                 [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+                 [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+                 [node.sw.sw, node.sw.se, node.se.sw, node.se.se]]
+        neighbourhood = self.rule.neighbourhood
+        result = []
+        for x in (1, 2):
+            for y in (1, 2):
+                index = 0
+                for i in (0, 1, 2):
+                    for j in (0, 1, 2):
+                        index |= cells[x-1+i][y-1+j].population << (3*i + j)
+                result.append(ALIVE if neighbourhood[index] else DEAD)
+        return self._join(*result)
+
+    def _successor(self, node, j):
+        """
+            Function that, for a node of level k, return its central node of level k-1 advanced by 2^j generations
+            Parameters :
+                - node : a node of level k >= 2
+                - j : the base 2 logarithm of the number of generations, with j <= k-2
+            Return :
+                - result : the central node of level k-1, 2^j generations later
+        """
+        if node.population == 0:
+            return self._empty(node.level-1)
+
+        key    = (node, j)
+        result = self.__results.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            result = self._base(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+
+            # The 9 overlapping nodes of level k-1 covering the node
+            n00 = nw
+            n01 = self._join(nw.ne, ne.nw, nw.se, ne.sw)
+            n02 = ne
+            n10 = self._join(nw.sw, nw.se, sw.nw, sw.ne)
+            n11 = self._join(nw.se, ne.sw, sw.ne, se.nw)
+            n12 = self._join(ne.sw, ne.se, se.nw, se.ne)
+            n20 = sw
+            n21 = self._join(sw.ne, se.nw, sw.se, se.sw)
+            n22 = se
+
+            if j == node.level - 2:
+                # Both halves of the jump are done by the recursive calls, 2^(k-3) generations each
+                c00, c01, c02 = self._successor(n00, j-1), self._successor(n01, j-1), self._successor(n02, j-1)
+                c10, c11, c12 = self._successor(n10, j-1), self._successor(n11, j-1), self._successor(n12, j-1)
+                c20, c21, c22 = self._successor(n20, j-1), self._successor(n21, j-1), self._successor(n22, j-1)
+                step = j-1
+            else:
+                # The whole jump is done in the second half, the first half only takes the centers
+                c00, c01, c02 = self._center(n00), self._center(n01), self._center(n02)
+                c10, c11, c12 = self._center(n10), self._center(n11), self._center(n12)
+                c20, c21, c22 = self._center(n20), self._center(n21), self._center(n22)
+                step = j
+
+            result = self._join(self._successor(self._join(c00, c01, c10, c11), step),
+                                self._successor(self._join(c01, c02, c11, c12), step),
+                                self._successor(self._join(c10, c11, c20, c21), step),
+                                self._successor(self._join(c11, c12, c21, c22), step))
+
+        self.__results[key] = result
+        if len(self.__results) > self.maxcache or len(self.__nodes) > self.maxnodes:
+            self._trim()
+        return result
+
+    # Advance the pattern by 2^j generations
+    def _jump(self, j):
+        while self.root.level < j + 3 or not self._isCentered():
+            self._expand()
+        # The successor of the root is centered on the origin like the root, one level below
+        self.root = self._successor(self.root, j)
+        self.generation += 1 << j
+        self._collect()
+
+    def run(self, generations):
+        """
+            Function that advance the pattern by any number of generations, in jumps of powers of 2
+            Parameters :
+                - generations : the number of generations
+            Return :
+                - population : the number of live cells after the generations
+        """
+        j = 0
+        while generations > 0:
+            if generations & 1:
+                self._jump(j)
+            generations >>= 1
+            j += 1
+        return self.root.population
+
+    # Advance the pattern by one generation
+    def step(self):
+        return self.run(1)
+
+    # *----------------------------CELLS------------------------------------*
+    # Half of the side of the root, the root covers the coordinates [-half, half)
+    def _half(self):
+        return 1 << (self.root.level - 1)
+
+    def _setCell(self, node, x, y, value):
+        if node.level == 0:
+            return ALIVE if value else DEAD
+        half = 1 << (node.level - 1)
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        if x < half:
+            if y < half:
+                nw = self._setCell(nw, x, y, value)
+            else:
+                ne = self._setCell(ne, x, y-half, value)
+        else:
+            if y < half:
+                sw = self._setCell(sw, x-half, y, value)
+            else:
+                se = self._setCell(se, x-half, y-half, value)
+        return self._join(nw, ne, sw, se)
+
+    def _build(self, board, x, y, level):
+        """
+            Function that build the node of a given level covering a region of a dense array
+            Parameters :
+                - board : a boolean array
+                - x, y : the position in the array of the upper left cell of the node, possibly outside of the array
+                - level : the level of the node
+            Return :
+                - node : the node, cells outside of the array being dead
+        """
+        size = 1 << level
+        xa, xb = max(x, 0), min(x + size, board.shape[0])
+        ya, yb = max(y, 0), min(y + size, board.shape[1])
+        if xa >= xb or ya >= yb or not board[xa:xb, ya:yb].any():
+            return self._empty(level)
+        if level == 0:
+            return ALIVE
+        half = size >> 1
+        return self._join(self._build(board, x, y, level-1), self._build(board, x, y+half, level-1),
+                          self._build(board, x+half, y, level-1), self._build(board, x+half, y+half, level-1))
+
+    def _fill(self, node, x, y, out, x0, y0):
+        """
+            Function that copy the live cells of a node into a dense array
+            Parameters :
+                - node : the node, whose upper left cell is at (x, y)
+                - out : the array, whose cell out[0][0] is at (x0, y0)
+        """
+        size = 1 << node.level
+        if node.population == 0 or x + size <= x0 or y + size <= y0 or x >= x0 + out.shape[0] or y >= y0 + out.shape[1]:
+            return
+        if node.level == 0:
+            out[x-x0, y-y0] = True
+            return
+        half = size >> 1
+        self._fill(node.nw, x, y, out, x0, y0)
+        self._fill(node.ne, x, y+half, out, x0, y0)
+        self._fill(node.sw, x+half, y, out, x0, y0)
+        self._fill(node.se, x+half, y+half, out, x0, y0)
+
+    # Get the number of live cells
+    def population(self):
+        return self.root.population
+
+    # Get the rule of the game
+    def get_rule (self):
+        return self.rule
+
+    # Set the rule of the game, a ConwaysRule or a rule string as "B36/S23", the memoized results are forgotten
+    def set_rule (self, rule):
+        rule = makeRule(rule)
+        if not rule.isQuiescent():
+            raise ValueError("HashLife cannot run %s, empty regions must stay empty (no B0)" % rule)
+        self.rule = rule
+        self.__results.clear()
+
+    # Get the state of the cell (x, y), 1 if alive and 0 otherwise
+    def get_cell (self, x, y):
+        half = self._half()
+        if not (-half <= x < half and -half <= y < half):
+            return 0
+        return self._cellOf(self.root, x+half, y+half)
+
+    # Set the state of the cell (x, y), growing the board as needed
+    def set_cell (self, x, y, value):
+        while not (-self._half() <= x < self._half() and -self._half() <= y < self._half()):
+            self._expand()
+        half = self._half()
+        self.root = self._setCell(self.root, x+half, y+half, value)
+
+    # Replace the pattern by the live cells of a dense boolean array, its cell board[0][0] being placed at (x0, y0)
+    def set_board (self, board, x0=0, y0=0):
+        board = asarray(board, dtype=bool)
+        extent = max(3, abs(x0), abs(y0), abs(x0 + board.shape[0]), abs(y0 + board.shape[1]))
+        level  = int(extent).bit_length() + 1
+        half   = 1 << (level - 1)
+        self.root = self._build(board, -half - x0, -half - y0, level)
+
+    # Get the state of a cell of a node, (x, y) relative to its upper left cell
+    def _cellOf(self, node, x, y):
+        while node.level > 0:
+            if node.population == 0:
+                return 0
+            half = 1 << (node.level - 1)
+            if x < half:
+                node = node.nw if y < half else node.ne
+            else:
+                node = node.sw if y < half else node.se
+                x -= half
+            if y >= half:
+                y -= half
+        return node.population
+
+    # Get a height x width viewport of the board as a dense boolean array, its cell [0][0] being (x0, y0)
+    def get_board (self, x0, y0, height, width):
+        out  = zeros((height, width), dtype=bool)
+        half = self._half()
+        self._fill(self.root, -half, -half, out, x0, y0)
+        return out
+
+    # Get a viewport coded with the values used by the widgets (0 for the live cells, 1 for the dead ones, as
+    # ConwaysSimulation.valueOn and valueOff), to be shown with ConwaysCanvas.set_grid
+    def get_grid (self, x0, y0, height, width, valueOn=0, valueOff=1):
+        return where(self.get_board(x0, y0, height, width), valueOn, valueOff)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+import threading
+from bisect import bisect_left, bisect_right
+
+from numpy import asarray, int32, nonzero, packbits, unpackbits, zeros
+
+class ConwaysHistory:
+    """
+        Bounded history of the generations of a run, for rewinding and scrubbing.
+
+        Every generation is stored as a frame, a board with the position of its upper left cell (boards of an unbounded
+        engine move and change size). Frames are grouped in segments made of a keyframe, the whole frame packed 1 bit
+        per cell, followed by deltas from the previous frame : the packed XOR of the two boards when they cover the same
+        cells, or the coordinates of the cells that changed when they do not or when that is smaller. Any retained
+        generation is rebuilt from the keyframe of its segment and at most keyframeInterval deltas.
+
+        When the history goes over its memory budget, the oldest segments are evicted, so the history always starts
+        with a keyframe. Recording a generation that is not after the last one (after a rewind or an edit) discards
+        the generations from it onward.
+
+        Parameters :
+            - budget : the maximum number of bytes used by the frames
+            - keyframeInterval : the number of deltas after which a new keyframe is stored
+    """
+    def __init__(self, budget=64*1024*1024, keyframeInterval=32):
+        self.budget           = budget
+        self.keyframeInterval = keyframeInterval
+        self.nbytes           = 0
+        self.__generations    = []   # Generation of every entry, increasing
+        self.__entries        = []   # ("key", packed, shape, origin) or ("xor", packed, shape, origin) or ("cells", xs, ys, shape, origin)
+        self.__sizes          = []   # Bytes used by every entry
+        self.__last           = None # Last recorded frame, (board, origin)
+        self.__sincekey       = 0
+        self.__lock           = threading.Lock()
+
+    # Number of retained generations
+    def __len__(self):
+        return len(self.__generations)
+
+    # Get the first and the last retained generations, None if the history is empty
+    def bounds(self):
+        with self.__lock:
+            if not self.__generations:
+                return None
+            return self.__generations[0], self.__generations[-1]
+
+    # Check if a generation can be rebuilt
+    def __contains__(self, generation):
+        with self.__lock:
+            index = bisect_left(self.__generations, generation)
+            return index < len(self.__generations) and self.__generations[index] == generation
+
+    # Forget every generation
+    def clear(self):
+        with self.__lock:
+            self.__generations, self.__entries, self.__sizes = [], [], []
+            self.__last, self.__sincekey, self.nbytes = None, 0, 0
+
+    def record(self, generation, board, origin=(0, 0)):
+        """
+            Function that add a generation to the history
+            Parameters :
+                - generation : the generation of the board
+                - board : the boolean board
+                - origin : the (x, y) position of the cell board[0][0]
+        """
+        board, origin = asarray(board, dtype=bool).copy(), tuple(origin)
+        with self.__lock:
+            if self.__generations and generation <= self.__generations[-1]:
+                self._truncate(generation)
+
+            if self.__last is None or self.__sincekey >= self.keyframeInterval:
+                entry = ("key", packbits(board, axis=None), board.shape, origin)
+                self.__sincekey = 0
+            else:
+                entry = self._delta(self.__last, (board, origin))
+                self.__sincekey += 1
+            size = sum(part.nbytes for part in entry[1:] if hasattr(part, "nbytes")) + 64
+
+            self.__generations.append(generation)
+            self.__entries.append(entry)
+            self.__sizes.append(size)
+            self.__last = (board, origin)
+            self.nbytes += size
+            self._evict()
+
+    def _delta(self, previous, current):
+        """
+            Function that encode a frame from the previous one
+            Parameters :
+                - previous, current : the (board, origin) frames
+            Return :
+                - entry : an "xor" entry, or a "cells" entry with the coordinates of the changed cells
+        """
+        (before, beforeorigin), (board, origin) = previous, current
+        if before.shape == board.shape and beforeorigin == origin:
+            changed = before ^ board
+            xs, ys = nonzero(changed)
+            if 8 * len(xs) < changed.size // 8:
+                return ("cells", (xs + origin[0]).astype(int32), (ys + origin[1]).astype(int32), board.shape, origin)
+            return ("xor", packbits(changed, axis=None), board.shape, origin)
+
+        # Different cells covered : the changed cells are found on the union of the two frames
+        x0, y0 = min(origin[0], beforeorigin[0]), min(origin[1], beforeorigin[1])
+        x1 = max(origin[0] + board.shape[0], beforeorigin[0] + before.shape[0])
+        y1 = max(origin[1] + board.shape[1], beforeorigin[1] + before.shape[1])
+        union = zeros((x1 - x0, y1 - y0), dtype=bool)
+        union[origin[0]-x0:origin[0]-x0+board.shape[0], origin[1]-y0:origin[1]-y0+board.shape[1]] = board
+        union[beforeorigin[0]-x0:beforeorigin[0]-x0+before.shape[0], beforeorigin[1]-y0:beforeorigin[1]-y0+before.shape[1]] ^= before
+        xs, ys = nonzero(union)
+        return ("cells", (xs + x0).astype(int32), (ys + y0).astype(int32), board.shape, origin)
+
+    # Remove the generations from the given one onward, the last frame becomes the one before it
+    def _truncate(self, generation):
+        index = bisect_left(self.__generations, generation)
+        self.nbytes -= sum(self.__sizes[index:])
+        del self.__generations[index:], self.__entries[index:], self.__sizes[index:]
+        self.__last = self._rebuild(len(self.__generations) - 1) if self.__generations else None
+        keys = [position for position, entry in enumerate(self.__entries) if entry[0] == "key"]
+        self.__sincekey = len(self.__entries) - 1 - keys[-1] if keys else 0
+
+    # Evict the oldest segments while the history is over its budget, the last segment being always kept
+    def _evict(self):
+        while self.nbytes > self.budget:
+            keys = [position for position, entry in enumerate(self.__entries) if entry[0] == "key"]
+            if len(keys) < 2:
+                break
+            self.nbytes -= sum(self.__sizes[:keys[1]])
+            del self.__generations[:keys[1]], self.__entries[:keys[1]], self.__sizes[:keys[1]]
+
+    def _rebuild(self, index):
+        """
+            Function that rebuild the frame of an entry from the keyframe of its segment
+            Parameters :
+                - index : the position of the entry
+            Return :
+                - frame : the (board, origin) tuple
+        """
+        start = index
+        while self.__entries[start][0] != "key":
+            start -= 1
+        kind, packed, shape, origin = self.__entries[start]
+        board = unpackbits(packed, count=shape[0]*shape[1]).reshape(shape).astype(bool)
+
+        for entry in self.__entries[start+1:index+1]:
+            if entry[0] == "xor":
+                kind, packed, shape, origin = entry
+                board ^= unpackbits(packed, count=shape[0]*shape[1]).reshape(shape).astype(bool)
+                continue
+            kind, xs, ys, shape, neworigin = entry
+            # Cells changed on the union of the two frames, then cropped to the new frame
+            x0 = min(origin[0], neworigin[0], int(xs.min()) if len(xs) else origin[0])
+            y0 = min(origin[1], neworigin[1], int(ys.min()) if len(ys) else origin[1])
+            x1 = max(origin[0] + board.shape[0], neworigin[0] + shape[0], int(xs.max()) + 1 if len(xs) else x0)
+            y1 = max(origin[1] + board.shape[1], neworigin[1] + shape[1], int(ys.max()) + 1 if len(ys) else y0)
+            union = zeros((x1 - x0, y1 - y0), dtype=bool)
+            union[origin[0]-x0:origin[0]-x0+board.shape[0], origin[1]-y0:origin[1]-y0+board.shape[1]] = board
+            union[xs - x0, ys - y0] ^= True
+            board = union[neworigin[0]-x0:neworigin[0]-x0+shape[0], neworigin[1]-y0:neworigin[1]-y0+shape[1]].copy()
+            origin = neworigin
+        return board, tuple(origin)
+
+    def get(self, generation):
+        """
+            Function that get a retained generation
+            Parameters :
+                - generation : the generation
+            Return :
+                - frame : the (board, origin) tuple, None if the generation is not retained
+        """
+        with self.__lock:
+            index = bisect_left(self.__generations, generation)
+            if index == len(self.__generations) or self.__generations[index] != generation:
+                return None
+            return self._rebuild(index)
+
+    # Get the last retained generation before the given one, None if there is none
+    def previous(self, generation):
+        with self.__lock:
+            index = bisect_left(self.__generations, generation)
+            return self.__generations[index-1] if index > 0 else None
+
+    # Get the first retained generation after the given one, None if there is none
+    def next(self, generation):
+        with self.__lock:
+            index = bisect_right(self.__generations, generation)
+            return self.__generations[index] if index < len(self.__generations) else None
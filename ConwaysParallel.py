@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import os
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from numpy import asarray, ndarray, uint8
+
+from ConwaysEngine import ConwaysEngine, sumNeighbours
+from ConwaysTopology import fillGhosts
+
+# Shared buffers attached by the current process, by name
+_buffers = {}
+
+# Rule of the game of a worker process, sent once when the worker starts
+_rule = None
+
+# Attach the shared buffers of the board and keep the rule, called once in every worker
+def _attach(names, shape, rule):
+    global _rule
+    _rule = rule
+    for name in names:
+        if name not in _buffers:
+            memory = SharedMemory(name=name)
+            _buffers[name] = (memory, ndarray(shape, dtype=uint8, buffer=memory.buf))
+
+def _stepRows(task, rule=None):
+    """
+        Function that compute the next state of a tile of rows, run by the workers
+        Parameters :
+            - task : a (source, target, x0, x1) tuple, the names of the shared buffers holding the current and the next
+              board and the rows x0 to x1 (excluded) of the board handled by the worker
+            - rule : the ConwaysRule, the one sent to the worker when it started by default
+        Note : the buffers hold the board surrounded by a ring of dead cells, so row x of the board is row x+1 of the buffer.
+        The halo of the tile, the last row of the tile above and the first row of the tile below, is read from the
+        current buffer, which no worker writes during the generation.
+    """
+    source, target, x0, x1 = task
+    rule = _rule if rule is None else rule
+    current = _buffers[source][1]
+    nextboard = _buffers[target][1]
+    counts = sumNeighbours(current[x0:x1+2])
+    nextboard[x0+1:x1+1, 1:-1] = rule.apply(current[x0+1:x1+1, 1:-1].view(bool), counts)
+
+class ConwaysParallelEngine(ConwaysEngine):
+    """
+        Version of ConwaysEngine that splits the board in tiles of rows and steps them in a pool of worker processes.
+
+        The current and the next board live in two shared memory buffers (multiprocessing.shared_memory) that every
+        worker attaches once, with the rule of the game. At each generation every worker steps its tile from the current buffer into the next one,
+        reading the one-row halos of its neighbours from the current buffer, then the buffers are swapped. The result
+        is identical to ConwaysEngine.step.
+
+        Parameters :
+            - workers : the number of worker processes, the number of CPUs by default. With 1 worker, the tiles are
+              stepped in the calling process
+        Note : call close() (or use the engine in a with statement) to stop the workers and free the shared memory. The
+        board is then kept in the process, and the buffers and the workers are created again by the next step.
+    """
+    def __init__(self, gridx=10, gridy=10, workers=None, rule=None, topology="dead"):
+        self.workers    = max(1, workers or os.cpu_count() or 1)
+        self.__memories = []
+        self.__pool     = None
+        super(ConwaysParallelEngine, self).__init__(gridx, gridy, rule, topology)
+        self._allocate()
+
+    # Create the shared buffers and the pool of workers for the current board size
+    def _allocate(self):
+        self.close()
+        shape = (self.gridheight+2, self.gridwidth+2)
+        self.__memories = [SharedMemory(create=True, size=max(1, shape[0]*shape[1])) for _ in range(2)]
+        self.__names    = [memory.name for memory in self.__memories]
+        self.__arrays   = [ndarray(shape, dtype=uint8, buffer=memory.buf) for memory in self.__memories]
+        for memory, array in zip(self.__memories, self.__arrays):
+            array[:] = 0
+            _buffers[memory.name] = (memory, array)
+        self.__current  = 0
+
+        # Split the rows in one tile per worker
+        bounds = [self.gridheight * k // self.workers for k in range(self.workers+1)]
+        self.__tiles = [(x0, x1) for x0, x1 in zip(bounds[:-1], bounds[1:]) if x1 > x0]
+
+        self._startPool()
+        self.board = self.__arrays[self.__current][1:-1, 1:-1].view(bool)
+
+    # Start the workers, each attaching the shared buffers and keeping the rule
+    def _startPool(self):
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+        if self.workers > 1:
+            shape = (self.gridheight+2, self.gridwidth+2)
+            self.__pool = Pool(self.workers, initializer=_attach, initargs=(self.__names, shape, self.rule))
+
+    def step(self):
+        """
+            Function that advance the board by one generation, each tile being stepped by a worker
+            Return :
+                - board : the new board, a view on the shared buffer
+        """
+        if not self.__memories:
+            # Closed : the board kept in the process is put back in new shared buffers
+            board = self.board
+            self._allocate()
+            self.board[:] = board
+
+        source, target = self.__names[self.__current], self.__names[1 - self.__current]
+        if self.topology != "dead":
+            fillGhosts(self.__arrays[self.__current], self.topology)
+        tasks = [(source, target, x0, x1) for x0, x1 in self.__tiles]
+        if self.__pool is not None:
+            self.__pool.map(_stepRows, tasks)
+        else:
+            for task in tasks:
+                _stepRows(task, self.rule)
+
+        previous = self.board
+        self.__current = 1 - self.__current
+        self.board = self.__arrays[self.__current][1:-1, 1:-1].view(bool)
+        if self.trackChanges:
+            self._countChanges(previous, self.board)
+        self.generation += 1
+        return self.board
+
+    # Stop the workers and free the shared buffers, the board is copied out of them
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+        if self.__memories:
+            self.board    = self.board.copy()
+            self.__arrays = []
+            for memory in self.__memories:
+                _buffers.pop(memory.name, None)
+                try:
+                    memory.close()
+                except BufferError:
+                    # A view on the buffer is still held outside of the engine, the mapping goes away with it
+                    pass
+                memory.unlink()
+            self.__memories = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # *----------------------------GET--SET------------------------------------*
+    # Set the rule of the game, the workers are started again to receive it
+    def set_rule (self, rule):
+        super(ConwaysParallelEngine, self).set_rule(rule)
+        if self.__pool is not None:
+            self._startPool()
+
+    # Set the boundary topology of the board, "dead", "torus", "klein" or "cross"
+    def set_topology (self, topology):
+        super(ConwaysParallelEngine, self).set_topology(topology)
+        for array in self.__arrays:
+            fillGhosts(array, "dead")
+
+    # Set the board from any array-like of booleans, reallocating the buffers if the size changes
+    def set_board (self, board):
+        board = asarray(board, dtype=bool)
+        if board.shape != (self.gridheight, self.gridwidth) or not self.__memories:
+            self.gridheight, self.gridwidth = board.shape
+            self._allocate()
+        self.board[:] = board
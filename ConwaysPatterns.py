@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+import re, struct
+
+from numpy import asarray, diff, flatnonzero, frombuffer, int8, memmap, packbits, uint8, unpackbits, where, zeros
+
+# Header of the binary snapshots : magic, version, gridx, gridy, generation, followed by the rows packed in
+# little-endian 64-bit words, cell (x, y) being bit y % 64 of word y // 64 of row x as in ConwaysBitBoard
+SNAPSHOT_MAGIC   = b"CGOLSNAP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER  = struct.Struct("<8sIIQQQ")
+
+# Number of bytes read at once by the streaming readers, and number of rows packed or unpacked at once
+CHUNKSIZE = 1 << 16
+CHUNKROWS = 1024
+
+# Longest line written in RLE files
+RLE_LINELENGTH = 70
+RLE_HEADER     = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?")
+RLE_TOKEN      = re.compile(r"(\d*)([^\d\s])")
+
+# Standard patterns in the plaintext .cells format, 'O' being a live cell, the columns along x and the rows along y
+PATTERNS = {
+    "glider"      : [".O.",
+                     "..O",
+                     "OOO"],
+    "r-pentomino" : [".OO",
+                     "OO.",
+                     ".O."],
+    "gosper-gun"  : ["........................O...........",
+                     "......................O.O...........",
+                     "............OO......OO............OO",
+                     "...........O...O....OO............OO",
+                     "OO........O.....O...OO..............",
+                     "OO........O...O.OO....O.O...........",
+                     "..........O.....O.......O...........",
+                     "...........O...O....................",
+                     "............OO......................"],
+}
+
+# Convert rows of 'O' and '.' to a boolean array, board[x][y] being the character x of the row y
+def parseCells(rows):
+    board = zeros((max([len(row) for row in rows] + [0]), len(rows)), dtype=bool)
+    for y, row in enumerate(rows):
+        for x, cell in enumerate(row):
+            board[x][y] = cell == "O"
+    return board
+
+# Get one of the standard patterns as a boolean array
+def pattern(name):
+    return parseCells(PATTERNS[name])
+
+def placePattern(board, cells, x0=None, y0=None):
+    """
+        Function that copy a pattern into a board, cropping what does not fit
+        Parameters :
+            - board : the boolean board, modified in place
+            - cells : the boolean pattern
+            - x0, y0 : the position of the upper left cell of the pattern, the pattern is centered by default
+        Return :
+            - board : the board
+    """
+    if x0 is None:
+        x0 = max(0, (board.shape[0] - cells.shape[0]) // 2)
+    if y0 is None:
+        y0 = max(0, (board.shape[1] - cells.shape[1]) // 2)
+    cells = cells[:board.shape[0] - x0, :board.shape[1] - y0]
+    board[x0:x0+cells.shape[0], y0:y0+cells.shape[1]] = cells
+    return board
+
+def readCells(path):
+    """
+        Function that read a pattern in the plaintext .cells format, line by line straight into the board
+        Parameters :
+            - path : the path of the file, lines starting with '!' are comments, 'O' is a live cell and '.' a dead one
+        Return :
+            - board : a boolean array, board[x][y] being the cell of column x and line y, x being the horizontal axis
+              as in the widgets and the exported frames
+    """
+    # First pass for the size of the board, second pass to fill it
+    width, height = 0, 0
+    with open(path, "rb") as source:
+        for line in source:
+            if not line.startswith(b"!"):
+                width, height = max(width, len(line.rstrip(b"\r\n"))), height + 1
+
+    board = zeros((width, height), dtype=bool)
+    with open(path, "rb") as source:
+        y = 0
+        for line in source:
+            if not line.startswith(b"!"):
+                line = line.rstrip(b"\r\n")
+                board[:len(line), y] = frombuffer(line, dtype=uint8) == ord("O")
+                y += 1
+    return board
+
+def writeCells(board, path, name=None):
+    """
+        Function that write a board in the plaintext .cells format
+        Parameters :
+            - board : a boolean array, board[:, y] being written as line y
+            - path : the path of the file
+            - name : an optional name, written as a '!Name:' comment
+    """
+    with open(path, "wb") as target:
+        if name:
+            target.write(("!Name: %s\n" % name).encode())
+        for y0 in range(0, board.shape[1], CHUNKROWS):
+            rows = asarray(board[:, y0:y0+CHUNKROWS], dtype=bool).T
+            lines = zeros((rows.shape[0], rows.shape[1] + 1), dtype=uint8)
+            lines[:, :-1] = where(rows, ord("O"), ord("."))
+            lines[:, -1] = ord("\n")
+            target.write(lines.tobytes())
+
+def readRLE(path):
+    """
+        Function that read a pattern in the run length encoded .rle format, decoding the runs straight into the board
+        Parameters :
+            - path : the path of the file, the size being given by the 'x = ..., y = ...' header line
+        Return :
+            - board : a boolean array of x columns and y lines, board[x][y] being the cell of column x and line y
+            - rule : the rule of the header, None if there is none
+        Note : the file is read by chunks, so huge patterns are never held in memory as text. States other than
+        'b' (and '.') are read as live cells, runs going past the size of the header are cropped.
+    """
+    with open(path) as source:
+        for line in source:
+            if line.startswith("#") or not line.strip():
+                continue
+            header = RLE_HEADER.match(line.strip())
+            if header is None:
+                raise ValueError("Missing 'x = ..., y = ...' header in %s" % path)
+            break
+        else:
+            raise ValueError("Missing 'x = ..., y = ...' header in %s" % path)
+
+        board = zeros((int(header.group(1)), int(header.group(2))), dtype=bool)
+        x, y, pending = 0, 0, ""
+        while True:
+            chunk = source.read(CHUNKSIZE)
+            text = pending + chunk
+            # A run count at the end of a chunk may continue in the next one
+            pending = text[len(text.rstrip("0123456789")):] if chunk else ""
+            text = text[:len(text) - len(pending)]
+            for token in RLE_TOKEN.finditer(text):
+                count, tag = int(token.group(1) or 1), token.group(2)
+                if tag == "!":
+                    return board, header.group(3)
+                if tag == "$":
+                    x, y = 0, y + count
+                elif tag in "b.":
+                    x += count
+                else:
+                    if y < board.shape[1]:
+                        board[x:x+count, y] = True
+                    x += count
+            if not chunk:
+                return board, header.group(3)
+
+def writeRLE(board, path, name=None, rule="B3/S23"):
+    """
+        Function that write a board in the run length encoded .rle format
+        Parameters :
+            - board : a boolean array, board[:, y] being written as line y, so the x of the header is board.shape[0]
+            - path : the path of the file
+            - name : an optional name, written as a '#N' comment
+            - rule : the rule written in the header
+    """
+    with open(path, "w") as target:
+        if name:
+            target.write("#N %s\n" % name)
+        target.write("x = %d, y = %d, rule = %s\n" % (board.shape[0], board.shape[1], rule))
+
+        line, last = "", 0
+        def emit(count, tag):
+            nonlocal line
+            token = (str(count) if count > 1 else "") + tag
+            if len(line) + len(token) > RLE_LINELENGTH:
+                target.write(line + "\n")
+                line = ""
+            line += token
+
+        padded = zeros(board.shape[0] + 2, dtype=int8)
+        for y in range(board.shape[1]):
+            # Boundaries of the runs of live cells, a run starting at an even index and ending at the next odd one
+            padded[1:-1] = board[:, y]
+            edges = flatnonzero(diff(padded))
+            if len(edges) == 0:
+                continue
+            if y > last:
+                emit(y - last, "$")
+            last, x = y, 0
+            for start, end in zip(edges[0::2].tolist(), edges[1::2].tolist()):
+                if start > x:
+                    emit(start - x, "b")
+                emit(end - start, "o")
+                x = end
+        target.write(line + "!\n")
+
+def writeSnapshot(board, path, generation=0):
+    """
+        Function that write a board in the binary snapshot format, 1 bit per cell
+        Parameters :
+            - board : a boolean array
+            - path : the path of the file
+            - generation : the generation of the board, stored in the header
+    """
+    gridx, gridy = board.shape
+    nbytes = (gridy + 63) // 64 * 8
+    with open(path, "wb") as target:
+        target.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, gridx, gridy, generation))
+        for x0 in range(0, gridx, CHUNKROWS):
+            rows = zeros((min(CHUNKROWS, gridx - x0), nbytes * 8), dtype=bool)
+            rows[:, :gridy] = board[x0:x0+CHUNKROWS]
+            target.write(packbits(rows, axis=1, bitorder="little").tobytes())
+
+def openSnapshot(path, mode="r"):
+    """
+        Function that memory-map a binary snapshot, without reading the cells
+        Parameters :
+            - path : the path of the file
+            - mode : the numpy.memmap mode, "r" for read only, "r+" to change the file in place, "c" for copy on write
+        Return :
+            - words : the packed rows, a (gridx, nwords) little-endian uint64 memmap, as ConwaysBitBoard.words
+            - gridy : the number of cells of a row
+            - generation : the generation stored in the header
+    """
+    with open(path, "rb") as source:
+        magic, version, _, gridx, gridy, generation = SNAPSHOT_HEADER.unpack(source.read(SNAPSHOT_HEADER.size))
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("%s is not a version %d snapshot" % (path, SNAPSHOT_VERSION))
+    words = memmap(path, dtype="<u8", mode=mode, offset=SNAPSHOT_HEADER.size, shape=(gridx, (gridy + 63) // 64))
+    return words, gridy, generation
+
+def readSnapshot(path):
+    """
+        Function that read a binary snapshot into a boolean board, unpacking it by chunks of rows
+        Parameters :
+            - path : the path of the file
+        Return :
+            - board : the boolean board
+            - generation : the generation stored in the header
+    """
+    words, gridy, generation = openSnapshot(path)
+    board = zeros((words.shape[0], gridy), dtype=bool)
+    for x0 in range(0, words.shape[0], CHUNKROWS):
+        rows = unpackbits(asarray(words[x0:x0+CHUNKROWS]).view(uint8), axis=1, bitorder="little")
+        board[x0:x0+CHUNKROWS] = rows[:, :gridy]
+    return board, generation
+
+def readPattern(path):
+    """
+        Function that read a board from a .rle, a .cells or a snapshot file, chosen from the extension
+        Parameters :
+            - path : the path of the file, .rle, .snap or plaintext otherwise
+        Return :
+            - board : the boolean board
+    """
+    if path.lower().endswith(".rle"):
+        return readRLE(path)[0]
+    if path.lower().endswith(".snap"):
+        return readSnapshot(path)[0]
+    return readCells(path)
+
+def writePattern(board, path, name=None, generation=0, rule="B3/S23"):
+    """
+        Function that write a board to a .rle, a .cells or a snapshot file, chosen from the extension
+        Parameters :
+            - board : the boolean board
+            - path : the path of the file, .rle, .snap or plaintext otherwise
+            - name : an optional name, written as a comment in the text formats
+            - generation : the generation of the board, stored in the snapshots
+            - rule : the rule of the board, written in the header of the RLE files
+    """
+    if path.lower().endswith(".rle"):
+        writeRLE(board, path, name, str(rule))
+    elif path.lower().endswith(".snap"):
+        writeSnapshot(board, path, generation)
+    else:
+        writeCells(board, path, name)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPixmap
+
+from numpy import array, empty, uint32
+
+# Smallest cell size, in pixels, for which the grid lines are drawn
+MINLINECELLSIZE = 4
+
+class ConwaysRenderer:
+    """
+        Renders a board through a reused pixel buffer : one pixel per cell in a NumPy uint32 array shared with a QImage
+        (no copy), scaled to the widget with a single drawImage call, the grid lines being a cached overlay pixmap.
+
+        Only the regions given to upload() are written into the buffer, so after a generation step or a mouse edit
+        the cost follows the number of changed cells.
+
+        Parameters :
+            - cellsize : the size of a cell on screen, in pixels
+            - colorOn, colorOff, colorLine : [r, g, b] colors of the live cells, dead cells and grid lines
+    """
+    def __init__(self, cellsize=20, colorOn=(100,100,255), colorOff=(255,255,255), colorLine=(175,175,175)):
+        self.cellsize   = cellsize
+        self.colorLine  = list(colorLine)
+        self.palette    = None
+        self.pixels     = empty((0, 0), dtype=uint32)
+        self.image      = None
+        self.__overlay  = None
+        self.__overlaykey = None
+        self.set_colors(colorOn, colorOff)
+
+    # Set the colors of the live and dead cells, the buffer must then be uploaded again
+    def set_colors(self, colorOn, colorOff):
+        self.palette = array([0xFF000000 | (color[0] << 16) | (color[1] << 8) | color[2] for color in (colorOff, colorOn)], dtype=uint32)
+
+    # Set the color of the grid lines
+    def set_colorLine(self, colorLine):
+        self.colorLine = list(colorLine)
+        self.__overlaykey = None
+
+    # Allocate the pixel buffer and the image wrapping it for a board of the given size
+    def _allocate(self, gridx, gridy):
+        # The image is row-major along the screen y axis, pixel (x, y) being pixels[y][x] = board[x][y]
+        self.pixels = empty((gridy, gridx), dtype=uint32)
+        self.image  = QImage(self.pixels.data, gridx, gridy, 4*gridx, QImage.Format_RGB32)
+
+    def upload(self, board, rects=None):
+        """
+            Function that write cells of the board into the pixel buffer
+            Parameters :
+                - board : a boolean array, board[x][y] being the cell drawn at column x and row y
+                - rects : the regions to write, as (x0, y0, x1, y1) cell ranges, None to write the whole board
+        """
+        if self.pixels.shape != (board.shape[1], board.shape[0]):
+            self._allocate(board.shape[0], board.shape[1])
+            rects = None
+        if rects is None:
+            self.pixels[:] = self.palette[board.T.view('uint8')]
+        else:
+            for x0, y0, x1, y1 in rects:
+                self.pixels[y0:y1, x0:x1] = self.palette[board[x0:x1, y0:y1].T.view('uint8')]
+
+    # Get the overlay with the grid lines, rebuilt only when the board size, cell size or line color change
+    def _overlay(self, gridx, gridy):
+        key = (gridx, gridy, self.cellsize, tuple(self.colorLine))
+        if key != self.__overlaykey:
+            size = self.cellsize
+            self.__overlay = QPixmap(gridx*size + 1, gridy*size + 1)
+            self.__overlay.fill(Qt.transparent)
+            qp = QPainter(self.__overlay)
+            qp.setPen(QColor(self.colorLine[0], self.colorLine[1], self.colorLine[2]))
+            for x in range(gridx + 1):
+                qp.drawLine(x*size, 0, x*size, gridy*size)
+            for y in range(gridy + 1):
+                qp.drawLine(0, y*size, gridx*size, y*size)
+            qp.end()
+            self.__overlaykey = key
+        return self.__overlay
+
+    # Get the rectangle of the widget covering the cells (x0, y0) to (x1, y1) excluded
+    def cellRect(self, x0, y0, x1, y1):
+        return QRect(self.cellsize*x0, self.cellsize*y0, self.cellsize*(x1-x0) + 1, self.cellsize*(y1-y0) + 1)
+
+    def paint(self, qp, rect):
+        """
+            Function that draw the part of the board inside a rectangle of the widget
+            Parameters :
+                - qp : the QPainter of the widget
+                - rect : the QRect to repaint, in widget coordinates
+        """
+        if self.image is None or self.cellsize <= 0:
+            return
+        gridy, gridx = self.pixels.shape
+        x0, x1 = max(0, rect.left()//self.cellsize), min(gridx, rect.right()//self.cellsize + 1)
+        y0, y1 = max(0, rect.top()//self.cellsize), min(gridy, rect.bottom()//self.cellsize + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        target = QRect(self.cellsize*x0, self.cellsize*y0, self.cellsize*(x1-x0), self.cellsize*(y1-y0))
+        qp.drawImage(target, self.image, QRect(x0, y0, x1-x0, y1-y0))
+        # When zoomed out, the grid lines would hide the cells
+        if self.cellsize >= MINLINECELLSIZE:
+            qp.drawPixmap(target, self._overlay(gridx, gridy), target)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+# Rule strings accepted : "B3/S23" (either order, any case) and the older "S/B" notation "23/3"
+RULE_BS = re.compile(r"^\s*B([0-8]*)\s*/\s*S([0-8]*)\s*$", re.IGNORECASE)
+RULE_SB = re.compile(r"^\s*S([0-8]*)\s*/\s*B([0-8]*)\s*$", re.IGNORECASE)
+RULE_LEGACY = re.compile(r"^\s*([0-8]*)\s*/\s*([0-8]*)\s*$")
+
+# Number of comparisons above which apply() indexes the lookup table instead : one comparison of a uint8 array is
+# several times cheaper than an indexed read of a lookup table, the table only wins on rules with many counts
+# (measured by ConwaysBenchmark.compareRuleApply)
+LOOKUP_COMPARISONS = 5
+
+# Usual names of some Life-like rules
+RULES = {
+    "life"         : "B3/S23",
+    "highlife"     : "B36/S23",
+    "day-and-night": "B3678/S34678",
+    "seeds"        : "B2/S",
+    "life-without-death" : "B3/S012345678",
+    "replicator"   : "B1357/S1357",
+}
+
+class ConwaysRule:
+    """
+        Life-like rule in the B/S notation : a dead cell is born when its number of live neighbours is in birth, a live
+        cell survives when it is in survival, every other cell is dead at the next generation.
+
+        The rule is compiled into lookup tables, plain tuples so that the rules can be used without importing NumPy :
+            - table[alive][count], 2 x 9 booleans, the next state from the state of the cell and its number of live neighbours
+            - neighbourhood[index], 512 booleans, the next state from the whole 3 x 3 neighbourhood, bit 3*i + j of
+              index being the cell (x-1+i, y-1+j) and bit 4 the cell itself
+        apply() gets the next state of whole arrays of cells from the table : for the rules with few counts as B3/S23, as
+        one comparison per count that can give a live cell, several times faster with NumPy than an indexed read, and
+        above LOOKUP_COMPARISONS comparisons by indexing a NumPy copy of table, built on the first use, so the cost of a
+        generation is bounded whatever the rule.
+
+        Parameters :
+            - rule : a rule string, "B3/S23", "S23/B3" or "23/3", or one of the names of RULES
+    """
+    def __init__(self, rule="B3/S23"):
+        rule = RULES.get(rule.strip().lower(), rule)
+        match = RULE_BS.match(rule)
+        if match:
+            birth, survival = match.group(1), match.group(2)
+        else:
+            match = RULE_SB.match(rule) or RULE_LEGACY.match(rule)
+            if match is None:
+                raise ValueError("Invalid rule %r, expected the B/S notation as B3/S23" % rule)
+            survival, birth = match.group(1), match.group(2)
+
+        self.birth    = frozenset(int(count) for count in birth)
+        self.survival = frozenset(int(count) for count in survival)
+
+        self.table = (tuple(count in self.birth for count in range(9)),
+                      tuple(count in self.survival for count in range(9)))
+        self.neighbourhood = tuple(self.table[(index >> 4) & 1][bin(index & ~16).count("1")] for index in range(512))
+
+        # Counts giving a live cell whatever the state, only to dead cells, only to live cells
+        self.__always   = [count for count in range(9) if self.table[0][count] and self.table[1][count]]
+        self.__deadonly = [count for count in range(9) if self.table[0][count] and not self.table[1][count]]
+        self.__liveonly = [count for count in range(9) if self.table[1][count] and not self.table[0][count]]
+        self.__lookup   = len(self.__always) + len(self.__deadonly) + len(self.__liveonly) > LOOKUP_COMPARISONS
+        self.__lut      = None
+
+    # Get the rule in the B/S notation
+    def __str__(self):
+        return "B%s/S%s" % ("".join(str(count) for count in sorted(self.birth)),
+                            "".join(str(count) for count in sorted(self.survival)))
+
+    def __repr__(self):
+        return "ConwaysRule(%r)" % str(self)
+
+    def __eq__(self, other):
+        return isinstance(other, ConwaysRule) and self.birth == other.birth and self.survival == other.survival
+
+    def __hash__(self):
+        return hash((self.birth, self.survival))
+
+    # Check if empty regions stay empty, which the active tiles and HashLife rely on (no B0)
+    def isQuiescent(self):
+        return 0 not in self.birth
+
+    # Get the next state of a single cell, as a boolean
+    def nextState(self, alive, count):
+        return self.table[1 if alive else 0][count]
+
+    def apply(self, alive, counts):
+        """
+            Function that apply the rule to cells given their state and their number of live neighbours
+            Parameters :
+                - alive : a boolean array, True for the live cells
+                - counts : an array of the same shape with the number of live neighbours of each cell
+            Return :
+                - nextalive : a boolean array with the state of the cells at the next generation
+        """
+        if self.__lookup:
+            return self.lookup(alive, counts)
+        return self.compare(alive, counts)
+
+    # Apply the rule with one comparison per neighbour count that can give a live cell, see apply
+    def compare(self, alive, counts):
+        nextalive = _matches(counts, self.__always)
+        born      = _matches(counts, self.__deadonly)
+        survive   = _matches(counts, self.__liveonly)
+        for mask in (None if born is None else born > alive, # Born and not alive
+                     None if survive is None else survive & alive):
+            if mask is None:
+                continue
+            if nextalive is None:
+                nextalive = mask
+            else:
+                nextalive |= mask
+        # No count gives a live cell : all False, built from counts so that NumPy is not imported here
+        return (counts < 0) if nextalive is None else nextalive
+
+    def lookup(self, alive, counts):
+        """
+            Function that apply the rule by indexing the lookup table, at the index 9 * alive + count of every cell
+            Parameters :
+                - alive, counts : as for apply
+            Return :
+                - nextalive : a boolean array with the state of the cells at the next generation
+        """
+        from numpy import array, uint8
+        if self.__lut is None:
+            self.__lut = array(self.table[0] + self.table[1], dtype=bool)
+        index = alive.astype(uint8)
+        index *= 9
+        index += counts.astype(uint8, copy=False)
+        return self.__lut.take(index)
+
+# Get the mask of the cells whose count is one of the given counts, None if there is none
+def _matches(counts, values):
+    mask = None
+    for value in values:
+        if mask is None:
+            mask = counts == value
+        else:
+            mask |= counts == value
+    return mask
+
+# Rule of Conway's Game of Life, the default of every engine
+CONWAY = ConwaysRule("B3/S23")
+
+# Get a rule from a ConwaysRule, a rule string or None for Conway's rule
+def makeRule(rule=None):
+    if rule is None:
+        return CONWAY
+    if isinstance(rule, ConwaysRule):
+        return rule
+    return ConwaysRule(rule)
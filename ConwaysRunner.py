@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+import threading, time
+
+from numpy import copyto, empty
+
+class ConwaysRunner:
+    """
+        Runs a ConwaysSimulation on a background thread, decoupled from the display.
+
+        The worker thread steps the simulation at a target number of generations per second (or as fast as possible)
+        and publishes each finished generation through a double buffer : the board is copied into the back buffer,
+        which is then swapped with the front buffer. The view calls latest() at its own refresh rate and only gets
+        the last published generation, the intermediate ones being dropped. The regions that changed since the
+        previous latest() call are accumulated so the view can still upload only them.
+
+        Changes to the simulation from other threads (mouse edits, regen, ...) go through submit() and are applied by
+        the worker between two generations, so they never run during a step.
+
+        With set_region the runner only publishes a rectangular region of the board, the part shown by the view, which
+        is how an unbounded board is followed : the published board and its changed regions are then relative to the
+        upper left cell of the region.
+
+        Parameters :
+            - simulation : the ConwaysSimulation to run
+            - generationsPerSecond : the target speed, None or 0 to run as fast as possible
+            - maxrects : the number of accumulated dirty regions above which the whole board is reported as dirty
+            - pauseOnCycle : if True, the runner pauses itself as soon as the simulation detects a cycle
+    """
+    def __init__(self, simulation, generationsPerSecond=8.0, maxrects=256, pauseOnCycle=False):
+        self.simulation = simulation
+        self.generationsPerSecond = generationsPerSecond
+        self.maxrects   = maxrects
+        self.pauseOnCycle = pauseOnCycle
+
+        self.__running  = False
+        self.__stopped  = False
+        self.__commands = []
+        self.__wakeup   = threading.Event()
+        self.__lock     = threading.Lock()
+
+        # Front buffer (last published generation), back buffer (written by the worker) and display buffer (read by the view)
+        self.__front    = None
+        self.__back     = None
+        self.__display  = None
+        self.__generation = 0
+        self.__version  = 0
+        self.__seen     = 0
+        self.__rects    = None
+        self.__cycle    = None
+        self.__region   = None
+
+        self._publish(None)
+        self.__thread   = threading.Thread(target=self._loop, name="ConwaysRunner", daemon=True)
+        self.__thread.start()
+
+    # Check if the simulation is running
+    def isRunning(self):
+        return self.__running
+
+    # Start stepping the simulation
+    def start(self):
+        self.__running = True
+        self.__wakeup.set()
+
+    # Pause the simulation, the current generation is finished first
+    def pause(self):
+        self.__running = False
+        self.__wakeup.set()
+
+    # Stop the worker thread, the runner cannot be used afterwards
+    def stop(self):
+        self.__stopped = True
+        self.__running = False
+        self.__wakeup.set()
+        self.__thread.join()
+
+    # Set the target number of generations per second, None or 0 to run as fast as possible
+    def set_generationsPerSecond(self, generationsPerSecond):
+        self.generationsPerSecond = generationsPerSecond
+        self.__wakeup.set()
+
+    # Get the target number of generations per second
+    def get_generationsPerSecond(self):
+        return self.generationsPerSecond
+
+    def submit(self, function, rects=None):
+        """
+            Function that queue a change of the simulation, applied by the worker between two generations
+            Parameters :
+                - function : a function without arguments, called on the worker thread
+                - rects : the (x0, y0, x1, y1) cell regions changed by the function, None if it can change the whole board
+        """
+        with self.__lock:
+            self.__commands.append((function, rects))
+        self.__wakeup.set()
+
+    def set_region(self, region):
+        """
+            Function that set the region of the board published to the view, the region is published again at once
+            Parameters :
+                - region : the (x0, y0, x1, y1) cell range to publish, x1 and y1 excluded, None for the whole board
+        """
+        with self.__lock:
+            self.__region = None if region is None else tuple(region)
+        self.submit(lambda: None)
+
+    # Get the region of the board published to the view, None for the whole board
+    def get_region(self):
+        return self.__region
+
+    def _publish(self, rects):
+        """
+            Function that make the current board of the simulation the latest generation, called by the worker
+            Parameters :
+                - rects : the regions changed since the previous publication, None for the whole board
+        """
+        region = self.__region
+        if region is None:
+            board = self.simulation.get_board()
+        else:
+            board = self.simulation.get_region(*region)
+            if rects is not None:
+                # Regions relative to the published region, the ones outside of it being dropped
+                x0, y0, x1, y1 = region
+                rects = [(max(a, x0) - x0, max(b, y0) - y0, min(c, x1) - x0, min(d, y1) - y0)
+                         for a, b, c, d in rects if a < x1 and c > x0 and b < y1 and d > y0]
+        if self.__back is None or self.__back.shape != board.shape:
+            self.__back = empty(board.shape, dtype=bool)
+            rects = None
+        copyto(self.__back, board)
+
+        with self.__lock:
+            self.__front, self.__back = self.__back, self.__front
+            self.__generation = self.simulation.generation
+            self.__cycle = self.simulation.cycle()
+            self.__version += 1
+            if rects is None or self.__rects is None:
+                self.__rects = None
+            else:
+                self.__rects.update(rects)
+                if len(self.__rects) > self.maxrects:
+                    self.__rects = None
+
+    # Get the generation of the last published board
+    def get_generation(self):
+        with self.__lock:
+            return self.__generation
+
+    # Get the cycle of the last published generation, as a (period, start generation) tuple, None if there is none
+    def cycle(self):
+        with self.__lock:
+            return self.__cycle
+
+    def latest(self):
+        """
+            Function that get the last published generation, to be called by the view at its refresh rate
+            Return :
+                - frame : None if nothing was published since the previous call, otherwise a (generation, board, rects)
+                  tuple, board being a copy owned by the caller until the next call and rects the regions changed since
+                  the previous call (None for the whole board)
+        """
+        with self.__lock:
+            if self.__version == self.__seen:
+                return None
+            if self.__display is None or self.__display.shape != self.__front.shape:
+                self.__display = empty(self.__front.shape, dtype=bool)
+                self.__rects = None
+            copyto(self.__display, self.__front)
+            self.__seen = self.__version
+            rects, self.__rects = self.__rects, set()
+            return self.__generation, self.__display, None if rects is None else sorted(rects)
+
+    def _loop(self):
+        deadline = time.perf_counter()
+        while not self.__stopped:
+            # Apply the queued changes between two generations
+            with self.__lock:
+                commands, self.__commands = self.__commands, []
+            if commands:
+                rects = []
+                for function, changed in commands:
+                    function()
+                    rects = None if rects is None or changed is None else rects + [tuple(rect) for rect in changed]
+                self._publish(rects)
+
+            if not self.__running:
+                self.__wakeup.wait()
+                self.__wakeup.clear()
+                deadline = time.perf_counter()
+                continue
+
+            # Wait for the time of the next generation, unless running as fast as possible
+            if self.generationsPerSecond:
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    self.__wakeup.wait(delay)
+                    self.__wakeup.clear()
+                    continue
+
+            self.simulation.step()
+            self._publish(self.simulation.dirtyRects())
+            if self.pauseOnCycle and self.simulation.cycle() is not None:
+                self.__running = False
+
+            # A late generation moves the next deadline instead of stepping in bursts to catch up
+            if self.generationsPerSecond:
+                period = 1.0 / self.generationsPerSecond
+                deadline = max(deadline + period, time.perf_counter() - period)
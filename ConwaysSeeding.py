@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from numpy import zeros
+from numpy.random import SeedSequence, default_rng
+
+def randomSoup(gridx, gridy, density=0.5, seed=None, region=None):
+    """
+        Function that draw a random board in one vectorized call of a numpy Generator
+        Parameters :
+            - gridx, gridy : the size of the board
+            - density : the probability of a cell to be alive
+            - seed : the seed of the generator, an int, a SeedSequence or None for a fresh one
+            - region : the (x0, y0, x1, y1) cell range that is filled, the other cells being dead, the whole board by default
+        Return :
+            - board : the boolean board
+    """
+    if region is None:
+        return default_rng(seed).random((gridx, gridy)) < density
+    x0, y0, x1, y1 = region
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = max(x0, min(gridx, x1)), max(y0, min(gridy, y1))
+    board = zeros((gridx, gridy), dtype=bool)
+    board[x0:x1, y0:y1] = default_rng(seed).random((x1 - x0, y1 - y0)) < density
+    return board
+
+def memberSeed(seed, index):
+    """
+        Function that get the seed of one member of a batch, an independent stream derived from the seed of the batch
+        Parameters :
+            - seed : the seed of the batch, an int or a SeedSequence
+            - index : the index of the member in the batch
+        Return :
+            - seed : the SeedSequence of the member, a function of the entropy and spawn key of the seed and of the index
+              only, the same as the seed spawned by SeedSequence(seed).spawn(count)[index] whatever was spawned from it
+    """
+    if not isinstance(seed, SeedSequence):
+        seed = SeedSequence(seed)
+    return SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (index,), pool_size=seed.pool_size)
+
+def randomSoups(count, gridx, gridy, density=0.5, seed=None, region=None):
+    """
+        Function that draw a batch of random boards, each from its own stream so any member can be drawn again alone
+        with randomSoup(gridx, gridy, density, memberSeed(seed, index), region)
+        Parameters :
+            - count : the number of boards
+            - gridx, gridy, density, region : as for randomSoup
+            - seed : the seed of the batch, an int, a SeedSequence or None for a fresh one
+        Return :
+            - boards : the (count, gridx, gridy) boolean array
+    """
+    if not isinstance(seed, SeedSequence):
+        seed = SeedSequence(seed)
+    boards = zeros((count, gridx, gridy), dtype=bool)
+    for index in range(count):
+        boards[index] = randomSoup(gridx, gridy, density, memberSeed(seed, index), region)
+    return boards
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+import argparse, asyncio, socket, struct, sys, threading, time
+
+from numpy import cumsum, diff, empty, flatnonzero, frombuffer, int8, packbits, uint8, unpackbits, zeros
+
+# Header of every message : kind, generation, position of the upper left cell, size of the board, size of the payload
+MESSAGE_HEADER = struct.Struct("<BQiiIII")
+KEYFRAME, DELTA = 1, 2
+
+def encodeKeyframe(generation, board, origin=(0, 0)):
+    """
+        Function that encode a whole board as a message, its cells packed 1 bit per cell in the order of board.ravel()
+        Parameters :
+            - generation : the generation of the board
+            - board : the boolean board
+            - origin : the (x, y) position of the cell board[0][0]
+        Return :
+            - message : the bytes of the message
+    """
+    payload = packbits(board, axis=None).tobytes()
+    return MESSAGE_HEADER.pack(KEYFRAME, generation, origin[0], origin[1], board.shape[0], board.shape[1], len(payload)) + payload
+
+def encodeDelta(generation, previous, board, origin=(0, 0)):
+    """
+        Function that encode the cells that changed since the previous board as runs of changed cells
+        Parameters :
+            - generation : the generation of the board
+            - previous, board : the boolean boards, of the same shape and origin
+            - origin : the (x, y) position of the cell board[0][0]
+        Return :
+            - message : the bytes of the message, whose payload is (start, length) uint32 pairs indexing board.ravel()
+    """
+    changed = zeros(board.size + 2, dtype=int8)
+    changed[1:-1] = (previous != board).ravel()
+    edges = flatnonzero(diff(changed))
+    starts, ends = edges[0::2], edges[1::2]
+    runs = empty((len(starts), 2), dtype='<u4')
+    runs[:, 0], runs[:, 1] = starts, ends - starts
+    payload = runs.tobytes()
+    return MESSAGE_HEADER.pack(DELTA, generation, origin[0], origin[1], board.shape[0], board.shape[1], len(payload)) + payload
+
+def applyMessage(board, kind, shape, payload):
+    """
+        Function that apply a message to the board of a viewer
+        Parameters :
+            - board : the current boolean board, None before the first keyframe, modified in place by a delta
+            - kind, shape, payload : the kind of the message, the size of the board and the payload
+        Return :
+            - board, rects : the new board and the (x0, y0, x1, y1) cell regions that changed, None for the whole board
+    """
+    count = shape[0] * shape[1]
+    if kind == KEYFRAME:
+        cells = unpackbits(frombuffer(payload, dtype=uint8), count=count).view(bool)
+        return cells.reshape(shape).copy(), None
+    runs = frombuffer(payload, dtype='<u4').reshape(-1, 2).astype(int)
+    if len(runs) == 0:
+        return board, []
+    # Cells covered by a run : +1 at its start and -1 after its end, summed along the board
+    marks = zeros(count + 1, dtype=int8)
+    marks[runs[:, 0]] += 1
+    marks[runs[:, 0] + runs[:, 1]] -= 1
+    flat = board.reshape(-1)
+    flat ^= cumsum(marks[:-1]) > 0
+    first, last = runs[0, 0], runs[-1, 0] + runs[-1, 1] - 1
+    # Rows x of the board are contiguous in the order of board.ravel()
+    return board, [(first // shape[1], 0, last // shape[1] + 1, shape[1])]
+
+# Get an (host, port) or a Unix socket path from an address as "127.0.0.1:8765" or "unix:/tmp/life.sock"
+def parseAddress(address):
+    if address.startswith("unix:"):
+        return address[5:]
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+class _Client:
+    """ Queue of the messages waiting to be sent to a viewer """
+    def __init__(self, queuesize):
+        self.queue   = asyncio.Queue(queuesize)
+        self.resync  = True # The next message has to be a keyframe
+        self.dropped = 0
+
+class ConwaysServer:
+    """
+        Runs a ConwaysSimulation once and streams its generations to any number of viewers over a TCP or Unix socket,
+        with asyncio.
+
+        A viewer gets a keyframe (the whole board) when it connects, then one delta per generation, the runs of cells
+        that changed, encoded once for every viewer. Each viewer has its own queue of at most queuesize messages :
+        when a slow reader lets it fill up, its pending messages are dropped and it gets a keyframe again at the next
+        generation, so a slow viewer skips generations instead of slowing the simulation or the other viewers.
+
+        The generations are stepped on a worker thread, the event loop only sending the messages.
+
+        Parameters :
+            - simulation : the ConwaysSimulation to run
+            - generationsPerSecond : the target speed, None or 0 to run as fast as possible
+            - region : the (x0, y0, x1, y1) cell range streamed, the whole board by default (the home window of an
+              unbounded board)
+            - queuesize : the number of messages waiting for a viewer above which its messages are dropped
+    """
+    def __init__(self, simulation, generationsPerSecond=8.0, region=None, queuesize=4):
+        self.simulation = simulation
+        self.generationsPerSecond = generationsPerSecond
+        self.region     = None if region is None else tuple(region)
+        self.queuesize  = queuesize
+        self.clients    = set()
+        self.__frame    = None
+
+    # Get the streamed board of the simulation with the position of its upper left cell
+    def _frame(self):
+        if self.region is None:
+            return self.simulation.generation, self.simulation.get_board().copy(), (0, 0)
+        return self.simulation.generation, self.simulation.get_region(*self.region), self.region[:2]
+
+    # Step the simulation and encode the delta from the previous generation, run on the worker thread
+    def _advance(self):
+        self.simulation.step()
+        generation, board, origin = self._frame()
+        previous = self.__frame
+        if previous[1].shape != board.shape or previous[2] != origin:
+            return (generation, board, origin), None
+        return (generation, board, origin), encodeDelta(generation, previous[1], board, origin)
+
+    def _broadcast(self, delta):
+        """
+            Function that queue the last generation for every viewer, as a delta or as a keyframe for the viewers that
+            missed a generation
+            Parameters :
+                - delta : the encoded delta, None if only a keyframe can be sent
+        """
+        keyframe = None
+        for client in self.clients:
+            if client.queue.full():
+                # Slow reader : its pending generations are dropped and it starts again from a keyframe
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                    client.dropped += 1
+                client.resync = True
+            if client.resync or delta is None:
+                if keyframe is None:
+                    keyframe = encodeKeyframe(*self.__frame)
+                client.queue.put_nowait(keyframe)
+                client.resync = False
+            else:
+                client.queue.put_nowait(delta)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self.__frame = self._frame()
+        deadline = time.perf_counter()
+        while True:
+            self.__frame, delta = await loop.run_in_executor(None, self._advance)
+            self._broadcast(delta)
+            if self.generationsPerSecond:
+                deadline = max(deadline + 1.0 / self.generationsPerSecond, time.perf_counter() - 1.0 / self.generationsPerSecond)
+                await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+            else:
+                await asyncio.sleep(0)
+
+    async def _serveClient(self, reader, writer):
+        client = _Client(self.queuesize)
+        self.clients.add(client)
+        if self.__frame is not None:
+            client.queue.put_nowait(encodeKeyframe(*self.__frame))
+            client.resync = False
+        try:
+            while True:
+                writer.write(await client.queue.get())
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    async def serve(self, address):
+        """
+            Function that run the simulation and accept viewers until the task is cancelled
+            Parameters :
+                - address : "host:port" for TCP or "unix:/path" for a Unix socket
+        """
+        target = parseAddress(address)
+        if isinstance(target, str):
+            server = await asyncio.start_unix_server(self._serveClient, target)
+        else:
+            server = await asyncio.start_server(self._serveClient, target[0], target[1])
+        async with server:
+            await self._run()
+
+class ConwaysStreamClient:
+    """
+        Viewer of a ConwaysServer : a thread reads the messages and keeps the board up to date, latest() giving the
+        last generation as ConwaysRunner.latest() does, so a ConwaysCanvas can show it without stepping anything.
+
+        Parameters :
+            - address : "host:port" for TCP or "unix:/path" for a Unix socket
+        Note : call close() to disconnect.
+    """
+    def __init__(self, address):
+        target = parseAddress(address)
+        if isinstance(target, str):
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.connect(target)
+        else:
+            self.__socket = socket.create_connection(target)
+        self.origin     = (0, 0)
+        self.generation = None
+        self.__board    = None
+        self.__rects    = None
+        self.__version  = 0
+        self.__seen     = 0
+        self.__lock     = threading.Lock()
+        self.__thread   = threading.Thread(target=self._loop, name="ConwaysStreamClient", daemon=True)
+        self.__thread.start()
+
+    # Read exactly size bytes, None if the server closed the connection
+    def _read(self, size):
+        chunks = []
+        while size > 0:
+            chunk = self.__socket.recv(min(size, 1 << 20))
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def _loop(self):
+        try:
+            while True:
+                header = self._read(MESSAGE_HEADER.size)
+                if header is None:
+                    break
+                kind, generation, x0, y0, gridx, gridy, length = MESSAGE_HEADER.unpack(header)
+                payload = self._read(length)
+                if payload is None:
+                    break
+                with self.__lock:
+                    if kind == DELTA and self.__board is None:
+                        continue
+                    self.__board, rects = applyMessage(self.__board, kind, (gridx, gridy), payload)
+                    self.origin, self.generation = (x0, y0), generation
+                    self.__version += 1
+                    if rects is None or self.__rects is None:
+                        self.__rects = None
+                    else:
+                        self.__rects.update(rects)
+        except OSError:
+            pass
+
+    def latest(self):
+        """
+            Function that get the last generation received, to be called by the view at its refresh rate
+            Return :
+                - frame : None if nothing was received since the previous call, otherwise a (generation, board, rects)
+                  tuple, board being a copy and rects the regions changed since the previous call (None for the whole board)
+        """
+        with self.__lock:
+            if self.__version == self.__seen:
+                return None
+            self.__seen = self.__version
+            rects, self.__rects = self.__rects, set()
+            return self.generation, self.__board.copy(), None if rects is None else sorted(rects)
+
+    # Disconnect from the server
+    def close(self):
+        try:
+            self.__socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.__socket.close()
+        self.__thread.join()
+
+# Show the stream of a server in a window, the canvas only drawing what it receives
+def view(address, cellsize=10):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from ConwaysCanvas import ConwaysCanvas
+
+    application = QApplication.instance() or QApplication(sys.argv)
+    client = ConwaysStreamClient(address)
+    canvas = ConwaysCanvas(cellsize, 0, 0)
+    canvas.attachViewer(client)
+    canvas.setWindowTitle("Conway's Game of Life - %s" % address)
+    canvas.show()
+    timer = QTimer()
+    timer.timeout.connect(canvas.showLatest)
+    timer.start(16)
+    status = application.exec_()
+    client.close()
+    return status
+
+def main(argv=None):
+    """
+        Command line entry point : serve a simulation, or view the stream of a server with --view
+        Return :
+            - status : 0 on success
+    """
+    parser = argparse.ArgumentParser(description="Stream Conway's Game of Life to viewers")
+    parser.add_argument("--address", type=str, default="127.0.0.1:8765", help="host:port or unix:/path of the server (default 127.0.0.1:8765)")
+    parser.add_argument("--view", action="store_true", help="open a window showing the stream of the server instead of serving")
+    parser.add_argument("--cellsize", type=int, default=10, help="size of a cell in the viewer window, in pixels (default 10)")
+    parser.add_argument("--width", type=int, default=128, help="number of cells along x (default 128)")
+    parser.add_argument("--height", type=int, default=96, help="number of cells along y (default 96)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random board")
+    parser.add_argument("--density", type=float, default=0.5, help="probability of a cell of the random board to be alive (default 0.5)")
+    parser.add_argument("--rule", type=str, default="B3/S23", help="Life-like rule in the B/S notation (default B3/S23)")
+    parser.add_argument("--topology", choices=["dead", "torus", "klein", "cross"], default="torus", help="boundary of the board (default torus)")
+    parser.add_argument("--speed", type=float, default=8, help="generations per second, 0 to run as fast as possible (default 8)")
+    parser.add_argument("--queue", type=int, default=4, help="messages waiting for a viewer above which they are dropped (default 4)")
+    args = parser.parse_args(argv)
+
+    if args.view:
+        return view(args.address, args.cellsize)
+
+    from ConwaysActiveEngine import ConwaysActiveEngine
+    from ConwaysSimulation import ConwaysSimulation
+    simulation = ConwaysSimulation(args.width, args.height, ConwaysActiveEngine(args.width, args.height, rule=args.rule, topology=args.topology))
+    simulation.regen(args.seed, args.density)
+    try:
+        asyncio.run(ConwaysServer(simulation, args.speed, queuesize=args.queue).serve(args.address))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == """__main__""":
+    sys.exit(main())
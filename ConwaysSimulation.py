@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from numpy import asarray, int64, where, zeros
+
+from ConwaysActiveEngine import ConwaysActiveEngine
+from ConwaysCycleDetector import ConwaysBoardHash, ConwaysCycleDetector
+from ConwaysStatistics import PROFILER, RECORD_FIELDS
+
+class ConwaysSimulation:
+    """
+        Simulation core of the Game of Life, without any Qt dependency : it owns the board and the stepping engine, and
+        the widgets (ConwaysCanvas, ConwaysGrid) are views over it.
+
+        Parameters :
+            - gridx, gridy : the size of the board, the board being indexed board[x][y]
+            - engine : the stepping engine, a ConwaysActiveEngine by default. Any engine with the get_board, set_board,
+              set_cell, toggle_cell and step methods can be used (ConwaysEngine, ConwaysBitBoard, ConwaysParallelEngine, ...).
+              With a ConwaysChunkedEngine the board is unbounded, gridx and gridy being the size of its home window
+            - maxhistory : the number of board hashes kept to detect cycles, the longest period that can be detected
+        Note : once the board is known to be in a cycle, still lifes are not stepped anymore and run() jumps over
+        whole periods, since the boards repeat.
+
+        Telemetry : the listeners added with addListener get a record after every generation, with the population,
+        the births and deaths counted by the engine during the step, the bounding box of the live cells, the time of
+        the step and the time of the last paint of a view (None without a view). The records are only built while
+        there is a listener, and the whole-period jumps of fastForward do not produce any.
+
+        History : once enableHistory is called, every generation and every edit is recorded in a ConwaysHistory
+        (timeline), and rewind goes back to any retained generation. Stepping or editing after a rewind discards the
+        generations that were after it.
+    """
+    def __init__(self, gridx=10, gridy=10, engine=None, maxhistory=256):
+        self.gridheight = gridx
+        self.gridwidth  = gridy
+        self.valueOn    = 0
+        self.valueOff   = 1
+        self.engine     = engine if engine is not None else ConwaysActiveEngine(self.gridheight, self.gridwidth)
+        self.generation = 0
+        self.hash       = ConwaysBoardHash(getattr(self.engine, "tilesize", 32))
+        self.cycles     = ConwaysCycleDetector(maxhistory)
+        self.population = 0
+        self.paintTime  = None
+        self.timeline   = None
+        self.__listeners = []
+        self.__wantsBounds = False
+        # True while the board is a still life and the steps skip the engine, nothing changing
+        self.__skipped     = False
+
+    def regen(self, seed=None, density=0.5, region=None):
+        """
+            Function that fill the board with random cells
+            Parameters :
+                - seed : the seed of the random generator, None for a different board every time
+                - density : the probability of a cell to be alive
+                - region : the (x0, y0, x1, y1) cell range that is filled, the other cells being dead, the whole board by default
+        """
+        from ConwaysSeeding import randomSoup
+        self.set_board(randomSoup(self.gridheight, self.gridwidth, density, seed, region))
+
+    # Clear the board by setting each cell to off
+    def cleargrid(self):
+        self.set_board(zeros((self.gridheight, self.gridwidth), dtype=bool))
+
+    # Advance the board by one generation
+    def step(self):
+        self.generation += 1
+        if self.cycles.period == 1:
+            self.__skipped = True
+            if self.__listeners:
+                self._notify(0, 0, 0.0)
+            self._record()
+            return
+        self.__skipped = False
+        start = time.perf_counter()
+        self.engine.step()
+        elapsed = time.perf_counter() - start
+        PROFILER.record("step", elapsed)
+        self.cycles.push(self.generation, self._hashBoard(self.dirtyRects()))
+        if self.__listeners:
+            self._notify(self.engine.births, self.engine.deaths, elapsed)
+        self._record()
+
+    def _notify(self, births, deaths, elapsed):
+        """
+            Function that send the record of the last generation to the listeners
+            Parameters :
+                - births, deaths : the number of cells born and dead during the generation, counted by the engine
+                - elapsed : the time of the step, in seconds
+        """
+        self.population += births - deaths
+        record = {"generation" : self.generation,
+                  "population" : self.population,
+                  "births"     : births,
+                  "deaths"     : deaths,
+                  "bounds"     : self.engine.liveBounds() if self.__wantsBounds else None,
+                  "step_time"  : elapsed,
+                  "paint_time" : self.paintTime}
+        for listener in list(self.__listeners):
+            listener(record)
+
+    def addListener(self, listener):
+        """
+            Function that add a function called with the record of every generation, as a dictionary with the keys of
+            ConwaysStatistics.RECORD_FIELDS. The bounds of the live cells cost a scan of the board, they are only computed
+            when a listener asks for them : a listener with a fields attribute gets None as bounds unless "bounds" is
+            one of its fields, a listener without it gets every field.
+            Parameters :
+                - listener : a function with one argument, e.g. a ConwaysCSVSink or a ConwaysJSONLSink
+        """
+        if not self.__listeners:
+            self.population = self.engine.population()
+        self.__listeners.append(listener)
+        self.engine.trackChanges = True
+        self.__wantsBounds = self._wantsBounds()
+
+    # Remove a listener added with addListener
+    def removeListener(self, listener):
+        self.__listeners.remove(listener)
+        self.engine.trackChanges = bool(self.__listeners)
+        self.__wantsBounds = self._wantsBounds()
+
+    # Whether a listener reads the bounds of the live cells
+    def _wantsBounds(self):
+        return any("bounds" in getattr(listener, "fields", RECORD_FIELDS) for listener in self.__listeners)
+
+    def stream(self, generations=None):
+        """
+            Generator that advance the board one generation at a time and yield the record of each generation
+            Parameters :
+                - generations : the number of generations, None to run until the generator is closed
+        """
+        records = []
+        self.addListener(records.append)
+        try:
+            while generations is None or generations > 0:
+                self.step()
+                if records:
+                    yield records.pop()
+                if generations is not None:
+                    generations -= 1
+        finally:
+            self.removeListener(records.append)
+
+    def fastForward(self, generations):
+        """
+            Function that advance the board by a number of generations, jumping over whole periods once a cycle is known
+            Parameters :
+                - generations : the number of generations
+        """
+        if self.cycles.period is not None:
+            skipped = generations - generations % self.cycles.period
+            self.generation += skipped
+            generations -= skipped
+        for _ in range(generations):
+            self.step()
+
+    # Get the cycle the board is in, as a (period, start generation) tuple, None if no cycle was detected
+    def cycle(self):
+        return self.cycles.cycle()
+
+    # *----------------------------HISTORY------------------------------------*
+    def enableHistory(self, budget=64*1024*1024, keyframeInterval=32):
+        """
+            Function that start recording the generations in a ConwaysHistory, from the current one
+            Parameters :
+                - budget : the maximum number of bytes used by the history, the oldest generations being evicted
+                - keyframeInterval : the number of generations stored as deltas between two whole boards
+        """
+        from ConwaysHistory import ConwaysHistory
+        self.timeline = ConwaysHistory(budget, keyframeInterval)
+        self._record()
+
+    # Stop recording the generations and forget the history
+    def disableHistory(self):
+        self.timeline = None
+
+    # Get the board with the position of its upper left cell : the live cells of an unbounded board, the whole board otherwise
+    def _frame(self):
+        if self.get_topology() != "infinite":
+            return self.get_board(), (0, 0)
+        bounds = self.engine.liveBounds()
+        if bounds is None:
+            return zeros((0, 0), dtype=bool), (0, 0)
+        return self.engine.get_region(*bounds), bounds[:2]
+
+    # Add the current generation to the history, if it is recorded
+    def _record(self):
+        if self.timeline is not None:
+            board, origin = self._frame()
+            self.timeline.record(self.generation, board, origin)
+
+    def rewind(self, generation):
+        """
+            Function that go back (or forward) to a generation retained by the history, rebuilt without replaying the run
+            Parameters :
+                - generation : the generation
+            Return :
+                - found : False if the history does not hold this generation, the board being left unchanged
+        """
+        frame = None if self.timeline is None else self.timeline.get(generation)
+        if frame is None:
+            return False
+        board, origin = frame
+        if self.get_topology() == "infinite":
+            self.engine.set_board(zeros((self.gridheight, self.gridwidth), dtype=bool))
+            self.engine.set_region(board, *origin)
+        else:
+            self.gridheight, self.gridwidth = board.shape
+            self.engine.set_board(board)
+        self.generation = generation
+        # The history is kept as it is, so the later generations can still be reached
+        self.__skipped = False
+        self.cycles.reset()
+        self.cycles.push(self.generation, self._hashBoard(None))
+        if self.__listeners:
+            self.population = self.engine.population()
+        return True
+
+    # Go back to the previous generation retained by the history, False if there is none
+    def stepBack(self):
+        if self.timeline is None:
+            return False
+        generation = self.timeline.previous(self.generation)
+        return generation is not None and self.rewind(generation)
+
+    # The board was changed by something else than a generation, its hash is updated and the history restarts
+    def _edited(self, rects=None):
+        self.__skipped = False
+        self.cycles.reset()
+        self.cycles.push(self.generation, self._hashBoard(rects))
+        if self.__listeners:
+            self.population = self.engine.population()
+        self._record()
+
+    # Get the hash of the board after the given regions changed, kept by the engine itself when it can
+    def _hashBoard(self, rects):
+        if hasattr(self.engine, "boardHash"):
+            return self.engine.boardHash()
+        return self.hash.update(self.get_board(), rects)
+
+    def run(self, generations):
+        """
+            Function that advance the board by a given number of generations as fast as possible
+            Parameters :
+                - generations : the number of generations
+            Return :
+                - statistics : a dictionary with the board size, generations, final population, elapsed time and speed
+        """
+        start = time.perf_counter()
+        for done in range(generations):
+            if self.cycles.period is not None:
+                self.fastForward(generations - done)
+                break
+            self.step()
+        elapsed = time.perf_counter() - start
+
+        statistics = self.statistics()
+        statistics["elapsed"] = elapsed
+        statistics["generations_per_second"] = generations / elapsed if elapsed > 0 else float("inf")
+        return statistics
+
+    # Get a summary of the current state of the board
+    def statistics(self):
+        cycle = self.cycle()
+        return {"gridheight" : self.gridheight,
+                "gridwidth"  : self.gridwidth,
+                "generation" : self.generation,
+                "population" : self.engine.population(),
+                "rule"       : str(self.get_rule()),
+                "topology"   : self.get_topology(),
+                "period"     : None if cycle is None else cycle[0],
+                "cycle_start": None if cycle is None else cycle[1]}
+
+    # Get the regions of the board that changed in the last generation, as (x0, y0, x1, y1) cell ranges, none if the
+    # generation was a still life skipping the engine
+    def dirtyRects(self):
+        if self.__skipped:
+            return []
+        if hasattr(self.engine, "dirtyRects"):
+            return self.engine.dirtyRects()
+        return [(0, 0, self.gridheight, self.gridwidth)]
+
+    # *----------------------------GET--SET------------------------------------*
+    # Toggle the state of the cell (x, y)
+    def toggle_cell (self, x, y):
+        self.engine.toggle_cell(x, y)
+        self._edited([(x, y, x+1, y+1)])
+
+    # Get the state of the cell (x, y), 1 if alive and 0 otherwise
+    def get_cell (self, x, y):
+        return self.engine.get_cell(x, y)
+
+    # Set the state of the cell (x, y)
+    def set_cell (self, x, y, value):
+        self.engine.set_cell(x, y, value)
+        self._edited([(x, y, x+1, y+1)])
+
+    def set_cells (self, xs, ys, value):
+        """
+            Function that set many cells to the same state at once, as a mouse stroke does
+            Parameters :
+                - xs, ys : the coordinates of the cells, the ones outside a bounded board being ignored
+                - value : the state of the cells
+        """
+        xs, ys = asarray(xs, dtype=int64).ravel(), asarray(ys, dtype=int64).ravel()
+        if self.get_topology() != "infinite":
+            inside = (xs >= 0) & (xs < self.gridheight) & (ys >= 0) & (ys < self.gridwidth)
+            xs, ys = xs[inside], ys[inside]
+        if len(xs) == 0:
+            return
+        if hasattr(self.engine, "set_cells"):
+            self.engine.set_cells(xs, ys, value)
+        else:
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                self.engine.set_cell(x, y, value)
+        self._edited([(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)])
+
+    # Get the rule of the game, a ConwaysRule
+    def get_rule (self):
+        return self.engine.get_rule()
+
+    # Set the rule of the game, a ConwaysRule or a rule string as "B36/S23", the cycle history restarts
+    def set_rule (self, rule):
+        self.engine.set_rule(rule)
+        self._edited()
+
+    # Get the boundary topology of the board, "infinite" for an unbounded board
+    def get_topology (self):
+        return self.engine.get_topology()
+
+    def set_topology (self, topology):
+        """
+            Function that set the boundary topology of the board, the cycle history restarts
+            Parameters :
+                - topology : "dead", "torus", "klein" or "cross", or "infinite" for an unbounded board. Switching between
+                  bounded and unbounded boards replaces the engine, keeping the cells of the home window
+        """
+        unbounded = self.engine.get_topology() == "infinite"
+        if topology == "infinite" and not unbounded:
+            from ConwaysChunkedEngine import ConwaysChunkedEngine
+            self.set_engine(ConwaysChunkedEngine(self.gridheight, self.gridwidth, rule=self.get_rule()))
+        elif topology != "infinite" and unbounded:
+            self.set_engine(ConwaysActiveEngine(self.gridheight, self.gridwidth, rule=self.get_rule(), topology=topology))
+        else:
+            self.engine.set_topology(topology)
+            self._edited()
+
+    # Replace the stepping engine, the board of the current engine is copied into it
+    def set_engine (self, engine):
+        board = self.get_board()
+        engine.trackChanges = self.engine.trackChanges
+        if hasattr(self.engine, "close"):
+            self.engine.close()
+        self.engine = engine
+        self.hash   = ConwaysBoardHash(getattr(self.engine, "tilesize", 32))
+        self.set_board(board)
+
+    def get_region (self, x0, y0, x1, y1):
+        """
+            Function that get the cells of a rectangular region of the board, the cells outside a bounded board being dead
+            Parameters :
+                - x0, y0, x1, y1 : the cell range of the region, x1 and y1 excluded, any integers
+            Return :
+                - board : a (x1-x0) x (y1-y0) boolean array
+        """
+        if hasattr(self.engine, "get_region"):
+            return self.engine.get_region(x0, y0, x1, y1)
+        board  = self.get_board()
+        region = zeros((max(0, x1-x0), max(0, y1-y0)), dtype=bool)
+        xa, xb = max(x0, 0), min(x1, board.shape[0])
+        ya, yb = max(y0, 0), min(y1, board.shape[1])
+        if xa < xb and ya < yb:
+            region[xa-x0:xb-x0, ya-y0:yb-y0] = board[xa:xb, ya:yb]
+        return region
+
+    # Get the board as a boolean array
+    def get_board (self):
+        return self.engine.get_board()
+
+    # Set the board from any array-like of booleans, resizing the board if needed
+    def set_board (self, board):
+        board = asarray(board, dtype=bool)
+        self.gridheight, self.gridwidth = board.shape
+        self.engine.set_board(board)
+        self._edited()
+
+    # Get array of values representing the grid, coded with valueOn and valueOff
+    def get_grid (self):
+        return where(self.get_board(), self.valueOn, self.valueOff)
+
+    # Set values of array representing the grid, coded with valueOn and valueOff
+    def set_grid (self, grid):
+        self.set_board(asarray(grid) == self.valueOn)
+
+    # Get the value that represents a live cell on the grid
+    def get_valueOn (self):
+        return self.valueOn
+
+    # Set the value that will represent a live cell on the grid
+    def set_valueOn (self, valueOn):
+        self.valueOn = valueOn
+
+    # Get the value that represents a dead cell on the grid
+    def get_valueOff (self):
+        return self.valueOff
+
+    # Set the value that will represent a dead cell on the grid
+    def set_valueOff (self, valueOff):
+        self.valueOff = valueOff
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import csv, json, math
+
+# Fields of the record sent by ConwaysSimulation after every generation
+RECORD_FIELDS = ["generation", "population", "births", "deaths", "bounds", "step_time", "paint_time"]
+
+# Check a list of record fields, None meaning every field
+def checkFields(fields):
+    if fields is None:
+        return list(RECORD_FIELDS)
+    unknown = [field for field in fields if field not in RECORD_FIELDS]
+    if unknown:
+        raise ValueError("Unknown record fields %s, expected some of %s" % (", ".join(unknown), ", ".join(RECORD_FIELDS)))
+    return list(fields)
+
+class ConwaysProfiler:
+    """
+        Timing histograms of the hot paths (stepping, painting), recorded only while enabled so that the cost is a
+        single attribute check otherwise.
+
+        Each duration goes to a power of two bucket of microseconds : bucket k counts the durations between 2^(k-1)
+        and 2^k microseconds, bucket 0 the ones below 1 microsecond.
+    """
+    def __init__(self, enabled=False):
+        self.enabled    = enabled
+        self.histograms = {}
+
+    # Start recording the durations
+    def enable(self):
+        self.enabled = True
+
+    # Stop recording the durations, the histograms are kept
+    def disable(self):
+        self.enabled = False
+
+    # Forget every recorded duration
+    def reset(self):
+        self.histograms = {}
+
+    def record(self, name, seconds):
+        """
+            Function that add a duration to the histogram of a hot path, if the profiler is enabled
+            Parameters :
+                - name : the name of the hot path, e.g. "step" or "paint"
+                - seconds : the duration
+        """
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = {"count" : 0, "total" : 0.0, "max" : 0.0, "buckets" : [0]*33}
+        microseconds = seconds * 1e6
+        bucket = 0 if microseconds < 1 else min(32, int(math.log2(microseconds)) + 1)
+        histogram["buckets"][bucket] += 1
+        histogram["count"] += 1
+        histogram["total"] += seconds
+        histogram["max"]    = max(histogram["max"], seconds)
+
+    # Get the histograms as a dictionary ready to be written as JSON, the buckets being keyed by their upper bound in microseconds
+    def summary(self):
+        return dict((name, {"count"   : histogram["count"],
+                            "mean"    : histogram["total"] / histogram["count"],
+                            "max"     : histogram["max"],
+                            "buckets" : dict(("<%dus" % (1 << bucket), count) for bucket, count in enumerate(histogram["buckets"]) if count)})
+                    for name, histogram in self.histograms.items())
+
+# Profiler shared by the simulation and the widgets, disabled by default
+PROFILER = ConwaysProfiler()
+
+class ConwaysCSVSink:
+    """
+        Listener of a ConwaysSimulation writing every record as a line of a CSV file, the bounds being split in the
+        x0, y0, x1 and y1 columns.
+
+        Parameters :
+            - path : the path of the file
+            - fields : the fields of RECORD_FIELDS written, in that order, all by default
+    """
+    def __init__(self, path, fields=None):
+        self.fields   = checkFields(fields)
+        self.__file   = open(path, "w", newline="")
+        self.__writer = csv.writer(self.__file)
+        header = []
+        for field in self.fields:
+            header += ["x0", "y0", "x1", "y1"] if field == "bounds" else [field]
+        self.__writer.writerow(header)
+
+    def __call__(self, record):
+        row = []
+        for field in self.fields:
+            value = record[field]
+            if field == "bounds":
+                row += list(value or ("", "", "", ""))
+            else:
+                row.append("" if value is None else value)
+        self.__writer.writerow(row)
+
+    # Close the file
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class ConwaysJSONLSink:
+    """
+        Listener of a ConwaysSimulation writing every record as a JSON object on its own line
+
+        Parameters :
+            - path : the path of the file
+            - fields : the fields of RECORD_FIELDS written, all by default
+    """
+    def __init__(self, path, fields=None):
+        self.fields = checkFields(fields)
+        self.__file = open(path, "w")
+
+    def __call__(self, record):
+        self.__file.write(json.dumps(dict((field, record[field]) for field in self.fields)) + "\n")
+
+    # Close the file
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+# Create the sink matching the extension of a path, .csv or JSON lines otherwise, writing the given fields
+def openSink(path, fields=None):
+    if path.lower().endswith(".csv"):
+        return ConwaysCSVSink(path, fields)
+    return ConwaysJSONLSink(path, fields)
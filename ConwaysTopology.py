@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+# Boundary topologies of a board, as (wrapx, flipx, wrapy, flipy) :
+#   - wrapx : the first and the last rows are neighbours, flipx : they are glued upside down (y becomes gridwidth-1-y)
+#   - wrapy : the first and the last columns are neighbours, flipy : they are glued upside down (x becomes gridheight-1-x)
+TOPOLOGIES = {
+    "dead"  : (False, False, False, False), # Cells outside the board are dead
+    "torus" : (True,  False, True,  False), # Both pairs of edges wrap around
+    "klein" : (True,  False, True,  True),  # Klein bottle, the columns wrap around with a twist
+    "cross" : (True,  True,  True,  True),  # Cross-surface (real projective plane), both pairs of edges wrap with a twist
+}
+
+# Check the name of a topology and return it
+def checkTopology(topology):
+    if topology not in TOPOLOGIES:
+        raise ValueError("Unknown topology %r, expected one of %s" % (topology, ", ".join(TOPOLOGIES)))
+    return topology
+
+def fillGhosts(padded, topology="dead"):
+    """
+        Function that fill the ring of ghost cells around a padded board, so the neighbours can be counted on the whole
+        padded array with no special case on the edges
+        Parameters :
+            - padded : a (n+2) x (m+2) array holding the board in padded[1:-1, 1:-1], or a stack of them with the boards
+              on the last two axes, modified in place
+            - topology : one of the names of TOPOLOGIES
+        Note : the ghost rows are filled first, then the ghost columns are copied from the padded array, ghost rows
+        included, so the corners are the cells diagonally across the glued edges.
+    """
+    wrapx, flipx, wrapy, flipy = TOPOLOGIES[topology]
+    if wrapx:
+        padded[..., 0, 1:-1]  = padded[..., -2, -2:0:-1] if flipx else padded[..., -2, 1:-1]
+        padded[..., -1, 1:-1] = padded[..., 1, -2:0:-1] if flipx else padded[..., 1, 1:-1]
+    else:
+        padded[..., 0, :]  = 0
+        padded[..., -1, :] = 0
+    if wrapy:
+        padded[..., :, 0]  = padded[..., ::-1, -2] if flipy else padded[..., :, -2]
+        padded[..., :, -1] = padded[..., ::-1, 1] if flipy else padded[..., :, 1]
+    else:
+        padded[..., :, 0]  = 0
+        padded[..., :, -1] = 0
+    return padded
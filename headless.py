@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import argparse, json, sys, time
+
+from ConwaysSimulation import ConwaysSimulation
+from ConwaysStatistics import PROFILER, openSink
+
+# Create the stepping engine selected on the command line
+def createEngine(name, gridx, gridy, workers, rule=None, topology="dead"):
+    if name == "numpy":
+        from ConwaysEngine import ConwaysEngine
+        return ConwaysEngine(gridx, gridy, rule=rule, topology=topology)
+    if name == "bitboard":
+        from ConwaysBitBoard import ConwaysBitBoard
+        return ConwaysBitBoard(gridx, gridy, rule=rule, topology=topology)
+    if name == "chunked":
+        from ConwaysChunkedEngine import ConwaysChunkedEngine
+        return ConwaysChunkedEngine(gridx, gridy, rule=rule)
+    if name == "parallel":
+        from ConwaysParallel import ConwaysParallelEngine
+        return ConwaysParallelEngine(gridx, gridy, workers=workers, rule=rule, topology=topology)
+    from ConwaysActiveEngine import ConwaysActiveEngine
+    return ConwaysActiveEngine(gridx, gridy, rule=rule, topology=topology)
+
+# Get the [r, g, b] colors of a comma separated list of hexadecimal colors as "6464ff,ffffff"
+def parseColors(text):
+    return [[int(color.strip().lstrip("#")[i:i+2], 16) for i in (0, 2, 4)] for color in text.split(",")]
+
+def main(argv=None):
+    """
+        Command line entry point running a simulation without Qt or a display, as fast as possible. The modules of
+        the options (engines, patterns, export, census) are only imported when they are used, to keep short runs short
+        Return :
+            - status : 0 on success
+    """
+    parser = argparse.ArgumentParser(description="Run Conway's Game of Life without a display")
+    parser.add_argument("--width", type=int, default=38, help="number of cells along x (default 38)")
+    parser.add_argument("--height", type=int, default=20, help="number of cells along y (default 20)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random board")
+    parser.add_argument("--density", type=float, default=0.5, help="probability of a cell of the random board to be alive (default 0.5)")
+    parser.add_argument("--pattern", type=str, default=None, help=".rle, .cells or .snap pattern placed in the middle of the board instead of a random board, its columns along --width and its lines along --height")
+    parser.add_argument("--generations", type=int, default=100, help="number of generations to run (default 100)")
+    parser.add_argument("--rule", type=str, default="B3/S23", help="Life-like rule in the B/S notation, e.g. B36/S23, or a name as highlife (default B3/S23)")
+    parser.add_argument("--topology", choices=["dead", "torus", "klein", "cross"], default="dead", help="boundary of the board : dead cells, torus, Klein bottle or cross-surface (default dead)")
+    parser.add_argument("--engine", choices=["active", "numpy", "bitboard", "parallel", "chunked"], default="active", help="stepping engine (default active), chunked being an unbounded board")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes of the parallel engine")
+    parser.add_argument("--output", type=str, default=None, help="write the final board to this .rle, .cells or .snap file")
+    parser.add_argument("--trace", type=str, default=None, help="write the population, births, deaths, bounding box and step time of every generation to this .csv or .jsonl file")
+    parser.add_argument("--trace-fields", type=str, default=None, help="comma separated fields of the trace, among generation, population, births, deaths, bounds, step_time and paint_time (default all), the bounds costing a scan of the board every generation")
+    parser.add_argument("--export", type=str, default=None, help="export every generation to this animated .gif, .png file name (numbered) or directory of PNG frames, encoded in a worker process")
+    parser.add_argument("--cellsize", type=int, default=4, help="size of a cell in the exported frames, in pixels (default 4)")
+    parser.add_argument("--colors", type=str, default="6464ff,ffffff,afafaf", help="hexadecimal colors of the live cells, dead cells and grid lines of the exported frames (default 6464ff,ffffff,afafaf)")
+    parser.add_argument("--grid", action="store_true", help="draw the grid lines in the exported frames")
+    parser.add_argument("--every", type=int, default=1, help="export one generation out of this number (default 1)")
+    parser.add_argument("--fps", type=float, default=10, help="frames per second of an exported GIF (default 10)")
+    parser.add_argument("--census", action="store_true", help="add the count of the still lifes, oscillators and spaceships of the final board to the statistics")
+    parser.add_argument("--profile", action="store_true", help="add timing histograms of the steps to the statistics")
+    parser.add_argument("--stats", type=str, default=None, help="write the statistics to this JSON file instead of the standard output")
+    args = parser.parse_args(argv)
+
+    simulation = ConwaysSimulation(args.width, args.height, createEngine(args.engine, args.width, args.height, args.workers, args.rule, args.topology))
+    if args.pattern:
+        from numpy import zeros
+        from ConwaysPatterns import placePattern, readPattern
+        # The columns of the pattern are along x (--width) and its lines along y (--height), as in the window
+        cells = readPattern(args.pattern)
+        if cells.shape[0] > args.width or cells.shape[1] > args.height:
+            print("The %dx%d pattern %s is cropped to the %dx%d board" % (cells.shape[0], cells.shape[1], args.pattern,
+                                                                          args.width, args.height), file=sys.stderr)
+        simulation.set_board(placePattern(zeros((args.width, args.height), dtype=bool), cells))
+    else:
+        simulation.regen(args.seed, args.density)
+
+    fields = args.trace_fields.split(",") if args.trace_fields else None
+    sink = openSink(args.trace, fields) if args.trace else None
+    if sink is not None:
+        simulation.addListener(sink)
+    if args.profile:
+        PROFILER.enable()
+    if args.export:
+        # Every generation is stepped, the frames being rendered and encoded by the worker of the exporter
+        from ConwaysExport import ConwaysExporter, exportRun
+        start = time.perf_counter()
+        colors = parseColors(args.colors) + [[175, 175, 175]]
+        with ConwaysExporter(args.export, args.cellsize, colors[0], colors[1], colors[2], grid=args.grid, fps=args.fps) as exporter:
+            frames = exportRun(simulation, exporter, args.generations, args.every)
+        statistics = simulation.statistics()
+        statistics["elapsed"] = time.perf_counter() - start
+        statistics["frames"] = frames
+    else:
+        statistics = simulation.run(args.generations)
+    if sink is not None:
+        simulation.removeListener(sink)
+        sink.close()
+    if args.profile:
+        statistics["profile"] = PROFILER.summary()
+    if args.census:
+        from ConwaysCensus import ConwaysCensus
+        # The live cells of an unbounded board may have left its home window
+        bounds = simulation.engine.liveBounds() if simulation.get_topology() == "infinite" else None
+        board = simulation.get_board() if bounds is None else simulation.get_region(*bounds)
+        statistics["census"] = ConwaysCensus(simulation.get_rule()).census(board)
+    statistics["seed"] = args.seed
+    statistics["density"] = None if args.pattern else args.density
+    statistics["pattern"] = args.pattern
+    statistics["engine"] = args.engine
+
+    if hasattr(simulation.engine, "close"):
+        simulation.engine.close()
+
+    if args.output:
+        from ConwaysPatterns import writePattern
+        writePattern(simulation.get_board(), args.output, generation=simulation.generation, rule=simulation.get_rule())
+    if args.stats:
+        with open(args.stats, "w") as target:
+            json.dump(statistics, target, indent=2)
+    else:
+        print(json.dumps(statistics, indent=2))
+    return 0
+
+
+if __name__ == """__main__""":
+    sys.exit(main())
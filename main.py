@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
-import os, sys
+import sys
 
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
-from PyQt5.QtCore import *
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QAction, QApplication, QHBoxLayout, QMainWindow, QPushButton, QSlider, QVBoxLayout, QWidget
 
-from ConwaysCanvas import *
+from ConwaysCanvas import ConwaysCanvas
+from ConwaysChunkedEngine import ConwaysChunkedEngine
+from ConwaysRunner import ConwaysRunner
+from ConwaysSimulation import ConwaysSimulation
 
 class ConwaysApp(QMainWindow):
     """ Conway App """
@@ -25,21 +28,32 @@ class ConwaysApp(QMainWindow):
         # -4 just makes the cell height a little shorter than the width so that all cells fit in the grid
         self.height       = self.gridheight*self.cellsize - 4
 
-        self.timer_period = 125
+        # Generations are computed on a background thread at generations_per_second, and the canvas shows the
+        # latest one every timer_period ms
+        self.generations_per_second = 8
+        self.timer_period = 16
         self.timer_state  = False
+        self.topology     = "infinite"
+        # Memory used to keep past generations for the timeline and stepping back
+        self.history_budget = 64*1024*1024
 
         self._initUI()
         self._initMenus()
+        self.runner = ConwaysRunner(self.conway_canvas.simulation, self.generations_per_second)
+        self.conway_canvas.attachRunner(self.runner)
         self.timer  = QTimer()
-        self.timer.timeout.connect(self.conway_canvas.updateGridEvent)
+        self.timer.timeout.connect(self.onRefresh)
+        self.timer.start(self.timer_period)
 
     def _initUI(self):
         self.setWindowTitle(self.title + " - [PAUSED]")
         self.setWindowIcon(QIcon('lib/ico.png'))
         self.setGeometry(self.margin_left, self.margin_top, self.width + 16, self.height + 20)
-        self.setFixedSize(self.size())
         self.setAttribute(Qt.WA_DeleteOnClose)
-        self.conway_canvas = ConwaysCanvas(self.cellsize, self.gridwidth, self.gridheight)
+        # The board is unbounded, the window showing a viewport over it that starts on its home window
+        simulation = ConwaysSimulation(self.gridwidth, self.gridheight, ConwaysChunkedEngine(self.gridwidth, self.gridheight))
+        simulation.enableHistory(self.history_budget)
+        self.conway_canvas = ConwaysCanvas(self.cellsize, self.gridwidth, self.gridheight, simulation=simulation)
 
         # Create parent widget
         self.widget = QWidget(self)
@@ -49,6 +63,12 @@ class ConwaysApp(QMainWindow):
         # Set vertical layout as layout 
         self.widget.setLayout(self.vbox) 
 
+        # Create timeline slider, over the generations kept in the history
+        self.timeline = QSlider(Qt.Horizontal, self)
+        self.timeline.setFocusPolicy(Qt.NoFocus)
+        self.timeline.valueChanged.connect(self.onTimeline)
+        self.vbox.addWidget(self.timeline)
+
         # Create Horizontal layout to hold buttons
         self.hbox = QHBoxLayout(self.widget)
 
@@ -97,12 +117,12 @@ class ConwaysApp(QMainWindow):
             # If Game is running, pause it
             if self.timer_state == True :
                 self.timer_state = False
-                self.timer.stop()
+                self.runner.pause()
                 self.setWindowTitle(self.title +" - [PAUSED]")
             # If Game is paused, run it
             else :
                 self.timer_state = True
-                self.timer.start(self.timer_period)
+                self.runner.start()
                 self.setWindowTitle(self.title)
 
         # If <Escape> is pressed close window
@@ -117,6 +137,76 @@ class ConwaysApp(QMainWindow):
         elif event.key() == Qt.Key_C:
             self.conway_canvas.cleargrid()
 
+        # If <+> or <-> is pressed, double or halve the number of generations per second
+        elif event.key() in (Qt.Key_Plus, Qt.Key_Equal):
+            self.generations_per_second = min(self.generations_per_second*2, 1024)
+            self.runner.set_generationsPerSecond(self.generations_per_second)
+        elif event.key() == Qt.Key_Minus:
+            self.generations_per_second = max(self.generations_per_second/2, 0.5)
+            self.runner.set_generationsPerSecond(self.generations_per_second)
+
+        # If <P> is pressed, switch pausing automatically when the board enters a cycle
+        elif event.key() == Qt.Key_P:
+            self.runner.pauseOnCycle = not self.runner.pauseOnCycle
+
+        # If <T> is pressed, switch to the next boundary topology : unbounded board, dead border, torus, Klein bottle, cross-surface
+        elif event.key() == Qt.Key_T:
+            topologies = ["infinite", "dead", "torus", "klein", "cross"]
+            self.topology = topologies[(topologies.index(self.topology) + 1) % len(topologies)]
+            self.conway_canvas.set_topology(self.topology)
+
+        # If <Left> or <Backspace> is pressed, pause and go back one generation
+        elif event.key() in (Qt.Key_Left, Qt.Key_Backspace):
+            self.pause()
+            self.conway_canvas.stepBack()
+
+        # If <F> is pressed, switch between running as fast as possible and the set speed
+        elif event.key() == Qt.Key_F:
+            if self.runner.get_generationsPerSecond():
+                self.runner.set_generationsPerSecond(None)
+            else:
+                self.runner.set_generationsPerSecond(self.generations_per_second)
+
+    # Function called by the timer, show the latest generation and whether the board entered a cycle
+    def onRefresh(self):
+        self.conway_canvas.showLatest()
+
+        # The runner may have paused itself on a cycle
+        if self.timer_state == True and not self.runner.isRunning():
+            self.timer_state = False
+            self.start_button.setText("Start")
+
+        # Follow the history on the timeline, without rewinding
+        bounds = self.conway_canvas.simulation.timeline.bounds()
+        if bounds is not None and not self.timeline.isSliderDown():
+            self.timeline.blockSignals(True)
+            self.timeline.setRange(*bounds)
+            self.timeline.setValue(self.runner.get_generation())
+            self.timeline.blockSignals(False)
+
+        title = self.title
+        cycle = self.runner.cycle()
+        if self.topology != "infinite":
+            title += " - [%s]" % self.topology.upper()
+        if cycle is not None:
+            title += " - [CYCLE period %d since generation %d]" % cycle
+        if self.timer_state == False:
+            title += " - [PAUSED]"
+        if title != self.windowTitle():
+            self.setWindowTitle(title)
+
+    # Function called when the timeline is moved, pause and go back to the chosen generation
+    def onTimeline(self, generation):
+        self.pause()
+        self.conway_canvas.rewind(generation)
+
+    # Pause the game if it is running
+    def pause(self):
+        if self.timer_state == True :
+            self.timer_state = False
+            self.runner.pause()
+            self.start_button.setText("Start")
+
     # Function called when clear button is pressed
     def onClearButton(self):
         self.conway_canvas.cleargrid()
@@ -126,13 +216,13 @@ class ConwaysApp(QMainWindow):
         # If Game is running, pause it
         if self.timer_state == True :
             self.timer_state = False
-            self.timer.stop()
+            self.runner.pause()
             self.setWindowTitle(self.title +" - [PAUSED]")
             self.start_button.setText("Start")
         # If Game is paused, start it
         else :
             self.timer_state = True
-            self.timer.start(self.timer_period)
+            self.runner.start()
             self.setWindowTitle(self.title)
             self.start_button.setText("Pause")
 
@@ -144,6 +234,12 @@ class ConwaysApp(QMainWindow):
     def onQuitButton(self):
         self.close()
 
+    # Function called when the window is closed, stop the simulation thread
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.runner.stop()
+        super(ConwaysApp, self).closeEvent(event)
+
 
 if __name__ == """__main__""":
     app = QApplication(sys.argv)
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+import os, sys
+
+# The modules live at the root of the repository, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from ConwaysBenchmark import compareReports, importFailed
+
+def importResult(module, milliseconds, qt=False, qtallowed=False, ceiling=100):
+    return {"kind" : "import", "size" : [], "module" : module, "milliseconds" : milliseconds, "qt" : qt,
+            "qt_allowed" : qtallowed, "numpy" : False, "ceiling" : ceiling}
+
+def test_import_guards():
+    assert not importFailed(importResult("ConwaysRule", 50))
+    assert importFailed(importResult("ConwaysRule", 150))
+    assert importFailed(importResult("ConwaysRule", 5, qt=True))
+    assert not importFailed(importResult("main", 5, qt=True, qtallowed=True))
+
+# An import over its ceiling is a regression even without a baseline measurement of the module
+def test_compare_import_ceiling():
+    report = {"results" : [importResult("ConwaysRule", 150), importResult("ConwaysEngine", 50)]}
+    regressions = compareReports({"results" : []}, report)
+    assert [(old, new) for key, old, new in regressions] == [(100, 150)]
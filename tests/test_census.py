@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+
+import numpy
+import pytest
+
+from ConwaysCensus import NAMED_OBJECTS, ConwaysCensus, _parseRows, aggregate, canonicalForm, labelComponents
+
+# Label the live cells with a breadth-first flood fill, the cells at most distance cells apart being linked
+def floodLabels(board, distance):
+    labels, count = numpy.zeros(board.shape, dtype=int), 0
+    for x, y in zip(*numpy.nonzero(board)):
+        if labels[x, y]:
+            continue
+        count += 1
+        labels[x, y] = count
+        queue = deque([(x, y)])
+        while queue:
+            cx, cy = queue.popleft()
+            for nx in range(max(0, cx - distance), min(board.shape[0], cx + distance + 1)):
+                for ny in range(max(0, cy - distance), min(board.shape[1], cy + distance + 1)):
+                    if board[nx, ny] and not labels[nx, ny]:
+                        labels[nx, ny] = count
+                        queue.append((nx, ny))
+    return labels, count
+
+# Get the 8 rotations and reflections of a board
+def orientations(board):
+    return [numpy.rot90(image, turns).copy() for image in (board, board.T) for turns in range(4)]
+
+# Place an object in the middle of an empty board
+def isolated(cells, margin=6):
+    board = numpy.zeros((cells.shape[0] + 2*margin, cells.shape[1] + 2*margin), dtype=bool)
+    board[margin:-margin, margin:-margin] = cells
+    return board
+
+@pytest.mark.parametrize("distance", [1, 2])
+@pytest.mark.parametrize("density", [0.1, 0.3, 0.5, 0.7])
+def test_labels_match_flood_fill(distance, density):
+    board = numpy.random.default_rng(1).random((60, 45)) < density
+    labels, count = labelComponents(board, distance)
+    reference, expected = floodLabels(board, distance)
+    assert count == expected
+    # Same partition of the live cells : every label pairs with exactly one reference label
+    assert len(set(zip(labels[board], reference[board]))) == count
+    assert (labels[~board] == 0).all()
+
+@pytest.mark.parametrize("name", sorted(NAMED_OBJECTS))
+def test_every_phase_of_named_objects(name):
+    census = ConwaysCensus()
+    phases = census._phases(_parseRows(NAMED_OBJECTS[name]))
+    for phase in phases:
+        for cells in orientations(phase):
+            assert census.census(isolated(cells)) == {name : 1}
+
+def test_unnamed_objects_get_their_class():
+    census = ConwaysCensus(rule="B36/S23")
+    assert census.classify(_parseRows(NAMED_OBJECTS["block"])) == "xs4"
+    assert census.classify(_parseRows(NAMED_OBJECTS["blinker"])) == "xp2"
+    assert census.classify(_parseRows(NAMED_OBJECTS["glider"])) == "xq4"
+    assert ConwaysCensus().classify(_parseRows(["**"])) == "dies"
+
+def test_canonical_form_ignores_orientation():
+    glider = _parseRows(NAMED_OBJECTS["glider"])
+    assert len({canonicalForm(cells) for cells in orientations(glider)}) == 1
+
+def test_repeated_objects_hit_the_cache():
+    census = ConwaysCensus()
+    board = numpy.zeros((40, 40), dtype=bool)
+    for x in range(2, 38, 6):
+        board[x:x+2, 2:4] = True
+        board[x, 10:13] = True
+    assert census.census(board) == {"block" : 6, "blinker" : 6}
+    assert census.misses == 2
+    assert census.hits == 10
+
+def test_aggregate_adds_runs():
+    totals = aggregate([{"block" : 2, "blinker" : 1}, {"block" : 3}])
+    assert totals == {"runs" : 2, "objects" : {"block" : 5, "blinker" : 1}, "occurrence" : {"block" : 2, "blinker" : 1}}
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from ConwaysBenchmark import ListGrid
+from ConwaysEngine import ConwaysEngine
+from ConwaysSimulation import ConwaysSimulation
+
+VALUE_ON, VALUE_OFF = 0, 1
+
+# Step a board with the per-cell applyRules of the original grid, kept in ConwaysBenchmark.ListGrid
+def listStep(board):
+    grid = ListGrid([[VALUE_ON if cell else VALUE_OFF for cell in row] for row in board.tolist()], VALUE_ON, VALUE_OFF)
+    grid.applyRules()
+    return numpy.array(grid.grid) == VALUE_ON
+
+# Check that the engine and applyRules give the same boards for a few generations
+def assertSameGenerations(board, generations=4):
+    engine = ConwaysEngine(*board.shape)
+    engine.set_grid(numpy.where(board, VALUE_ON, VALUE_OFF), VALUE_ON)
+    for _ in range(generations):
+        board = listStep(board)
+        engine.step()
+        assert (engine.get_grid(VALUE_ON, VALUE_OFF) == numpy.where(board, VALUE_ON, VALUE_OFF)).all()
+
+# Boards with live cells in the corners and along the borders, where _getNeighbours has its special cases
+def edgeBoards(gridx, gridy):
+    boards = []
+    corners = numpy.zeros((gridx, gridy), dtype=bool)
+    corners[:2, :2] = corners[:2, -2:] = corners[-2:, :2] = corners[-2:, -2:] = True
+    boards.append(corners)
+    for side in (numpy.s_[0, :], numpy.s_[-1, :], numpy.s_[:, 0], numpy.s_[:, -1]):
+        border = numpy.zeros((gridx, gridy), dtype=bool)
+        border[side] = True
+        boards.append(border)
+    frame = numpy.zeros((gridx, gridy), dtype=bool)
+    frame[0, :] = frame[-1, :] = frame[:, 0] = frame[:, -1] = True
+    boards.append(frame)
+    # Every pattern of the 3 x 3 cells of a corner, on the four corners at once
+    rng = numpy.random.default_rng(7)
+    for _ in range(8):
+        board = numpy.zeros((gridx, gridy), dtype=bool)
+        block = rng.random((3, 3)) < 0.5
+        board[:3, :3], board[:3, -3:], board[-3:, :3], board[-3:, -3:] = block, block, block, block
+        boards.append(board)
+    boards.append(numpy.ones((gridx, gridy), dtype=bool))
+    return boards
+
+@pytest.mark.parametrize("gridx, gridy", [(2, 2), (3, 7), (10, 10), (20, 38), (38, 20)])
+@pytest.mark.parametrize("density", [0.2, 0.5, 0.8])
+def test_random_grids_match_apply_rules(gridx, gridy, density):
+    rng = numpy.random.default_rng(gridx * 100 + gridy)
+    for _ in range(3):
+        assertSameGenerations(rng.random((gridx, gridy)) < density)
+
+@pytest.mark.parametrize("gridx, gridy", [(3, 3), (4, 9), (12, 7), (20, 38)])
+def test_corners_and_borders_match_apply_rules(gridx, gridy):
+    for board in edgeBoards(gridx, gridy):
+        assertSameGenerations(board)
+
+def test_default_grid_values_are_the_ones_of_the_widgets():
+    board = numpy.random.default_rng(3).random((7, 5)) < 0.5
+    engine = ConwaysEngine(7, 5)
+    engine.set_board(board)
+    simulation = ConwaysSimulation(7, 5)
+    simulation.set_grid(engine.get_grid())
+    assert (simulation.get_board() == board).all()
+    engine.set_grid(simulation.get_grid())
+    assert (engine.get_board() == board).all()
+
+# Once the board is a still life the engine is skipped, and no region is reported as changed until it is edited, even
+# by an engine reporting the whole board every generation
+def test_still_life_has_no_dirty_rects():
+    simulation = ConwaysSimulation(10, 10, ConwaysEngine(10, 10))
+    board = numpy.zeros((10, 10), dtype=bool)
+    board[2:4, 2:4] = True
+    simulation.set_board(board)
+    simulation.step()
+    simulation.step()
+    assert simulation.cycles.period == 1
+    simulation.step()
+    assert simulation.dirtyRects() == []
+    simulation.toggle_cell(7, 7)
+    simulation.step()
+    assert simulation.dirtyRects() != []
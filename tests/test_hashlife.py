@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from ConwaysEngine import ConwaysEngine
+from ConwaysHashLife import ConwaysHashLife
+from ConwaysSimulation import ConwaysSimulation
+
+GLIDER = numpy.array([[0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=bool).T
+
+# Step a pattern placed at (x0, y0) with the NumPy engine on a board large enough for it to stay away from the edges
+def reference(pattern, x0, y0, generations, size=256):
+    engine = ConwaysEngine(size, size)
+    board = numpy.zeros((size, size), dtype=bool)
+    board[size//2 + x0:size//2 + x0 + pattern.shape[0], size//2 + y0:size//2 + y0 + pattern.shape[1]] = pattern
+    engine.set_board(board)
+    engine.run(generations)
+    return engine.get_board()
+
+@pytest.mark.parametrize("offset", range(-6, 6))
+@pytest.mark.parametrize("generations", [1, 3, 8, 33])
+def test_glider_is_not_cropped(offset, generations):
+    hashlife = ConwaysHashLife()
+    hashlife.set_board(GLIDER, offset, offset)
+    hashlife.run(generations)
+    assert hashlife.population() == 5
+    assert (hashlife.get_board(-128, -128, 256, 256) == reference(GLIDER, offset, offset, generations)).all()
+
+@pytest.mark.parametrize("maxcache, maxnodes", [(1000000, 4000000), (50, 200)])
+def test_capped_caches_give_the_same_board(maxcache, maxnodes):
+    soup = numpy.random.default_rng(0).random((16, 16)) < 0.4
+    hashlife = ConwaysHashLife(maxcache=maxcache, maxnodes=maxnodes)
+    hashlife.set_board(soup, -8, -8)
+
+    # The caps are checked inside a jump, not only between jumps
+    sizes = []
+    successor = hashlife._successor
+    def tracked(node, j):
+        result = successor(node, j)
+        sizes.append(len(hashlife._ConwaysHashLife__results))
+        return result
+    hashlife._successor = tracked
+
+    hashlife.run(64)
+    assert max(sizes) <= maxcache
+    assert (hashlife.get_board(-128, -128, 256, 256) == reference(soup, -8, -8, 64)).all()
+
+def test_grid_is_shown_by_the_simulation():
+    hashlife = ConwaysHashLife()
+    hashlife.set_board(GLIDER, 2, 3)
+    hashlife.run(4)
+    simulation = ConwaysSimulation(12, 10)
+    simulation.set_grid(hashlife.get_grid(0, 0, 12, 10))
+    assert (simulation.get_board() == hashlife.get_board(0, 0, 12, 10)).all()
+    assert simulation.get_board().sum() == 5
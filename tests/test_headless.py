@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import numpy
+
+import headless
+from ConwaysPatterns import readRLE, writePattern
+
+def test_wide_pattern_keeps_its_orientation(tmp_path, capsys):
+    # 150 columns along x and 3 lines along y, every cell alive
+    pattern, output, stats = str(tmp_path / "wide.rle"), str(tmp_path / "out.rle"), str(tmp_path / "stats.json")
+    writePattern(numpy.ones((150, 3), dtype=bool), pattern)
+
+    assert headless.main(["--width", "200", "--height", "50", "--pattern", pattern, "--generations", "0",
+                          "--output", output, "--stats", stats]) == 0
+    assert "cropped" not in capsys.readouterr().err
+    with open(stats) as source:
+        assert json.load(source)["population"] == 450
+
+    board, rule = readRLE(output)
+    assert board.shape == (200, 50)
+    assert board.sum() == 450
+    assert board[25:175, 23:26].all()
+    with open(output) as source:
+        assert source.readline().startswith("x = 200, y = 50")
+
+def test_pattern_larger_than_the_board_is_reported(tmp_path, capsys):
+    pattern = str(tmp_path / "wide.rle")
+    writePattern(numpy.ones((150, 3), dtype=bool), pattern)
+    assert headless.main(["--width", "100", "--height", "50", "--pattern", pattern, "--generations", "0",
+                          "--stats", str(tmp_path / "stats.json")]) == 0
+    assert "cropped" in capsys.readouterr().err
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from ConwaysEngine import ConwaysEngine
+from ConwaysParallel import ConwaysParallelEngine
+
+# Step the parallel engine and the NumPy engine side by side, checking they keep the same board
+def assertSameSteps(engine, reference, generations=3):
+    for _ in range(generations):
+        engine.step()
+        reference.step()
+        assert (numpy.asarray(engine.get_board()) == reference.get_board()).all()
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_step_after_close_starts_again(workers):
+    board = numpy.random.default_rng(0).random((64, 64)) < 0.4
+    engine, reference = ConwaysParallelEngine(64, 64, workers=workers), ConwaysEngine(64, 64)
+    engine.set_board(board)
+    reference.set_board(board)
+    try:
+        assertSameSteps(engine, reference)
+        engine.close()
+        assertSameSteps(engine, reference)
+    finally:
+        engine.close()
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_new_rule_reaches_the_workers(workers):
+    board = numpy.random.default_rng(1).random((48, 40)) < 0.4
+    with ConwaysParallelEngine(48, 40, workers=workers, rule="B36/S23") as engine:
+        reference = ConwaysEngine(48, 40, rule="B36/S23")
+        engine.set_board(board)
+        reference.set_board(board)
+        assertSameSteps(engine, reference)
+        engine.set_rule("B3/S23")
+        reference.set_rule("B3/S23")
+        assertSameSteps(engine, reference)
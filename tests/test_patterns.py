@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from ConwaysPatterns import parseCells, pattern, readPattern, readRLE, writePattern
+
+# A wide random pattern, 150 columns along x and 3 lines along y
+def widePattern():
+    return numpy.random.default_rng(4).random((150, 3)) < 0.5
+
+@pytest.mark.parametrize("extension", [".rle", ".cells", ".snap"])
+def test_round_trip_keeps_a_wide_pattern(tmp_path, extension):
+    board = widePattern()
+    path = str(tmp_path / ("wide" + extension))
+    writePattern(board, path)
+    assert (readPattern(path) == board).all()
+    assert readPattern(path).shape == (150, 3)
+
+def test_rle_header_x_is_the_board_width(tmp_path):
+    path = str(tmp_path / "wide.rle")
+    writePattern(widePattern(), path)
+    with open(path) as source:
+        assert source.readline().startswith("x = 150, y = 3")
+
+def test_rle_columns_are_along_x(tmp_path):
+    path = tmp_path / "glider.rle"
+    path.write_text("#N Glider\nx = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n")
+    board, rule = readRLE(str(path))
+    assert rule == "B3/S23"
+    assert (board == pattern("glider")).all()
+    assert board[1][0] and board[2][1] and board[0][2] and board[1][2] and board[2][2]
+    assert board.sum() == 5
+
+def test_cells_columns_are_along_x(tmp_path):
+    path = tmp_path / "line.cells"
+    path.write_text("!Name: line\nOOOO\n....\n")
+    board = readPattern(str(path))
+    assert board.shape == (4, 2)
+    assert (board == parseCells(["OOOO", "...."])).all()
+    assert board[:, 0].all() and not board[:, 1].any()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from ConwaysRule import LOOKUP_COMPARISONS, RULES, ConwaysRule
+
+RULE_STRINGS = sorted(RULES.values()) + ["B1357/S02468", "B12345678/S012345678", "B2/S", "B/S"]
+
+# Every (state, count) pair, as arrays
+def everyCell():
+    alive, counts = numpy.meshgrid([False, True], numpy.arange(9, dtype=numpy.uint8), indexing="ij")
+    return alive, counts
+
+@pytest.mark.parametrize("name", RULE_STRINGS)
+def test_compare_and_lookup_follow_the_table(name):
+    rule = ConwaysRule(name)
+    alive, counts = everyCell()
+    expected = numpy.array(rule.table, dtype=bool)
+    assert (rule.compare(alive, counts) == expected).all()
+    assert (rule.lookup(alive, counts) == expected).all()
+    assert (rule.apply(alive, counts) == expected).all()
+
+@pytest.mark.parametrize("name", RULE_STRINGS)
+def test_apply_on_stacked_boards(name):
+    rng = numpy.random.default_rng(2)
+    alive = rng.random((3, 20, 30)) < 0.5
+    counts = rng.integers(0, 9, (3, 20, 30)).astype(numpy.uint8)
+    rule = ConwaysRule(name)
+    expected = numpy.array(rule.table, dtype=bool)[alive.astype(int), counts]
+    assert (rule.apply(alive, counts) == expected).all()
+
+def test_rules_with_many_counts_use_the_lookup():
+    many = ConwaysRule("B1357/S02468")
+    assert sum(many.table[0]) + sum(many.table[1]) > LOOKUP_COMPARISONS
+    assert many._ConwaysRule__lookup
+    assert not ConwaysRule("B3/S23")._ConwaysRule__lookup
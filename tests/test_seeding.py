@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from numpy.random import SeedSequence
+
+from ConwaysEnsemble import ConwaysEnsemble
+from ConwaysSeeding import memberSeed, randomSoup, randomSoups
+
+# Get the state drawn from a SeedSequence, equal for equal streams
+def state(seed):
+    return seed.generate_state(4).tolist()
+
+def test_member_seeds_match_spawn():
+    members = [memberSeed(SeedSequence(1234), index) for index in range(5)]
+    assert [state(member) for member in members] == [state(child) for child in SeedSequence(1234).spawn(5)]
+
+# The members depend on the entropy, the spawn key and the index only, not on the children already spawned
+@pytest.mark.parametrize("spawned", [1, 3])
+def test_member_seeds_ignore_spawned_children(spawned):
+    seed = SeedSequence(1234)
+    before = [state(memberSeed(seed, index)) for index in range(5)]
+    seed.spawn(spawned)
+    assert [state(memberSeed(seed, index)) for index in range(5)] == before
+
+def test_ensemble_members_match_spawned_children():
+    seed = SeedSequence(99)
+    seed.spawn(2)
+    ensemble = ConwaysEnsemble.random(4, 12, 9, seed=seed)
+    children = SeedSequence(99).spawn(4)
+    for index, child in enumerate(children):
+        assert (ensemble.boards[index] == randomSoup(12, 9, 0.5, child)).all()
+
+def test_int_seeds_give_the_same_batch():
+    assert (randomSoups(3, 8, 8, seed=5) == randomSoups(3, 8, 8, seed=SeedSequence(5))).all()
+    assert (randomSoups(3, 8, 8, seed=5)[2] == randomSoup(8, 8, 0.5, memberSeed(5, 2))).all()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import csv, json
+
+import numpy
+import pytest
+
+from ConwaysEngine import ConwaysEngine
+from ConwaysParallel import ConwaysParallelEngine
+from ConwaysSimulation import ConwaysSimulation
+from ConwaysStatistics import ConwaysCSVSink, ConwaysJSONLSink
+
+def randomBoard(gridx, gridy, seed=0):
+    return numpy.random.default_rng(seed).random((gridx, gridy)) < 0.4
+
+# The births and deaths counted by the engines are the cells switched on and off by the step
+@pytest.mark.parametrize("engineClass", [ConwaysEngine, ConwaysParallelEngine])
+def test_births_deaths(engineClass):
+    engine = engineClass(40, 30)
+    try:
+        engine.set_board(randomBoard(40, 30))
+        engine.trackChanges = True
+        for _ in range(5):
+            previous = engine.board.copy()
+            engine.step()
+            assert engine.births == numpy.count_nonzero(engine.board & ~previous)
+            assert engine.deaths == numpy.count_nonzero(previous & ~engine.board)
+    finally:
+        if hasattr(engine, "close"):
+            engine.close()
+
+# Engine whose bounds scans are counted
+class CountingEngine(ConwaysEngine):
+    scans = 0
+
+    def liveBounds(self):
+        self.scans += 1
+        return ConwaysEngine.liveBounds(self)
+
+# A listener without fields gets every field, the bounds included
+def test_bounds_plain_listener():
+    simulation = ConwaysSimulation(20, 20, CountingEngine(20, 20))
+    simulation.set_board(randomBoard(20, 20))
+    records = []
+    simulation.addListener(records.append)
+    simulation.run(3)
+    assert simulation.engine.scans == 3
+    assert records[-1]["bounds"] == simulation.engine.liveBounds()
+
+# The board is not scanned for the bounds when no listener asks for them
+def test_bounds_not_asked(tmp_path):
+    simulation = ConwaysSimulation(20, 20, CountingEngine(20, 20))
+    simulation.set_board(randomBoard(20, 20))
+    with ConwaysJSONLSink(str(tmp_path / "trace.jsonl"), ["generation", "population"]) as sink:
+        simulation.addListener(sink)
+        simulation.run(3)
+        simulation.removeListener(sink)
+    assert simulation.engine.scans == 0
+    records = [json.loads(line) for line in (tmp_path / "trace.jsonl").read_text().splitlines()]
+    assert [sorted(record) for record in records] == [["generation", "population"]] * 3
+    assert records[-1]["population"] == simulation.engine.population()
+    # A listener asking for the bounds turns the scans on
+    records = []
+    simulation.addListener(records.append)
+    simulation.step()
+    assert simulation.engine.scans == 1 and records[-1]["bounds"] is not None
+
+# The CSV sink writes the chosen fields, the bounds split in four columns
+def test_csv_fields(tmp_path):
+    simulation = ConwaysSimulation(20, 20)
+    board = numpy.zeros((20, 20), dtype=bool)
+    board[5, 6:9] = True
+    simulation.set_board(board)
+    with ConwaysCSVSink(str(tmp_path / "trace.csv"), ["generation", "bounds", "births"]) as sink:
+        simulation.addListener(sink)
+        simulation.step()
+    with open(str(tmp_path / "trace.csv"), newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows == [["generation", "x0", "y0", "x1", "y1", "births"], ["1", "4", "7", "7", "8", "2"]]
+
+def test_unknown_field(tmp_path):
+    with pytest.raises(ValueError):
+        ConwaysJSONLSink(str(tmp_path / "trace.jsonl"), ["generation", "speed"])
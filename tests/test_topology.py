@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pytest
+
+from ConwaysActiveEngine import ConwaysActiveEngine
+from ConwaysBenchmark import ListGrid
+from ConwaysBitBoard import ConwaysBitBoard
+from ConwaysEngine import ConwaysEngine
+from ConwaysEnsemble import ConwaysEnsemble
+from ConwaysParallel import ConwaysParallelEngine
+from ConwaysTopology import TOPOLOGIES
+
+OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+def neighbour(x, y, gridx, gridy, topology):
+    """
+        Function that find the cell seen across the edges of the board, one glued edge at a time, independently of
+        the ghost cells of ConwaysTopology.fillGhosts
+        Return :
+            - cell : the (x, y) cell, None if it is outside of a dead boundary
+    """
+    wrapx, flipx, wrapy, flipy = TOPOLOGIES[topology]
+    if not 0 <= x < gridx:
+        if not wrapx:
+            return None
+        x, y = x % gridx, (gridy - 1 - y if flipx else y)
+    if not 0 <= y < gridy:
+        if not wrapy:
+            return None
+        x, y = (gridx - 1 - x if flipy else x), y % gridy
+    return x, y
+
+# Advance a board by one generation cell by cell
+def referenceStep(board, topology):
+    gridx, gridy = board.shape
+    nextboard = numpy.zeros_like(board)
+    for x in range(gridx):
+        for y in range(gridy):
+            count = 0
+            for dx, dy in OFFSETS:
+                cell = neighbour(x + dx, y + dy, gridx, gridy, topology)
+                count += cell is not None and bool(board[cell])
+            nextboard[x, y] = count == 3 or (board[x, y] and count == 2)
+    return nextboard
+
+# Boards with a glider crossing every corner and edge, and random soups
+def boards(gridx, gridy):
+    rng = numpy.random.default_rng(gridx * 1000 + gridy)
+    result = [rng.random((gridx, gridy)) < density for density in (0.2, 0.5)]
+    glider = numpy.array([[0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=bool).T
+    for x0, y0 in ((-1, -1), (-1, gridy - 2), (gridx - 2, -1), (gridx - 2, gridy - 2), (-1, gridy // 2), (gridx // 2, -1)):
+        board = numpy.zeros((gridx, gridy), dtype=bool)
+        for x, y in zip(*numpy.nonzero(glider)):
+            board[(x0 + x) % gridx, (y0 + y) % gridy] = True
+        result.append(board)
+    corners = numpy.zeros((gridx, gridy), dtype=bool)
+    corners[0, 0] = corners[0, 1] = corners[1, 0] = corners[-1, -1] = corners[0, -1] = corners[-1, 0] = True
+    result.append(corners)
+    return result
+
+ENGINES = {
+    "numpy"    : lambda gridx, gridy, topology : ConwaysEngine(gridx, gridy, topology=topology),
+    "active"   : lambda gridx, gridy, topology : ConwaysActiveEngine(gridx, gridy, tilesize=4, topology=topology),
+    "bitboard" : lambda gridx, gridy, topology : ConwaysBitBoard(gridx, gridy, topology=topology),
+}
+
+@pytest.mark.parametrize("topology", sorted(TOPOLOGIES))
+@pytest.mark.parametrize("name", sorted(ENGINES))
+@pytest.mark.parametrize("gridx, gridy", [(5, 5), (9, 14), (16, 70)])
+def test_engines_match_the_reference(name, topology, gridx, gridy):
+    for board in boards(gridx, gridy):
+        engine = ENGINES[name](gridx, gridy, topology)
+        engine.set_board(board)
+        expected = board
+        for _ in range(6):
+            expected = referenceStep(expected, topology)
+            engine.step()
+            assert (numpy.asarray(engine.get_board()) == expected).all()
+
+@pytest.mark.parametrize("topology", sorted(TOPOLOGIES))
+def test_parallel_engine_matches_the_reference(topology):
+    board = boards(24, 18)[1]
+    engine = ConwaysParallelEngine(24, 18, workers=2, topology=topology)
+    try:
+        engine.set_board(board)
+        expected = board
+        for _ in range(4):
+            expected = referenceStep(expected, topology)
+            engine.step()
+            assert (numpy.asarray(engine.get_board()) == expected).all()
+    finally:
+        engine.close()
+
+@pytest.mark.parametrize("topology", sorted(TOPOLOGIES))
+def test_ensemble_matches_the_reference(topology):
+    batch = boards(9, 14)
+    ensemble = ConwaysEnsemble(batch, topology=topology)
+    for _ in range(4):
+        batch = [referenceStep(board, topology) for board in batch]
+        ensemble.step()
+        assert (ensemble.boards == numpy.array(batch)).all()
+
+@pytest.mark.parametrize("topology", ["torus", "klein", "cross"])
+def test_corner_is_born_from_cells_across_the_glued_edges(topology):
+    # The corner (0, 0) only gets live neighbours across the glued edges, 3 of them counting their multiplicity (on a
+    # cross-surface a cell can be seen through two edges, and the corner is its own diagonal neighbour)
+    gridx, gridy = 6, 8
+    seen = [neighbour(dx, dy, gridx, gridy, topology) for dx, dy in OFFSETS if dx < 0 or dy < 0]
+    board = numpy.zeros((gridx, gridy), dtype=bool)
+    count = 0
+    for cell in dict.fromkeys(seen):
+        if cell != (0, 0) and count + seen.count(cell) <= 3:
+            board[cell] = True
+            count += seen.count(cell)
+    assert count == 3
+
+    expected = referenceStep(board, topology)
+    assert expected[0, 0]
+    for name in sorted(ENGINES):
+        engine = ENGINES[name](gridx, gridy, topology)
+        engine.set_board(board)
+        engine.step()
+        assert (numpy.asarray(engine.get_board()) == expected).all()
+
+def test_upper_border_reads_its_lower_right_neighbour():
+    # The original grid read grid[x+1][y-1] for the neighbour (x+1, y+1) of the upper border : the dead cell (0, 5)
+    # has three live neighbours, one of them being (1, 6), and must be born
+    board = numpy.zeros((6, 10), dtype=bool)
+    board[0, 4] = board[0, 6] = board[1, 6] = True
+
+    grid = ListGrid([[0 if cell else 1 for cell in row] for row in board.tolist()])
+    grid.applyRules()
+    assert grid.grid[0][5] == 0
+
+    for name in sorted(ENGINES):
+        engine = ENGINES[name](6, 10, "dead")
+        engine.set_board(board)
+        engine.step()
+        assert numpy.asarray(engine.get_board())[0, 5]